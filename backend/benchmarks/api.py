@@ -0,0 +1,172 @@
+"""
+Latency/throughput benchmark for the events API.
+
+Seeds a dedicated database, then drives the list, filter, search, detail and
+write paths through the WSGI application and reports p50/p95/p99 latency,
+requests per second and queries per request for each endpoint.
+
+    python -m benchmarks.api --events 100000 --output results.json
+    python -m benchmarks.api --database-url postgres://localhost/events_bench
+
+Run it from the backend directory. The database is flushed when its contents
+do not match the requested size, so never point it at real data.
+"""
+import argparse
+import json
+import random
+import time
+
+from benchmarks.common import (
+    QueryCounter,
+    environment,
+    latency_stats,
+    seed,
+    setup_django,
+    timed,
+    write_results,
+    wsgi_request,
+)
+
+
+def read_scenarios(category_ids, event_ids):
+    """(name, method, path, query) for each read path the API exposes."""
+    category = random.choice(category_ids)
+    return [
+        ('list', 'GET', '/api/events/', ''),
+        ('list_deep_page', 'GET', '/api/events/', 'page=50'),
+        ('list_cursor', 'GET', '/api/events/', 'pagination=cursor'),
+        ('filter_category', 'GET', '/api/events/', f'category={category}'),
+        ('filter_date', 'GET', '/api/events/', 'date=2025-01-15'),
+        ('filter_category_date', 'GET', '/api/events/', f'category={category}&date=2025-01-15'),
+        ('search', 'GET', '/api/events/', 'search=conference'),
+        ('search_filtered', 'GET', '/api/events/', f'search=python&category={category}'),
+        ('detail', 'GET', '/api/events/{id}/', ''),
+        ('categories', 'GET', '/api/categories/', ''),
+        ('categories_with_counts', 'GET', '/api/categories/', 'with_counts=true'),
+    ]
+
+
+def run_scenario(application, counter, method, path, query, iterations, event_ids):
+    queries = []
+
+    def request():
+        before = counter.count
+        status, _, _ = wsgi_request(
+            application, method, path.format(id=random.choice(event_ids)), query
+        )
+        if status >= 400:
+            raise RuntimeError(f'{method} {path}?{query} returned {status}')
+        queries.append(counter.count - before)
+
+    samples = timed(request, iterations)
+    stats = latency_stats(samples)
+    stats['queries_per_request'] = round(sum(queries[-iterations:]) / iterations, 2)
+    return stats
+
+
+def run_writes(application, counter, category_ids, iterations):
+    """Create, update then delete ``iterations`` events; one scenario per method."""
+    samples = {'create': [], 'update': [], 'delete': []}
+    queries = {name: 0 for name in samples}
+    created = []
+
+    def measure(name, method, path, body=None):
+        before = counter.count
+        started = time.perf_counter()
+        status, _, content = wsgi_request(application, method, path, body=body)
+        samples[name].append(time.perf_counter() - started)
+        queries[name] += counter.count - before
+        if status >= 400:
+            raise RuntimeError(f'{method} {path} returned {status}: {content[:200]!r}')
+        return content
+
+    for i in range(iterations):
+        content = measure('create', 'POST', '/api/events/', {
+            'title': f'Benchmark event {i}',
+            'venue': 'Benchmark hall',
+            'date': '2030-01-01',
+            'time': '10:00',
+            'category': str(random.choice(category_ids)),
+        })
+        created.append(json.loads(content)['id'])
+    for pk in created:
+        measure('update', 'PATCH', f'/api/events/{pk}/', {'venue': 'Updated hall'})
+    for pk in created:
+        measure('delete', 'DELETE', f'/api/events/{pk}/')
+
+    results = {}
+    for name, values in samples.items():
+        stats = latency_stats(values)
+        stats['queries_per_request'] = round(queries[name] / len(values), 2)
+        results[name] = stats
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--database-url', help='Default: sqlite:///benchmark.sqlite3')
+    parser.add_argument('--categories', type=int, default=20)
+    parser.add_argument('--events', type=int, default=10000)
+    parser.add_argument('--iterations', type=int, default=200, help='Requests per endpoint')
+    parser.add_argument('--with-cache', action='store_true',
+                        help='Keep the response cache on (default: measure the database path)')
+    parser.add_argument('--no-metrics', action='store_true',
+                        help='Disable the request metrics middleware, to measure its overhead')
+    parser.add_argument('--only', nargs='*', help='Run only these scenarios')
+    parser.add_argument('--output', help='Write the results to this JSON file')
+    args = parser.parse_args()
+
+    setup_django(
+        args.database_url,
+        EVENTS_CACHE_TIMEOUT=300 if args.with_cache else 0,
+        EVENTS_METRICS_ENABLED=not args.no_metrics,
+    )
+    seeding = time.perf_counter()
+    seed(args.categories, args.events)
+    seed_seconds = time.perf_counter() - seeding
+
+    from event_management.wsgi import application
+    from events.models import Category, Event
+
+    counter = QueryCounter()
+    counter.install()
+    random.seed(0)
+    category_ids = list(Category.objects.values_list('id', flat=True))
+    event_ids = list(Event.objects.values_list('id', flat=True)[:1000])
+
+    results = {}
+    for name, method, path, query in read_scenarios(category_ids, event_ids):
+        if args.only and name not in args.only:
+            continue
+        results[name] = run_scenario(
+            application, counter, method, path, query, args.iterations, event_ids
+        )
+        print_row(name, results[name])
+    if not args.only or 'writes' in args.only:
+        for name, stats in run_writes(application, counter, category_ids, args.iterations).items():
+            results[name] = stats
+            print_row(name, stats)
+
+    if args.output:
+        write_results(args.output, {
+            'environment': environment(),
+            'config': {
+                'categories': args.categories,
+                'events': args.events,
+                'iterations': args.iterations,
+                'with_cache': args.with_cache,
+                'metrics': not args.no_metrics,
+                'seed_seconds': round(seed_seconds, 2),
+            },
+            'results': results,
+        })
+
+
+def print_row(name, stats):
+    print(f"{name:<24} p50 {stats['p50_ms']:>8.2f} ms  p95 {stats['p95_ms']:>8.2f} ms  "
+          f"p99 {stats['p99_ms']:>8.2f} ms  {stats['rps']:>8.1f} req/s  "
+          f"{stats['queries_per_request']:>5.1f} queries")
+
+
+if __name__ == '__main__':
+    main()
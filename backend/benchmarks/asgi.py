@@ -0,0 +1,180 @@
+"""
+Concurrent-load benchmark: the async ASGI read path against the WSGI path.
+
+Runs the same mix of list/detail/category reads with ``--concurrency``
+clients in flight, once through the WSGI application with ``--wsgi-workers``
+requests served at a time (sync gunicorn workers; default: one per client)
+and once through the ASGI application in one event loop. ``--db-latency``
+adds a fixed delay to every query, standing in for a database across the
+network; ``--client-delay`` makes every client take that long to read its
+response, which holds a sync worker but not the event loop.
+
+    python -m benchmarks.asgi --concurrency 50 --wsgi-workers 5 --client-delay 20
+
+Run it from the backend directory; the database is flushed like benchmarks.api.
+"""
+import argparse
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import random
+import threading
+import time
+
+from benchmarks.common import (
+    asgi_request,
+    environment,
+    latency_stats,
+    seed,
+    setup_django,
+    write_results,
+    wsgi_request,
+)
+
+
+SCENARIOS = [
+    ('list', '/api/events/', ''),
+    ('list_filtered', '/api/events/', 'category={category}'),
+    ('list_cursor', '/api/events/', 'pagination=cursor'),
+    ('detail', '/api/events/{event}/', ''),
+    ('categories', '/api/categories/', ''),
+]
+
+
+def request_plan(count, category_ids, event_ids):
+    """``count`` (path, query) pairs cycling through SCENARIOS."""
+    plan = []
+    for i in range(count):
+        _, path, query = SCENARIOS[i % len(SCENARIOS)]
+        values = {'category': random.choice(category_ids), 'event': random.choice(event_ids)}
+        plan.append((path.format(**values), query.format(**values)))
+    return plan
+
+
+def add_db_latency(seconds):
+    """Sleep ``seconds`` before every query, on every connection of every thread."""
+    from django.db.backends.signals import connection_created
+
+    def delay(execute, sql, params, many, context):
+        time.sleep(seconds)
+        return execute(sql, params, many, context)
+
+    def install(connection, **kwargs):
+        if delay not in connection.execute_wrappers:
+            connection.execute_wrappers.append(delay)
+
+    connection_created.connect(install, weak=False)
+
+
+def check(status, path, query):
+    if status != 200:
+        raise RuntimeError(f'GET {path}?{query} returned {status}')
+
+
+def run_wsgi(plan, concurrency, workers, client_delay):
+    from event_management.wsgi import application
+
+    # Each client is a thread; a worker is held from the moment its request
+    # is accepted until the client has read the whole response.
+    worker_slots = threading.BoundedSemaphore(workers)
+    queue, samples = list(reversed(plan)), []
+
+    def client():
+        while True:
+            try:
+                item = queue.pop()
+            except IndexError:
+                return
+            started = time.perf_counter()
+            with worker_slots:
+                status, _, _ = wsgi_request(application, 'GET', *item)
+                time.sleep(client_delay)
+            check(status, *item)
+            samples.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for future in [pool.submit(client) for _ in range(concurrency)]:
+            future.result()
+    return samples, time.perf_counter() - started
+
+
+def run_asgi(plan, concurrency, workers, client_delay):
+    from event_management.asgi import application
+
+    async def client(queue, samples):
+        while queue:
+            item = queue.pop()
+            started = time.perf_counter()
+            status, _, _ = await asgi_request(application, 'GET', *item)
+            await asyncio.sleep(client_delay)
+            check(status, *item)
+            samples.append(time.perf_counter() - started)
+
+    async def main():
+        queue, samples = list(reversed(plan)), []
+        await asyncio.gather(*(client(queue, samples) for _ in range(concurrency)))
+        return samples
+
+    started = time.perf_counter()
+    samples = asyncio.run(main())
+    return samples, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--database-url', help='Default: sqlite:///benchmark.sqlite3')
+    parser.add_argument('--categories', type=int, default=20)
+    parser.add_argument('--events', type=int, default=10000)
+    parser.add_argument('--requests', type=int, default=1000)
+    parser.add_argument('--concurrency', type=int, default=20)
+    parser.add_argument('--wsgi-workers', type=int, help='Default: --concurrency')
+    parser.add_argument('--db-latency', type=float, default=0.0,
+                        help='Milliseconds added to every query')
+    parser.add_argument('--client-delay', type=float, default=0.0,
+                        help='Milliseconds each client takes to read a response')
+    parser.add_argument('--output', help='Write the results to this JSON file')
+    args = parser.parse_args()
+
+    setup_django(args.database_url, EVENTS_CACHE_TIMEOUT=0, EVENTS_METRICS_ENABLED=False)
+    seed(args.categories, args.events)
+
+    from events.models import Category, Event
+
+    category_ids = [str(pk) for pk in Category.objects.values_list('id', flat=True)]
+    event_ids = [str(pk) for pk in Event.objects.values_list('id', flat=True)[:1000]]
+    plan = request_plan(args.requests, category_ids, event_ids)
+    if args.db_latency:
+        add_db_latency(args.db_latency / 1000)
+
+    workers = args.wsgi_workers or args.concurrency
+    client_delay = args.client_delay / 1000
+    results = {}
+    for name, run in (('wsgi', run_wsgi), ('asgi', run_asgi)):
+        run(plan[:args.concurrency * 2], args.concurrency, workers, 0)  # warm up
+        samples, elapsed = run(plan, args.concurrency, workers, client_delay)
+        stats = latency_stats(samples)
+        # Throughput under concurrency is requests over wall time, not the
+        # inverse of the mean latency.
+        stats['rps'] = round(len(samples) / elapsed, 1)
+        results[name] = stats
+        print(f"{name:<6} p50 {stats['p50_ms']:8.2f} ms  p99 {stats['p99_ms']:8.2f} ms  "
+              f"{stats['rps']:8.1f} req/s")
+
+    if args.output:
+        write_results(args.output, {
+            'environment': environment(),
+            'config': {
+                'categories': args.categories,
+                'events': args.events,
+                'requests': args.requests,
+                'concurrency': args.concurrency,
+                'wsgi_workers': workers,
+                'db_latency_ms': args.db_latency,
+                'client_delay_ms': args.client_delay,
+            },
+            'results': results,
+        })
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,127 @@
+"""
+Autocomplete benchmark.
+
+Builds an index of ``--index-events`` synthetic events (1M by default),
+reports its build time and memory, and times lookups on their own and
+through the WSGI application, plus an incremental update. That the index
+suggests what the database would and follows writes is checked by
+``events.tests.test_autocomplete``.
+
+    python -m benchmarks.autocomplete --output autocomplete.json
+
+Run it from the backend directory; the database is flushed like benchmarks.api.
+"""
+import json
+import random
+import time
+import tracemalloc
+import uuid
+
+from benchmarks.common import argument_parser, latency_stats, save_results, seed, setup_django, timed, wsgi_request
+
+
+WORDS = [
+    'annual', 'summit', 'tech', 'music', 'festival', 'workshop', 'design', 'data', 'cloud', 'open',
+    'city', 'night', 'market', 'community', 'science', 'art', 'health', 'startup', 'film', 'food',
+    'python', 'product', 'marketing', 'finance', 'career', 'charity', 'run', 'jazz', 'book', 'garden',
+]
+
+
+def get(application, text, extra=''):
+    from urllib.parse import urlencode
+
+    status, _, content = wsgi_request(application, 'GET', '/api/autocomplete/', urlencode({'q': text}) + extra)
+    return status, json.loads(content)
+
+
+def synthetic_events(count, rng):
+    venues = [f'{rng.choice(WORDS).title()} Hall {n}' for n in range(max(1, count // 200))]
+    for n in range(count):
+        words = ' '.join(rng.choice(WORDS) for _ in range(3)).title()
+        yield uuid.uuid4(), f'{words} {n}', rng.choice(venues)
+
+
+def benchmark(application, index_events, iterations):
+    from events import autocomplete
+    from events.cache import get_generations
+    from events.stream import NAMESPACES, ChangeFeed
+    from events.sync import decode_token, initial_token
+
+    rng = random.Random(42)
+    results = {}
+    events = list(synthetic_events(index_events, rng))
+    categories = [(uuid.uuid4(), f'{word.title()} Events') for word in WORDS]
+
+    started = time.perf_counter()
+    autocomplete.AutocompleteIndex(max_events=index_events).load(events, categories)
+    build_seconds = time.perf_counter() - started
+    # Again for the memory: tracing slows the build down. The ids are
+    # copied so that they are counted, as the ids of database rows would be.
+    tracemalloc.start()
+    index = autocomplete.AutocompleteIndex(max_events=index_events)
+    index.load(((uuid.UUID(int=pk.int), title, venue) for pk, title, venue in events), categories)
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    results['build'] = {
+        'events': len(index.events),
+        'titles': len(index.titles),
+        'venues': len(index.venues),
+        'seconds': round(build_seconds, 2),
+        'bytes': memory,
+        'bytes_per_event': round(memory / max(1, len(index.events))),
+    }
+    print(f"\nindex of {len(index.events)} events: built in {build_seconds:.1f} s, "
+          f"{memory / 1e6:.0f} MB ({memory / max(1, len(index.events)):.0f} bytes per event)")
+
+    # Prefixes as typed: the first 1 to 12 characters of random titles and venues.
+    texts = [
+        value[:rng.randint(1, 12)]
+        for _, title, venue in rng.sample(events, min(len(events), 2000))
+        for value in (title, venue)
+    ]
+    queries = iter(texts * (iterations // len(texts) + 2))
+    stats = latency_stats(timed(lambda: index.lookup(next(queries), autocomplete.DEFAULT_LIMIT), iterations))
+    results['lookup'] = stats
+    print(f"AutocompleteIndex.lookup        p50 {stats['p50_ms'] * 1000:7.1f} us  p99 {stats['p99_ms'] * 1000:7.1f} us")
+
+    instance = autocomplete.get_autocomplete()
+    instance.index = index
+    instance.feed = ChangeFeed(*decode_token(initial_token()))
+    instance.generations = get_generations(NAMESPACES)
+    instance.read_at = time.monotonic()
+    instance.stale = False
+    queries = iter(texts * (iterations // len(texts) + 2))
+    stats = latency_stats(timed(lambda: get(application, next(queries)), iterations))
+    results['request'] = stats
+    print(f"GET /api/autocomplete/          p50 {stats['p50_ms']:7.3f} ms  p95 {stats['p95_ms']:7.3f} ms"
+          f"  p99 {stats['p99_ms']:7.3f} ms")
+
+    updates = iter(synthetic_events(iterations + 10, rng))
+    stats = latency_stats(timed(lambda: index.put_event(*next(updates)), iterations))
+    results['put_event'] = stats
+    print(f"put_event (new title)           p50 {stats['p50_ms'] * 1000:7.1f} us  p99 {stats['p99_ms'] * 1000:7.1f} us")
+    return results
+
+
+def main():
+    parser = argument_parser(__doc__, iterations=5000)
+    parser.add_argument('--index-events', type=int, default=1_000_000,
+                        help='Synthetic events in the benchmarked index')
+    args = parser.parse_args()
+
+    setup_django(
+        args.database_url,
+        EVENTS_METRICS_ENABLED=False,
+        EVENTS_IMAGE_WORKERS=0,
+        CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+    )
+    seed(args.categories, args.events)
+
+    from event_management.wsgi import application
+
+    results = benchmark(application, args.index_events, args.iterations)
+    save_results(args, results, index_events=args.index_events)
+
+
+if __name__ == '__main__':
+    main()
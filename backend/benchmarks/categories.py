@@ -0,0 +1,70 @@
+"""
+Category cache benchmark.
+
+Times an event create, a 100-event bulk create and an uncached category
+list with the category cache on and off. That writes only confirm their
+category exists and that the snapshot follows category writes is checked by
+``events.tests.test_categories``.
+
+    python -m benchmarks.categories --output categories.json
+
+Run it from the backend directory; the database is flushed like benchmarks.api.
+"""
+from benchmarks.common import argument_parser, latency_stats, save_results, seed, setup_django, timed, wsgi_request
+
+
+def event_payload(category_id, n=0):
+    return {
+        'title': f'Category cache check {n}',
+        'venue': 'Cache Hall',
+        'date': '2030-01-01',
+        'time': '10:00:00',
+        'category': category_id,
+    }
+
+
+def benchmark(application, iterations):
+    from django.test.utils import override_settings
+
+    from events.models import Category, Event
+
+    category_id = str(Category.objects.order_by('name').values_list('pk', flat=True).first())
+    results = {}
+    scenarios = [
+        ('POST /api/events/', lambda: wsgi_request(application, 'POST', '/api/events/',
+                                                   body=event_payload(category_id)), iterations),
+        ('POST /api/events/bulk/ (100)', lambda: wsgi_request(
+            application, 'POST', '/api/events/bulk/', body=[event_payload(category_id, n) for n in range(100)]
+        ), max(1, iterations // 10)),
+        ('GET /api/categories/ (uncached)', lambda: wsgi_request(application, 'GET', '/api/categories/'),
+         iterations),
+    ]
+    print()
+    for label, func, count in scenarios:
+        for cache_label, timeout in (('category cache', 300), ('no category cache', 0)):
+            with override_settings(EVENTS_CACHE_TIMEOUT=0, EVENTS_CATEGORY_CACHE_TIMEOUT=timeout):
+                stats = latency_stats(timed(func, count))
+            results[f'{label}, {cache_label}'] = stats
+            print(f"{label:<32} {cache_label:<18} p50 {stats['p50_ms']:7.3f} ms  p95 {stats['p95_ms']:7.3f} ms")
+    Event.objects.filter(venue='Cache Hall').delete()
+    return results
+
+
+def main():
+    args = argument_parser(__doc__).parse_args()
+
+    setup_django(
+        args.database_url,
+        EVENTS_METRICS_ENABLED=False,
+        EVENTS_IMAGE_WORKERS=0,
+        CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+    )
+    seed(args.categories, args.events)
+
+    from event_management.wsgi import application
+
+    save_results(args, benchmark(application, args.iterations))
+
+
+if __name__ == '__main__':
+    main()
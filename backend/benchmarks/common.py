@@ -0,0 +1,262 @@
+"""Helpers shared by the benchmark scripts."""
+import argparse
+import asyncio
+import datetime
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from io import BytesIO
+
+
+def argument_parser(doc, iterations=200):
+    """
+    Command line options every benchmark takes: the database, the size of
+    the seeded dataset, the iterations per scenario and the results file.
+    Scripts add their own before parsing.
+    """
+    parser = argparse.ArgumentParser(description=doc.strip().splitlines()[0])
+    parser.add_argument('--database-url', help='Default: sqlite:///benchmark.sqlite3')
+    parser.add_argument('--categories', type=int, default=20)
+    parser.add_argument('--events', type=int, default=10000)
+    parser.add_argument('--iterations', type=int, default=iterations)
+    parser.add_argument('--output', help='Write the results to this JSON file')
+    return parser
+
+
+def setup_django(database_url=None, **overrides):
+    """
+    Configure Django against ``database_url`` (default: a throwaway SQLite
+    file) and no read replicas before the app registry loads, apply settings
+    overrides and migrate.
+    """
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'event_management.settings')
+    import dj_database_url
+    import django
+    from django.conf import settings
+
+    database_url = database_url or 'sqlite:///benchmark.sqlite3'
+    settings.DATABASES = {'default': dj_database_url.parse(database_url)}
+    settings.EVENTS_READ_REPLICAS = []
+    settings.ALLOWED_HOSTS = ['*']
+    settings.DEBUG = False
+    # Every benchmark request comes from one client.
+    overrides.setdefault('EVENTS_THROTTLE_ENABLED', False)
+    # One process, so its local cache sees every write.
+    overrides.setdefault('EVENTS_CACHE_TIMEOUT', 300)
+    for name, value in overrides.items():
+        setattr(settings, name, value)
+    django.setup()
+
+    from django.core.management import call_command
+    call_command('migrate', verbosity=0, interactive=False)
+
+
+def seed(categories, events, batch_size=5000):
+    """
+    Fill the (dedicated) benchmark database with ``categories`` categories and
+    ``events`` events, flushing it first unless it already has exactly that.
+    """
+    from events.models import Category, Event
+
+    from django.core.management import call_command
+
+    if Event.objects.count() == events and Category.objects.count() == categories:
+        return
+    call_command('flush', interactive=False, verbosity=0)
+
+    category_objects = Category.objects.bulk_create(
+        [Category(name=f'Category {i:04d}') for i in range(categories)]
+    )
+    start = datetime.date.today() - datetime.timedelta(days=365)
+    batch = []
+    for i in range(events):
+        batch.append(Event(
+            title=f'Event {i} {("conference", "workshop", "meetup", "webinar")[i % 4]}',
+            description=f'Description for event {i} about python, django and databases.',
+            venue=f'Venue {i % 500}',
+            date=start + datetime.timedelta(days=i % 730),
+            time=datetime.time(9 + i % 10, 0),
+            category=category_objects[i % categories],
+        ))
+        if len(batch) >= batch_size:
+            Event.objects.bulk_create(batch)
+            batch = []
+    if batch:
+        Event.objects.bulk_create(batch)
+    Category.objects.all().refresh_event_counts()
+
+
+class QueryCounter:
+    """execute_wrapper that counts queries on every database connection."""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+    def install(self):
+        from django.db import connections
+        for alias in connections:
+            connections[alias].execute_wrappers.append(self)
+
+
+def encode_body(body):
+    """Request bodies are JSON-encoded, unless already ``bytes``."""
+    if isinstance(body, bytes):
+        return body
+    return json.dumps(body).encode() if body is not None else b''
+
+
+def wsgi_request(application, method, path, query='', body=None, headers=None,
+                 content_type='application/json'):
+    """Run one request through a WSGI callable; return (status code, headers, body)."""
+    payload = encode_body(body)
+    environ = {
+        'REQUEST_METHOD': method,
+        'PATH_INFO': path,
+        'QUERY_STRING': query,
+        'SERVER_NAME': 'localhost',
+        'SERVER_PORT': '80',
+        'HTTP_HOST': 'localhost',
+        'CONTENT_TYPE': content_type,
+        'CONTENT_LENGTH': str(len(payload)),
+        'wsgi.url_scheme': 'http',
+        'wsgi.input': BytesIO(payload),
+        'wsgi.errors': sys.stderr,
+    }
+    for name, value in (headers or {}).items():
+        environ['HTTP_' + name.upper().replace('-', '_')] = value
+    started = []
+
+    def start_response(status, response_headers, exc_info=None):
+        started.append((int(status.split()[0]), dict(response_headers)))
+
+    content = b''.join(application(environ, start_response))
+    status, response_headers = started[0]
+    return status, response_headers, content
+
+
+async def asgi_request(application, method, path, query='', body=None, headers=None,
+                       content_type='application/json', on_body=None):
+    """
+    Run one request through an ASGI callable; return (status code, headers,
+    body). ``on_body`` is called with every body chunk as it is sent.
+    """
+    payload = encode_body(body)
+    raw_headers = [
+        (b'host', b'localhost'),
+        (b'content-type', content_type.encode()),
+        (b'content-length', str(len(payload)).encode()),
+    ]
+    for name, value in (headers or {}).items():
+        raw_headers.append((name.lower().encode(), value.encode()))
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': method,
+        'scheme': 'http',
+        'path': path,
+        'raw_path': path.encode(),
+        'query_string': query.encode(),
+        'root_path': '',
+        'headers': raw_headers,
+        'client': ('127.0.0.1', 50000),
+        'server': ('localhost', 80),
+    }
+    messages = [{'type': 'http.request', 'body': payload, 'more_body': False}]
+    disconnected = asyncio.Event()
+    started, chunks = [], []
+
+    async def receive():
+        if messages:
+            return messages.pop(0)
+        await disconnected.wait()
+        return {'type': 'http.disconnect'}
+
+    async def send(message):
+        if message['type'] == 'http.response.start':
+            started.append((message['status'], {
+                name.decode(): value.decode() for name, value in message['headers']
+            }))
+        elif message['type'] == 'http.response.body':
+            chunks.append(message.get('body', b''))
+            if on_body is not None:
+                on_body(chunks[-1])
+
+    await application(scope, receive, send)
+    disconnected.set()
+    status, response_headers = started[0]
+    return status, response_headers, b''.join(chunks)
+
+
+def latency_stats(samples):
+    """p50/p95/p99/mean in milliseconds and requests per second for ``samples`` (seconds)."""
+    ordered = sorted(samples)
+
+    def percentile(p):
+        return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))] * 1000
+
+    total = sum(samples)
+    return {
+        'requests': len(samples),
+        'p50_ms': round(percentile(50), 3),
+        'p95_ms': round(percentile(95), 3),
+        'p99_ms': round(percentile(99), 3),
+        'mean_ms': round(statistics.mean(samples) * 1000, 3),
+        'rps': round(len(samples) / total, 1) if total else None,
+    }
+
+
+def timed(func, iterations, warmup=3):
+    for _ in range(warmup):
+        func()
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def environment():
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    from django.db import connection
+    return {
+        'commit': commit,
+        'timestamp': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'database': connection.vendor,
+    }
+
+
+def write_results(path, results):
+    with open(path, 'w') as f:
+        json.dump(results, f, indent=2, default=str)
+
+
+def save_results(args, results, **config):
+    """Write ``results`` to ``--output``, if given, with the environment and the dataset size."""
+    if args.output:
+        write_results(args.output, {
+            'environment': environment(),
+            'config': {
+                'categories': args.categories,
+                'events': args.events,
+                'iterations': args.iterations,
+                **config,
+            },
+            'results': results,
+        })
@@ -0,0 +1,111 @@
+"""
+Response compression benchmark.
+
+Reports, per payload and encoder setting, bytes saved against CPU time
+spent, and the end-to-end latency of a 100-event page uncompressed,
+compressed on every request and served compressed from the response cache.
+What is compressed and how it revalidates is checked by
+``events.tests.test_compression``.
+
+    python -m benchmarks.compression --output compression.json
+
+Run it from the backend directory; the database is flushed like benchmarks.api.
+"""
+import gzip
+
+from benchmarks.common import (
+    argument_parser,
+    latency_stats,
+    save_results,
+    seed,
+    setup_django,
+    timed,
+    wsgi_request,
+)
+
+
+ENCODER_SETTINGS = [
+    ('gzip', 1), ('gzip', 6), ('gzip', 9),
+    ('br', 1), ('br', 4), ('br', 6), ('br', 11),
+]
+
+
+def get(application, path, query='', **headers):
+    headers = {name.replace('_', '-'): value for name, value in headers.items()}
+    return wsgi_request(application, 'GET', path, query, headers=headers)
+
+
+def encoder_costs(payloads, iterations):
+    import brotli
+
+    results = {}
+    for name, content in payloads.items():
+        results[name] = {'bytes': len(content)}
+        print(f'\n{name}: {len(content)} bytes')
+        print(f"{'encoder':<10}{'bytes':>10}{'saved':>8}{'p50':>11}{'MB/s':>9}")
+        for encoding, level in ENCODER_SETTINGS:
+            if encoding == 'br':
+                def encode():
+                    return brotli.compress(content, quality=level)
+            else:
+                def encode():
+                    return gzip.compress(content, compresslevel=level, mtime=0)
+            size = len(encode())
+            stats = latency_stats(timed(encode, iterations if level < 10 else 3))
+            throughput = len(content) / 1e6 / (stats['p50_ms'] / 1000)
+            results[name][f'{encoding}-{level}'] = dict(stats, bytes=size)
+            print(f"{encoding + '-' + str(level):<10}{size:>10}{1 - size / len(content):>8.0%}"
+                  f"{stats['p50_ms']:>8.3f} ms{throughput:>9.1f}")
+    return results
+
+
+def end_to_end(application, iterations):
+    from django.test.utils import override_settings
+
+    query = 'page_size=100'
+    results = {}
+    scenarios = [
+        ('uncompressed', {}, {'EVENTS_CACHE_TIMEOUT': 0}),
+        ('br, every request', {'Accept_Encoding': 'br'}, {'EVENTS_CACHE_TIMEOUT': 0}),
+        ('gzip, every request', {'Accept_Encoding': 'gzip'}, {'EVENTS_CACHE_TIMEOUT': 0}),
+        ('uncompressed, cached', {}, {'EVENTS_CACHE_TIMEOUT': 300}),
+        ('br, cached', {'Accept_Encoding': 'br'}, {'EVENTS_CACHE_TIMEOUT': 300}),
+    ]
+    print(f"\nGET /api/events/?{query} end to end")
+    for label, headers, overrides in scenarios:
+        with override_settings(**overrides):
+            stats = latency_stats(timed(lambda: get(application, '/api/events/', query, **headers), iterations))
+            _, _, content = get(application, '/api/events/', query, **headers)
+        results[label] = dict(stats, bytes=len(content))
+        print(f"{label:<22} p50 {stats['p50_ms']:7.3f} ms  p95 {stats['p95_ms']:7.3f} ms  {len(content):>7} bytes")
+    return results
+
+
+def main():
+    args = argument_parser(__doc__).parse_args()
+
+    setup_django(
+        args.database_url,
+        EVENTS_METRICS_ENABLED=False,
+        EVENTS_IMAGE_WORKERS=0,
+        CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+    )
+    seed(args.categories, args.events)
+
+    from event_management.wsgi import application
+
+    payloads = {}
+    for page_size in (20, 100):
+        for output in ('json', 'compact', 'msgpack'):
+            _, _, content = get(application, '/api/events/', f'page_size={page_size}&format={output}')
+            payloads[f'{page_size} events, {output}'] = content
+    _, _, payloads['export, ndjson'] = get(application, '/api/events/export/')
+    results = {
+        'encoders': encoder_costs(payloads, args.iterations),
+        'end_to_end': end_to_end(application, args.iterations),
+    }
+    save_results(args, results)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+"""
+Sparse fieldset and batch fetch benchmark.
+
+Times a 100-event page in full and with a few fields, and fetching 50 known
+events with ``?ids=`` against 50 detail requests. That the trimmed responses
+match the full ones and select only the columns they need is checked by
+``events.tests.test_fields``.
+
+    python -m benchmarks.fields --output fields.json
+
+Run it from the backend directory; the database is flushed like benchmarks.api.
+"""
+from benchmarks.common import argument_parser, latency_stats, save_results, seed, setup_django, timed, wsgi_request
+
+
+def benchmark(application, event_ids, iterations):
+    from django.test.utils import override_settings
+
+    results = {}
+    scenarios = [
+        ('100 events, all fields', '/api/events/', 'page_size=100'),
+        ('100 events, fields=id,title,date', '/api/events/', 'page_size=100&fields=id,title,date'),
+        ('100 events, omit=description', '/api/events/', 'page_size=100&omit=description'),
+        ('50 events, ?ids=', '/api/events/', 'ids=' + ','.join(event_ids[:50])),
+    ]
+    print('\nper request (cache off)')
+    with override_settings(EVENTS_CACHE_TIMEOUT=0):
+        for label, path, query in scenarios:
+            content = wsgi_request(application, 'GET', path, query)[2]
+            stats = latency_stats(timed(lambda: wsgi_request(application, 'GET', path, query), iterations))
+            results[label] = dict(stats, bytes=len(content))
+            print(f"{label:<34} p50 {stats['p50_ms']:7.3f} ms  p95 {stats['p95_ms']:7.3f} ms  {len(content):>7} bytes")
+
+        def details():
+            for pk in event_ids[:50]:
+                wsgi_request(application, 'GET', f'/api/events/{pk}/')
+        stats = latency_stats(timed(details, max(1, iterations // 10)))
+        results['50 events, 50 detail requests'] = stats
+        print(f"{'50 events, 50 detail requests':<34} p50 {stats['p50_ms']:7.3f} ms  p95 {stats['p95_ms']:7.3f} ms")
+    return results
+
+
+def main():
+    args = argument_parser(__doc__).parse_args()
+
+    setup_django(
+        args.database_url,
+        EVENTS_METRICS_ENABLED=False,
+        EVENTS_IMAGE_WORKERS=0,
+        CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+    )
+    seed(args.categories, args.events)
+
+    from event_management.wsgi import application
+    from events.models import Event
+
+    event_ids = [str(pk) for pk in Event.objects.order_by('?').values_list('pk', flat=True)[:50]]
+    save_results(args, benchmark(application, event_ids, args.iterations))
+
+
+if __name__ == '__main__':
+    main()
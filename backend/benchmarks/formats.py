@@ -0,0 +1,103 @@
+"""
+Size/speed benchmark for the API response formats.
+
+Compares, for event list pages of several sizes, the bytes JSON, compact
+JSON and MessagePack put on the wire (raw and gzipped), the server's encode
+time and a Python client's decode time. That every format decodes to the
+JSON payload is checked by ``events.tests.test_formats``.
+
+    python -m benchmarks.formats --output formats.json
+
+Run it from the backend directory; the database is flushed like benchmarks.api.
+"""
+import gzip
+import json
+
+from benchmarks.common import (
+    argument_parser,
+    latency_stats,
+    save_results,
+    seed,
+    setup_django,
+    timed,
+    wsgi_request,
+)
+
+
+FORMATS = {
+    'json': 'application/json',
+    'compact': 'application/vnd.events.compact+json',
+    'msgpack': 'application/msgpack',
+}
+
+
+def decode(name, content):
+    import msgpack
+
+    from events.renderers import expand_columns
+
+    if name == 'msgpack':
+        return msgpack.unpackb(content)
+    data = json.loads(content)
+    return expand_columns(data) if name == 'compact' else data
+
+
+def request(application, name, path, query=''):
+    status, _, content = wsgi_request(application, 'GET', path, query, headers={'Accept': FORMATS[name]})
+    if status != 200:
+        raise RuntimeError(f'{path}?{query} as {name} returned {status}')
+    return content
+
+
+def compare_sizes(application, page_size, iterations):
+    """Bytes and encode/decode times of one event list page in every format."""
+    from events.fastlist import FastJSONRenderer, event_rows, event_values
+    from events.models import Event
+    from events.renderers import CompactJSONRenderer, MessagePackRenderer
+
+    rows = list(event_rows(event_values(Event.objects.all())[:page_size]))
+    payload = {'count': Event.objects.count(), 'next': None, 'previous': None, 'results': rows}
+    renderers = {
+        # What the list endpoint uses for plain JSON.
+        'json': FastJSONRenderer(),
+        'compact': CompactJSONRenderer(),
+        'msgpack': MessagePackRenderer(),
+    }
+    results = {}
+    for name, renderer in renderers.items():
+        content = request(application, name, '/api/events/', f'page_size={page_size}')
+        encode = timed(lambda: renderer.render(payload), iterations)
+        decoded = timed(lambda: decode(name, content), iterations)
+        results[name] = {
+            'bytes': len(content),
+            'gzip_bytes': len(gzip.compress(content, 6)),
+            'encode': latency_stats(encode),
+            'decode': latency_stats(decoded),
+        }
+    return results
+
+
+def main():
+    args = argument_parser(__doc__).parse_args()
+
+    setup_django(
+        args.database_url, EVENTS_CACHE_TIMEOUT=0, EVENTS_METRICS_ENABLED=False, EVENTS_IMAGE_WORKERS=0
+    )
+    seed(args.categories, args.events)
+
+    from event_management.wsgi import application
+
+    results = {}
+    for page_size in (20, 100):
+        results[page_size] = compare_sizes(application, page_size, args.iterations)
+        print(f'\nEvent list page of {page_size}')
+        print(f"{'format':<9}{'bytes':>9}{'gzip':>9}{'encode p50':>13}{'decode p50':>13}")
+        for name, result in results[page_size].items():
+            print(f"{name:<9}{result['bytes']:>9}{result['gzip_bytes']:>9}"
+                  f"{result['encode']['p50_ms']:>10.3f} ms{result['decode']['p50_ms']:>10.3f} ms")
+
+    save_results(args, results)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,162 @@
+"""
+Image pipeline benchmark against a local stand-in image server.
+
+Starts an HTTP server on 127.0.0.1 serving a generated photo, slowed down
+by ``--server-delay``, then creates ``--images`` events pointing at distinct
+photo URLs through the API and reports how long the creates take (they
+return before the fetch), how long one photo takes to resize and how many
+images per second the background workers get through. What the pipeline
+does with bad and reused images is checked by ``events.tests.test_images``.
+
+    python -m benchmarks.images [--workers 2] [--images 40]
+
+Run it from the backend directory. The database and media files are
+throwaway.
+"""
+import argparse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import BytesIO
+import json
+import os
+import shutil
+import statistics
+import tempfile
+import threading
+import time
+
+from benchmarks.common import setup_django, wsgi_request
+
+
+def make_photo(size):
+    from PIL import Image, ImageDraw
+
+    image = Image.new('RGB', size, (40, 90, 160))
+    draw = ImageDraw.Draw(image)
+    # Some detail, so the encoder has real work to do.
+    for x in range(0, size[0], 37):
+        draw.line([(x, 0), (size[0] - x, size[1])], fill=(x % 255, 180, 90), width=3)
+    buffer = BytesIO()
+    image.save(buffer, format='JPEG', quality=90)
+    return buffer.getvalue()
+
+
+class ImageServer:
+    """The stand-in: the same photo under every /photos/ path."""
+
+    def __init__(self, delay):
+        self.delay = delay
+        self.photo = make_photo((2400, 1600))
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                time.sleep(server.delay)
+                status, content_type, body = 404, 'text/plain', b'not found'
+                if self.path.startswith('/photos/'):
+                    status, content_type, body = 200, 'image/jpeg', server.photo
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                try:
+                    self.wfile.write(body)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.base = f'http://127.0.0.1:{self.httpd.server_address[1]}'
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+
+def wait_for(pks, timeout):
+    """Wait until none of the events ``pks`` is pending; return their statuses."""
+    from events.models import Event
+
+    deadline = time.monotonic() + timeout
+    while True:
+        statuses = dict(Event.objects.filter(pk__in=pks).values_list('pk', 'image_status'))
+        if Event.IMAGE_PENDING not in statuses.values() or time.monotonic() > deadline:
+            return {str(pk): status for pk, status in statuses.items()}
+        time.sleep(0.05)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--workers', type=int, default=2, help='EVENTS_IMAGE_WORKERS')
+    parser.add_argument('--images', type=int, default=40, help='distinct photos to time')
+    parser.add_argument('--server-delay', type=float, default=0.3,
+                        help='seconds the stand-in server waits before answering')
+    parser.add_argument('--database', default='images.sqlite3')
+    args = parser.parse_args()
+
+    if os.path.exists(args.database):
+        os.remove(args.database)
+    media_root = tempfile.mkdtemp(prefix='event-thumbnails-')
+    setup_django(
+        f'sqlite:///{os.path.abspath(args.database)}',
+        EVENTS_CACHE_TIMEOUT=0,
+        EVENTS_IMAGE_WORKERS=args.workers,
+        EVENTS_IMAGE_ALLOW_PRIVATE_HOSTS=True,
+        EVENTS_IMAGE_MAX_BYTES=10 * 1024 * 1024,
+        MEDIA_ROOT=media_root,
+        CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+    )
+
+    from django.conf import settings
+
+    from event_management.wsgi import application
+    from events import images
+    from events.models import Category, Event
+
+    server = ImageServer(args.server_delay)
+    category = Category.objects.create(name='Images')
+
+    def create(path):
+        started = time.perf_counter()
+        status, _, content = wsgi_request(application, 'POST', '/api/events/', body={
+            'title': path, 'venue': 'Hall', 'date': '2030-01-01', 'time': '10:00',
+            'category': str(category.pk), 'image': server.base + path,
+        })
+        if status != 201:
+            raise RuntimeError(f'POST /api/events/ returned {status}')
+        return json.loads(content), time.perf_counter() - started
+
+    # Throughput: distinct URLs, so every one is fetched and resized.
+    started = time.perf_counter()
+    create_times = []
+    pks = []
+    for number in range(args.images):
+        body, elapsed = create(f'/photos/{number}.jpg')
+        create_times.append(elapsed)
+        pks.append(body['id'])
+    statuses = wait_for(pks, timeout=60 + args.images * 5)
+    elapsed = time.perf_counter() - started
+    ready = list(statuses.values()).count(Event.IMAGE_READY)
+
+    render_times = []
+    for _ in range(5):
+        render_started = time.perf_counter()
+        images.render_thumbnails(server.photo)
+        render_times.append(time.perf_counter() - render_started)
+
+    print()
+    print(f'workers:            {args.workers}')
+    print(f'server delay:       {args.server_delay * 1000:.0f} ms')
+    print(f'create (median):    {statistics.median(create_times) * 1000:.1f} ms')
+    print(f'resize 2400x1600:   {statistics.median(render_times) * 1000:.1f} ms '
+          f'({len(settings.EVENTS_THUMBNAIL_SIZES)} sizes, {settings.EVENTS_THUMBNAIL_FORMAT})')
+    print(f'throughput:         {args.images / elapsed:.1f} images/s '
+          f'({ready} of {args.images} ready in {elapsed:.1f} s)')
+
+    server.httpd.shutdown()
+    from django.db import connections
+    connections.close_all()
+    os.remove(args.database)
+    shutil.rmtree(media_root)
+
+
+if __name__ == '__main__':
+    main()
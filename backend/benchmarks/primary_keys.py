@@ -0,0 +1,119 @@
+"""
+Primary key benchmark: version 4 (random) against version 7 (time-ordered)
+UUIDs.
+
+For each kind of key, empties the database and inserts ``--rows`` events
+with ``bulk_create``, reporting rows per second and the size of the primary
+key index and of all the event indexes (SQLite's ``dbstat`` or PostgreSQL's
+``pg_relation_size``). That ``events.ids.uuid7`` makes valid, increasing ids
+and that old and new ids are served alongside each other is checked by
+``events.tests.test_primary_keys``.
+
+    python -m benchmarks.primary_keys --rows 200000 --output primary_keys.json
+
+Run it from the backend directory; the database is flushed once per kind of key.
+"""
+import argparse
+import datetime
+import time
+import uuid
+
+from benchmarks.common import environment, setup_django, write_results
+
+
+def index_sizes():
+    """Bytes of each index on the events table, or None where the database can't say."""
+    from django.db import connection
+
+    from events.models import Event
+
+    table = Event._meta.db_table
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            cursor.execute(
+                "SELECT name, SUM(pgsize) FROM dbstat WHERE name IN "
+                "(SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = %s) GROUP BY name",
+                [table],
+            )
+        elif connection.vendor == 'postgresql':
+            cursor.execute(
+                'SELECT indexrelid::regclass::text, pg_relation_size(indexrelid) FROM pg_index '
+                'WHERE indrelid = %s::regclass',
+                [table],
+            )
+        else:
+            return None
+        sizes = dict(cursor.fetchall())
+    # The primary key index: SQLite's automatic one, or PostgreSQL's <table>_pkey.
+    primary = next(name for name in sizes if name.startswith(f'sqlite_autoindex_{table}') or name == f'{table}_pkey')
+    return {'primary_key': sizes[primary], 'all': sum(sizes.values()), 'indexes': sizes}
+
+
+def insert(generate, rows, batch_size):
+    """Empty the database and insert ``rows`` events with ids from ``generate``; the seconds it took."""
+    from django.core.management import call_command
+
+    from events.models import Category, Event
+
+    call_command('flush', interactive=False, verbosity=0)
+    category = Category.objects.create(name='Benchmark')
+    start = datetime.date.today()
+    started = time.perf_counter()
+    for offset in range(0, rows, batch_size):
+        Event.objects.bulk_create([
+            Event(
+                id=generate(),
+                title=f'Event {i}',
+                venue=f'Venue {i % 500}',
+                date=start + datetime.timedelta(days=i % 730),
+                time=datetime.time(9 + i % 10, 0),
+                category=category,
+            )
+            for i in range(offset, min(rows, offset + batch_size))
+        ])
+    return time.perf_counter() - started
+
+
+def benchmark(rows, batch_size):
+    from events.ids import uuid7
+
+    results = {}
+    print()
+    for label, generate in (('uuid4', uuid.uuid4), ('uuid7', uuid7)):
+        seconds = insert(generate, rows, batch_size)
+        sizes = index_sizes()
+        results[label] = {'seconds': round(seconds, 2), 'rows_per_second': round(rows / seconds), 'index_bytes': sizes}
+        line = f'{label}: {rows} rows in {seconds:6.2f} s ({rows / seconds:8.0f} rows/s)'
+        if sizes is not None:
+            line += (f"  primary key index {sizes['primary_key'] / 1e6:6.1f} MB,"
+                     f"  all indexes {sizes['all'] / 1e6:6.1f} MB")
+        print(line)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--database-url', help='Default: sqlite:///benchmark.sqlite3')
+    parser.add_argument('--rows', type=int, default=200_000, help='Events inserted with each kind of key')
+    parser.add_argument('--batch-size', type=int, default=1000, help='Rows per bulk_create')
+    parser.add_argument('--output', help='Write the results to this JSON file')
+    args = parser.parse_args()
+
+    setup_django(
+        args.database_url,
+        EVENTS_METRICS_ENABLED=False,
+        EVENTS_IMAGE_WORKERS=0,
+        CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+    )
+
+    results = benchmark(args.rows, args.batch_size)
+    if args.output:
+        write_results(args.output, {
+            'environment': environment(),
+            'config': {'rows': args.rows, 'batch_size': args.batch_size},
+            'results': results,
+        })
+
+
+if __name__ == '__main__':
+    main()
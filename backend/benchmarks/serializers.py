@@ -0,0 +1,92 @@
+"""
+Benchmark for the fast event list path.
+
+Times event list requests with EVENTS_FAST_LIST on and off, end to end
+through the WSGI application and for serialization + rendering alone. That
+both paths render the same bytes is checked by ``events.tests.test_fastlist``.
+
+    python -m benchmarks.serializers --events 20000 --output serializers.json
+
+Run it from the backend directory; the database is flushed like benchmarks.api.
+"""
+from benchmarks.common import (
+    argument_parser,
+    latency_stats,
+    save_results,
+    seed,
+    setup_django,
+    timed,
+    wsgi_request,
+)
+
+
+def fetch(application, query, fast):
+    from django.test.utils import override_settings
+
+    with override_settings(EVENTS_FAST_LIST=fast):
+        status, headers, content = wsgi_request(application, 'GET', '/api/events/', query)
+    if status != 200:
+        raise RuntimeError(f'/api/events/?{query} returned {status}')
+    return headers, content
+
+
+def serialization_only(page_size, iterations):
+    """Time serialization + rendering of one page, with the rows already fetched."""
+    from rest_framework.renderers import JSONRenderer
+
+    from events.fastlist import FastJSONRenderer, event_rows, event_values
+    from events.models import Event
+    from events.serializers import EventSerializer
+
+    queryset = Event.objects.select_related('category')[:page_size]
+    instances = list(queryset)
+    rows = list(event_values(queryset))
+    renderer, fast_renderer = JSONRenderer(), FastJSONRenderer()
+
+    def slow():
+        return renderer.render(EventSerializer(instances, many=True).data)
+
+    def fast():
+        return fast_renderer.render(list(event_rows(rows)))
+
+    return latency_stats(timed(slow, iterations)), latency_stats(timed(fast, iterations))
+
+
+def main():
+    args = argument_parser(__doc__).parse_args()
+
+    setup_django(
+        args.database_url, EVENTS_CACHE_TIMEOUT=0, EVENTS_METRICS_ENABLED=False, EVENTS_IMAGE_WORKERS=0
+    )
+    seed(args.categories, args.events)
+
+    from event_management.wsgi import application
+
+    results = {}
+    for page_size in (20, 100):
+        query = f'page_size={page_size}'
+        for label, fast in (('serializer', False), ('fast', True)):
+            name = f'wsgi_{label}_{page_size}'
+            results[name] = latency_stats(
+                timed(lambda: fetch(application, query, fast), args.iterations)
+            )
+            print_row(name, results[name])
+        slow, fast = serialization_only(page_size, args.iterations)
+        results[f'render_serializer_{page_size}'] = slow
+        results[f'render_fast_{page_size}'] = fast
+        print_row(f'render_serializer_{page_size}', slow)
+        print_row(f'render_fast_{page_size}', fast)
+        print(f'  serialization speedup at {page_size} rows: '
+              f"{slow['p50_ms'] / fast['p50_ms']:.1f}x, end to end: "
+              f"{results[f'wsgi_serializer_{page_size}']['p50_ms'] / results[f'wsgi_fast_{page_size}']['p50_ms']:.1f}x")
+
+    save_results(args, results)
+
+
+def print_row(name, stats):
+    print(f"{name:<24} p50 {stats['p50_ms']:8.2f} ms  p95 {stats['p95_ms']:8.2f} ms  "
+          f"{stats['rps']:8.1f} /s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,123 @@
+"""
+Cold-start benchmark: settings import, app registry population, WSGI handler
+load and the first request, each measured in a fresh interpreter.
+
+    python -m benchmarks.startup --runs 10 --output startup.json
+
+Run it from the backend directory against a migrated database
+(``python manage.py init_db``).
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+PHASES = ['settings_import', 'app_registry', 'wsgi_load', 'first_request', 'total']
+
+
+def measure_once(path):
+    """Runs in the child interpreter; prints one JSON result line."""
+    started = time.perf_counter()
+    import importlib
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'event_management.settings')
+    importlib.import_module(os.environ['DJANGO_SETTINGS_MODULE'])
+    settings_done = time.perf_counter()
+
+    from django.db import connections
+    queries = []
+
+    def count_queries(execute, sql, params, many, context):
+        queries.append(sql)
+        return execute(sql, params, many, context)
+
+    for alias in connections:
+        connections[alias].execute_wrappers.append(count_queries)
+
+    import django
+    django.setup()
+    setup_done = time.perf_counter()
+
+    from event_management.wsgi import application
+    wsgi_done = time.perf_counter()
+    setup_queries = len(queries)
+
+    from io import BytesIO
+    environ = {
+        'REQUEST_METHOD': 'GET',
+        'PATH_INFO': path,
+        'QUERY_STRING': '',
+        'SERVER_NAME': 'localhost',
+        'SERVER_PORT': '80',
+        'HTTP_HOST': 'localhost',
+        'wsgi.url_scheme': 'http',
+        'wsgi.input': BytesIO(),
+        'wsgi.errors': sys.stderr,
+    }
+    status = []
+    body = application(environ, lambda s, headers, exc_info=None: status.append(s))
+    b''.join(body)
+    request_done = time.perf_counter()
+
+    print(json.dumps({
+        'settings_import': settings_done - started,
+        'app_registry': setup_done - settings_done,
+        'wsgi_load': wsgi_done - setup_done,
+        'first_request': request_done - wsgi_done,
+        'total': request_done - started,
+        'setup_queries': setup_queries,
+        'status': status[0] if status else None,
+    }))
+
+
+def summarize(runs):
+    summary = {}
+    for phase in PHASES:
+        values = [run[phase] * 1000 for run in runs]
+        summary[phase] = {
+            'median_ms': round(statistics.median(values), 2),
+            'min_ms': round(min(values), 2),
+            'max_ms': round(max(values), 2),
+        }
+    summary['setup_queries'] = max(run['setup_queries'] for run in runs)
+    summary['status'] = runs[-1]['status']
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--path', default='/api/events/', help='URL of the first request')
+    parser.add_argument('--output', help='Write the results to this JSON file')
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        measure_once(args.path)
+        return
+
+    runs = []
+    for _ in range(args.runs):
+        result = subprocess.run(
+            [sys.executable, '-m', 'benchmarks.startup', '--child', '--path', args.path],
+            capture_output=True, text=True, check=True,
+        )
+        runs.append(json.loads(result.stdout.strip().splitlines()[-1]))
+
+    summary = summarize(runs)
+    for phase in PHASES:
+        stats = summary[phase]
+        print(f"{phase:<16} median {stats['median_ms']:>8.2f} ms  "
+              f"min {stats['min_ms']:>8.2f} ms  max {stats['max_ms']:>8.2f} ms")
+    print(f"queries before the first request: {summary['setup_queries']}")
+    print(f"first request status: {summary['status']}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'runs': len(runs), 'path': args.path, 'summary': summary}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
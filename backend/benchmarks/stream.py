@@ -0,0 +1,155 @@
+"""
+Fan-out benchmark for the change stream (/api/events/stream/).
+
+Opens ``--subscribers`` streams at once through the ASGI application and
+reports, per write, the time until every subscriber has it and how many
+times the changes feed was read. What the streams deliver is checked by
+``events.tests.test_stream``.
+
+    python -m benchmarks.stream [--subscribers 10 100 500]
+
+Run it from the backend directory; the database is flushed like benchmarks.api.
+"""
+import asyncio
+import json
+import statistics
+import time
+from types import SimpleNamespace
+
+from benchmarks.common import argument_parser, asgi_request, save_results, seed, setup_django, wsgi_request
+
+
+class StreamClient:
+    """Reads one stream through the ASGI application, parsing messages as they arrive."""
+
+    def __init__(self, application, query='', headers=None):
+        self.messages = []
+        self.heartbeats = 0
+        self.buffer = b''
+        self.task = asyncio.ensure_future(asgi_request(
+            application, 'GET', '/api/events/stream/', query,
+            headers=dict({'Accept': 'text/event-stream'}, **(headers or {})),
+            on_body=self.feed,
+        ))
+
+    def feed(self, chunk):
+        self.buffer += chunk
+        while b'\n\n' in self.buffer:
+            raw, self.buffer = self.buffer.split(b'\n\n', 1)
+            fields = {}
+            for line in raw.decode('utf-8').split('\n'):
+                name, _, value = line.partition(': ')
+                fields[name] = value
+            if set(fields) == {''}:
+                self.heartbeats += 1
+                continue
+            self.messages.append(SimpleNamespace(
+                at=time.perf_counter(), event=fields.get('event'), id=fields.get('id'),
+                data=json.loads(fields['data']),
+            ))
+
+    async def wait_for(self, predicate, timeout=3.0):
+        deadline = time.perf_counter() + timeout
+        while time.perf_counter() < deadline:
+            for message in self.messages:
+                if predicate(message):
+                    return message
+            await asyncio.sleep(0.002)
+        return None
+
+
+def api(application, method, path, body=None):
+    status, _, content = wsgi_request(application, method, path, body=body)
+    return status, json.loads(content) if content else None
+
+
+async def write(application, method, path, body=None):
+    """An API write from another thread, as a concurrent request would be."""
+    return await asyncio.to_thread(api, application, method, path, body)
+
+
+def has_event(pk):
+    return lambda message: message.event == 'changes' and any(
+        event['id'] == pk for event in message.data['events']
+    )
+
+
+async def fan_out(asgi_application, wsgi_application, category, subscribers, writes):
+    from events import stream
+
+    reads = []
+    read_changes = stream.read_changes
+
+    def counting(*args, **kwargs):
+        reads.append(1)
+        return read_changes(*args, **kwargs)
+
+    stream.read_changes = counting
+    clients = [StreamClient(asgi_application) for _ in range(subscribers)]
+    for client in clients:
+        await client.wait_for(lambda message: message.event == 'ready', timeout=60)
+    latencies = []
+    reads.clear()
+    for number in range(writes):
+        started = time.perf_counter()
+        _, created = await write(wsgi_application, 'POST', '/api/events/', {
+            'title': f'Fan-out {number}', 'venue': 'Hall', 'date': '2030-01-01', 'time': '10:00',
+            'category': str(category.pk),
+        })
+        messages = [await client.wait_for(has_event(created['id']), timeout=30) for client in clients]
+        if None in messages:
+            raise RuntimeError(f'a subscriber missed event {created["id"]}')
+        latencies.append(max(message.at for message in messages) - started)
+    feed_reads = len(reads)
+    stream.read_changes = read_changes
+    for client in clients:
+        client.task.cancel()
+    await asyncio.gather(*(client.task for client in clients), return_exceptions=True)
+    return {
+        'subscribers': subscribers,
+        'all_delivered_p50_ms': statistics.median(latencies) * 1000,
+        'all_delivered_max_ms': max(latencies) * 1000,
+        'feed_reads_per_write': feed_reads / writes,
+    }
+
+
+def main():
+    parser = argument_parser(__doc__)
+    parser.add_argument('--subscribers', type=int, nargs='+', default=[10, 100, 500])
+    parser.add_argument('--writes', type=int, default=10)
+    args = parser.parse_args()
+
+    setup_django(
+        args.database_url,
+        EVENTS_METRICS_ENABLED=False,
+        EVENTS_IMAGE_WORKERS=0,
+        EVENTS_STREAM_POLL_INTERVAL=0.2,
+        EVENTS_STREAM_MAX_AGE=600,
+        EVENTS_STREAM_MAX_SUBSCRIBERS=max(args.subscribers) + 10,
+        CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+    )
+    seed(args.categories, args.events)
+
+    from event_management.asgi import application as asgi_application
+    from event_management.wsgi import application as wsgi_application
+    from events.models import Category, Event
+
+    category = Category.objects.order_by('name').first()
+    latest = Event.objects.order_by('-created_at').values_list('created_at', flat=True).first()
+    results = []
+    try:
+        print(f"{'subscribers':>11}{'all delivered p50':>19}{'max':>10}{'feed reads/write':>18}")
+        for subscribers in args.subscribers:
+            result = asyncio.run(fan_out(asgi_application, wsgi_application, category, subscribers, args.writes))
+            results.append(result)
+            print(f"{subscribers:>11}{result['all_delivered_p50_ms']:>16.1f} ms"
+                  f"{result['all_delivered_max_ms']:>7.1f} ms{result['feed_reads_per_write']:>18.1f}")
+    finally:
+        # Leave the seeded data as it was.
+        Event.objects.filter(created_at__gt=latest).delete()
+
+    save_results(args, results, subscribers=args.subscribers, writes=args.writes)
+
+
+if __name__ == '__main__':
+    main()
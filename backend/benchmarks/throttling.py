@@ -0,0 +1,76 @@
+"""
+Rate limiting overhead benchmark.
+
+Times a cached detail read, the cheapest request the API serves, with
+throttling off and on with each counter store, and one ``allow_request``
+call on its own. The limits themselves are checked by
+``events.tests.test_throttling``.
+
+    python -m benchmarks.throttling --output throttling.json
+
+Run it from the backend directory; the database is flushed like benchmarks.api.
+"""
+from benchmarks.common import (
+    argument_parser,
+    latency_stats,
+    save_results,
+    seed,
+    setup_django,
+    timed,
+    wsgi_request,
+)
+
+
+def overhead(application, event_id, iterations):
+    from django.test.utils import override_settings
+    from rest_framework.request import Request
+    from rest_framework.test import APIRequestFactory
+
+    from events.throttling import RequestRateThrottle
+
+    path = f'/api/events/{event_id}/'
+    rates = {'requests': f'{iterations * 100}/min', 'search': '1000000/min', 'write': '1000000/min'}
+    scenarios = [
+        ('off', {'EVENTS_THROTTLE_ENABLED': False}),
+        ('local store', {'EVENTS_THROTTLE_ENABLED': True, 'EVENTS_THROTTLE_STORE': 'local'}),
+        ('cache store', {'EVENTS_THROTTLE_ENABLED': True, 'EVENTS_THROTTLE_STORE': 'cache'}),
+    ]
+    results = {}
+    print(f'\nGET {path} (cached) per request')
+    for label, overrides in scenarios:
+        with override_settings(EVENTS_THROTTLE_RATES=rates, **overrides):
+            wsgi_request(application, 'GET', path)
+            stats = latency_stats(timed(lambda: wsgi_request(application, 'GET', path), iterations))
+        results[label] = stats
+        print(f"{label:<14} p50 {stats['p50_ms']:7.3f} ms  p95 {stats['p95_ms']:7.3f} ms")
+
+    request = Request(APIRequestFactory().get('/api/events/'))
+    print('\nRequestRateThrottle.allow_request alone')
+    for label, overrides in scenarios[1:]:
+        with override_settings(EVENTS_THROTTLE_RATES=rates, **overrides):
+            stats = latency_stats(timed(lambda: RequestRateThrottle().allow_request(request, None), iterations))
+        results[f'allow_request, {label}'] = stats
+        print(f"{label:<14} p50 {stats['p50_ms'] * 1000:7.1f} us  p95 {stats['p95_ms'] * 1000:7.1f} us")
+    return results
+
+
+def main():
+    args = argument_parser(__doc__, iterations=2000).parse_args()
+
+    setup_django(
+        args.database_url,
+        EVENTS_METRICS_ENABLED=False,
+        EVENTS_IMAGE_WORKERS=0,
+        CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+    )
+    seed(args.categories, args.events)
+
+    from event_management.wsgi import application
+    from events.models import Event
+
+    event_id = Event.objects.values_list('pk', flat=True).first()
+    save_results(args, overhead(application, event_id, args.iterations))
+
+
+if __name__ == '__main__':
+    main()
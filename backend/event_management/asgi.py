@@ -1,6 +1,24 @@
 import os
-from django.core.asgi import get_asgi_application
+
+import django
+from django.core.handlers.asgi import ASGIHandler
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'event_management.settings')
+# Django cannot reuse a database connection across async requests, so
+# persistent connections would only pile up (see "Running under ASGI" in the
+# README).
+os.environ.setdefault('CONN_MAX_AGE', '0')
+
+
+class EventsASGIHandler(ASGIHandler):
+    """Route ASGI requests through event_management.asgi_urls (async reads)."""
+
+    def create_request(self, scope, body_file):
+        request, error_response = super().create_request(scope, body_file)
+        if request is not None:
+            request.urlconf = 'event_management.asgi_urls'
+        return request, error_response
+
 
-application = get_asgi_application()
\ No newline at end of file
+django.setup(set_prefix=False)
+application = EventsASGIHandler()
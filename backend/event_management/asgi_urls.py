@@ -0,0 +1,10 @@
+from django.urls import path, include
+
+from events.urls import async_urlpatterns
+from .urls import urlpatterns as wsgi_urlpatterns
+
+# The WSGI routes, with the events API's list/detail reads served by async
+# views. Anything the async patterns do not match falls through unchanged.
+urlpatterns = [
+    path('api/', include(async_urlpatterns)),
+] + wsgi_urlpatterns
@@ -0,0 +1,61 @@
+"""
+DATABASES built from the environment, shared by settings and
+production_settings so both connect the same way.
+
+``DATABASE_URL`` is the primary (SQLite in ``BASE_DIR`` when unset) and
+``DATABASE_REPLICA_URLS`` an optional comma-separated list of read replicas,
+configured as ``replica_1``, ``replica_2``... PostgreSQL connections go
+through the pooling backend in ``events.db.postgresql_pool`` unless
+``DATABASE_POOL=False``, which falls back to persistent per-thread
+connections (``CONN_MAX_AGE``).
+"""
+import os
+
+import dj_database_url
+
+
+POOL_ENGINE = 'events.db.postgresql_pool'
+
+
+def database_from_url(url, environ=os.environ):
+    config = dj_database_url.parse(url, conn_max_age=int(environ.get('CONN_MAX_AGE', 600)))
+    if config['ENGINE'] != 'django.db.backends.postgresql':
+        return config
+    config.setdefault('OPTIONS', {})
+    if environ.get('DATABASE_SSL_REQUIRE', 'True') == 'True':
+        config['OPTIONS']['sslmode'] = 'require'
+    if environ.get('DATABASE_POOL', 'True') == 'True':
+        config['ENGINE'] = POOL_ENGINE
+        # The pool keeps connections open; Django closes (returns) them after
+        # every request.
+        config['CONN_MAX_AGE'] = 0
+        config['OPTIONS']['pool'] = {
+            'max_size': int(environ.get('DATABASE_POOL_MAX_SIZE', 10)),
+            'timeout': float(environ.get('DATABASE_POOL_TIMEOUT', 10)),
+            'max_idle': float(environ.get('DATABASE_POOL_MAX_IDLE', 300)),
+        }
+    return config
+
+
+def databases_from_env(base_dir, environ=os.environ):
+    """Return ``(DATABASES, replica aliases)``."""
+    url = environ.get('DATABASE_URL')
+    if url:
+        databases = {'default': database_from_url(url, environ)}
+    else:
+        databases = {
+            'default': {
+                'ENGINE': 'django.db.backends.sqlite3',
+                'NAME': base_dir / 'db.sqlite3',
+            }
+        }
+
+    replica_urls = [u.strip() for u in environ.get('DATABASE_REPLICA_URLS', '').split(',') if u.strip()]
+    replicas = []
+    for number, replica_url in enumerate(replica_urls, start=1):
+        alias = f'replica_{number}'
+        databases[alias] = database_from_url(replica_url, environ)
+        # Test runs read the primary instead of an (empty) test replica.
+        databases[alias]['TEST'] = {'MIRROR': 'default'}
+        replicas.append(alias)
+    return databases, replicas
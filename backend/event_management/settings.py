@@ -137,7 +137,8 @@
 
 import os
 from pathlib import Path
-import dj_database_url
+
+from .databases import databases_from_env
 
 # --------------------------------------------------
 # BASE DIRECTORY
@@ -183,9 +184,13 @@ INSTALLED_APPS = [
 # MIDDLEWARE
 # --------------------------------------------------
 MIDDLEWARE = [
+    # First, so the recorded latency covers every other middleware too
+    "events.metrics.MetricsMiddleware",
+    # Outside everything that builds the body
+    "events.compression.CompressionMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.security.SecurityMiddleware",
-    'whitenoise.middleware.WhiteNoiseMiddleware',
+    'events.middleware.WhiteNoiseMiddleware',
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -226,26 +231,185 @@ TEMPLATES = [
 # --------------------------------------------------
 # DATABASE CONFIGURATION (LOCAL + PRODUCTION SAFE)
 # --------------------------------------------------
-DATABASE_URL = os.environ.get('DATABASE_URL')
+# DATABASE_URL (SQLite when unset), DATABASE_REPLICA_URLS, DATABASE_POOL*,
+# CONN_MAX_AGE: see event_management/databases.py.
+DATABASES, EVENTS_READ_REPLICAS = databases_from_env(BASE_DIR)
+
+DATABASE_ROUTERS = ["events.routers.ReplicaRouter"]
+
+# Seconds after a write during which every events read goes to the primary,
+# so clients (and the response cache) never see a replica that is behind.
+EVENTS_REPLICA_LAG = float(os.environ.get("EVENTS_REPLICA_LAG", 5))
+
 
-if DATABASE_URL:
-    # Production: Use PostgreSQL from Render
-    DATABASES = {
-        'default': dj_database_url.parse(
-            DATABASE_URL,
-            conn_max_age=600,
-            ssl_require=True
-        )
+# --------------------------------------------------
+# CACHE
+# --------------------------------------------------
+# Use a shared cache (Redis) when several workers serve traffic, so response
+# cache invalidation is seen by all of them.
+REDIS_URL = os.environ.get("REDIS_URL")
+
+if REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+        }
     }
 else:
-    # Development: Use SQLite
-    DATABASES = {
-        'default': {
-            'ENGINE': 'django.db.backends.sqlite3',
-            'NAME': BASE_DIR / 'db.sqlite3',
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
         }
     }
 
+# Seconds a rendered event/category response stays cached (0 disables it).
+# Off by default without REDIS_URL: a worker's local cache never hears of
+# writes made by the others, and would serve their stale responses. ETag and
+# Last-Modified revalidation (304s) work either way.
+EVENTS_CACHE_TIMEOUT = int(os.environ.get("EVENTS_CACHE_TIMEOUT", 300 if REDIS_URL else 0))
+
+# Seconds each worker may keep its copy of the categories table; category
+# writes invalidate it at once through the cache above (0 disables it)
+EVENTS_CATEGORY_CACHE_TIMEOUT = int(os.environ.get("EVENTS_CATEGORY_CACHE_TIMEOUT", 300))
+
+
+# --------------------------------------------------
+# RESPONSE COMPRESSION
+# --------------------------------------------------
+# gzip/brotli for API responses; turn it off when a proxy in front compresses
+EVENTS_COMPRESSION_ENABLED = os.environ.get("EVENTS_COMPRESSION_ENABLED", "True") == "True"
+
+# Smaller responses are sent as they are
+EVENTS_COMPRESSION_MIN_SIZE = int(os.environ.get("EVENTS_COMPRESSION_MIN_SIZE", 1024))
+
+# Compression effort: gzip 1-9, brotli 0-11
+EVENTS_GZIP_LEVEL = int(os.environ.get("EVENTS_GZIP_LEVEL", 6))
+EVENTS_BROTLI_QUALITY = int(os.environ.get("EVENTS_BROTLI_QUALITY", 4))
+
+
+# --------------------------------------------------
+# RATE LIMITING
+# --------------------------------------------------
+EVENTS_THROTTLE_ENABLED = os.environ.get("EVENTS_THROTTLE_ENABLED", "True") == "True"
+
+# Per-client budgets, "<count>/<sec|min|hour|day>" (empty lifts one): every
+# request, searches and exports, and writes
+EVENTS_THROTTLE_RATES = {
+    "requests": os.environ.get("EVENTS_THROTTLE_RATE", "600/min"),
+    "search": os.environ.get("EVENTS_THROTTLE_SEARCH_RATE", "120/min"),
+    "write": os.environ.get("EVENTS_THROTTLE_WRITE_RATE", "60/min"),
+}
+
+# Where the counters live: "cache" (CACHES, shared between workers with
+# REDIS_URL) or "local" (this process only)
+EVENTS_THROTTLE_STORE = os.environ.get("EVENTS_THROTTLE_STORE", "cache")
+
+
+# --------------------------------------------------
+# BULK EVENT ENDPOINTS
+# --------------------------------------------------
+# Items accepted per /api/events/bulk/ request, and rows per INSERT/UPDATE batch
+EVENTS_BULK_MAX_ITEMS = int(os.environ.get("EVENTS_BULK_MAX_ITEMS", 1000))
+EVENTS_BULK_BATCH_SIZE = int(os.environ.get("EVENTS_BULK_BATCH_SIZE", 500))
+
+# Serve /api/events/ lists from values() rows instead of EventSerializer
+EVENTS_FAST_LIST = os.environ.get("EVENTS_FAST_LIST", "True") == "True"
+
+# Rows fetched per database round trip by /api/events/export/
+EVENTS_EXPORT_CHUNK_SIZE = int(os.environ.get("EVENTS_EXPORT_CHUNK_SIZE", 2000))
+
+
+# --------------------------------------------------
+# DELTA SYNC (/api/events/changes/)
+# --------------------------------------------------
+# Seconds the last sync token trails the clock, so rows committed late (or
+# not yet on the replica the next call reads) are still picked up
+EVENTS_SYNC_WINDOW = float(os.environ.get("EVENTS_SYNC_WINDOW", max(5, EVENTS_REPLICA_LAG)))
+
+# Changes returned per call at most
+EVENTS_SYNC_MAX_LIMIT = int(os.environ.get("EVENTS_SYNC_MAX_LIMIT", 1000))
+
+# Days deletions are remembered; older tokens get 410 Gone
+EVENTS_TOMBSTONE_RETENTION_DAYS = int(os.environ.get("EVENTS_TOMBSTONE_RETENTION_DAYS", 30))
+
+
+# --------------------------------------------------
+# CHANGE STREAM (/api/events/stream/)
+# --------------------------------------------------
+# Seconds between checks for writes made by other workers (through the
+# shared cache); writes in the same worker are pushed at once
+EVENTS_STREAM_POLL_INTERVAL = float(os.environ.get("EVENTS_STREAM_POLL_INTERVAL", 1))
+
+# Seconds between keep-alive comments on an idle stream, and before a stream
+# ends (EventSource reconnects and resumes)
+EVENTS_STREAM_HEARTBEAT = float(os.environ.get("EVENTS_STREAM_HEARTBEAT", 15))
+EVENTS_STREAM_MAX_AGE = float(os.environ.get("EVENTS_STREAM_MAX_AGE", 300))
+
+# Open streams per worker process at most
+EVENTS_STREAM_MAX_SUBSCRIBERS = int(os.environ.get("EVENTS_STREAM_MAX_SUBSCRIBERS", 1000))
+
+
+# --------------------------------------------------
+# AUTOCOMPLETE (/api/autocomplete/)
+# --------------------------------------------------
+# Events whose title and venue each worker keeps in its in-memory prefix
+# index (newest first; about 400 bytes apiece)
+EVENTS_AUTOCOMPLETE_MAX_EVENTS = int(os.environ.get("EVENTS_AUTOCOMPLETE_MAX_EVENTS", 1_000_000))
+
+# Seconds between checks for writes made by other workers; writes in the
+# same worker are picked up by the next request
+EVENTS_AUTOCOMPLETE_REFRESH_INTERVAL = float(os.environ.get("EVENTS_AUTOCOMPLETE_REFRESH_INTERVAL", 1))
+
+
+# --------------------------------------------------
+# EVENT IMAGE THUMBNAILS
+# --------------------------------------------------
+# Thumbnail widths in pixels by name, e.g. "small:320,medium:640,large:1280"
+EVENTS_THUMBNAIL_SIZES = {
+    name: int(width)
+    for name, width in (
+        size.split(":")
+        for size in os.environ.get("EVENTS_THUMBNAIL_SIZES", "small:320,medium:640,large:1280").split(",")
+    )
+}
+EVENTS_THUMBNAIL_FORMAT = os.environ.get("EVENTS_THUMBNAIL_FORMAT", "WEBP")
+
+# Background threads per process that fetch and resize images (0 leaves
+# them to "python manage.py process_images")
+EVENTS_IMAGE_WORKERS = int(os.environ.get("EVENTS_IMAGE_WORKERS", 2))
+
+# Limits on the remote image: seconds per request, bytes and pixels
+EVENTS_IMAGE_TIMEOUT = float(os.environ.get("EVENTS_IMAGE_TIMEOUT", 10))
+EVENTS_IMAGE_MAX_BYTES = int(os.environ.get("EVENTS_IMAGE_MAX_BYTES", 10 * 1024 * 1024))
+EVENTS_IMAGE_MAX_PIXELS = int(os.environ.get("EVENTS_IMAGE_MAX_PIXELS", 40_000_000))
+
+# Fetch images from loopback/private addresses (local development only)
+EVENTS_IMAGE_ALLOW_PRIVATE_HOSTS = os.environ.get("EVENTS_IMAGE_ALLOW_PRIVATE_HOSTS", "False") == "True"
+
+
+# --------------------------------------------------
+# REQUEST METRICS (/metrics)
+# --------------------------------------------------
+EVENTS_METRICS_ENABLED = os.environ.get("EVENTS_METRICS_ENABLED", "True") == "True"
+
+# Who may scrape /metrics (anyone else gets a 404): clients sending
+# "Authorization: Bearer <EVENTS_METRICS_TOKEN>", and clients connecting from
+# these addresses or networks, e.g. "127.0.0.1,::1,10.0.0.0/8"
+EVENTS_METRICS_TOKEN = os.environ.get("EVENTS_METRICS_TOKEN", "")
+EVENTS_METRICS_ALLOWED_IPS = [
+    address.strip()
+    for address in os.environ.get("EVENTS_METRICS_ALLOWED_IPS", "127.0.0.1,::1").split(",")
+    if address.strip()
+]
+
+# Share of requests whose SQL and serialization time is recorded (0.0-1.0);
+# latency and status are recorded for every request
+EVENTS_METRICS_SAMPLE_RATE = float(os.environ.get("EVENTS_METRICS_SAMPLE_RATE", 1.0))
+
+# Log a possible N+1 when one SQL statement runs this many times in a request
+EVENTS_METRICS_N_PLUS_ONE_THRESHOLD = int(os.environ.get("EVENTS_METRICS_N_PLUS_ONE_THRESHOLD", 10))
+
 
 # --------------------------------------------------
 # PASSWORD VALIDATION
@@ -276,6 +440,15 @@ STATIC_ROOT = os.path.join(BASE_DIR, "staticfiles")
 STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 
 
+# --------------------------------------------------
+# MEDIA FILES (event image thumbnails)
+# --------------------------------------------------
+# Point MEDIA_URL at wherever MEDIA_ROOT is served from (a CDN or the web
+# server); Django only serves it itself when DEBUG is on
+MEDIA_URL = os.environ.get("MEDIA_URL", "/media/")
+MEDIA_ROOT = os.environ.get("MEDIA_ROOT", os.path.join(BASE_DIR, "media"))
+
+
 # --------------------------------------------------
 # DEFAULT PRIMARY KEY
 # --------------------------------------------------
@@ -291,6 +464,9 @@ REST_FRAMEWORK = {
     "DEFAULT_RENDERER_CLASSES": [
         "rest_framework.renderers.JSONRenderer",
     ],
+    # Proxies in front that append to X-Forwarded-For; rate limits key
+    # clients by the address before them
+    "NUM_PROXIES": int(os.environ["NUM_PROXIES"]) if os.environ.get("NUM_PROXIES") else None,
 }
 
 
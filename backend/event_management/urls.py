@@ -1,7 +1,11 @@
+from django.conf import settings
+from django.conf.urls.static import static
 from django.contrib import admin
 from django.urls import path, include
 from django.http import JsonResponse
 
+from events.metrics import metrics_view
+
 def api_root(request):
     return JsonResponse({
         'message': 'Event Management API',
@@ -9,6 +13,7 @@ def api_root(request):
         'endpoints': {
             'events': '/api/events/',
             'categories': '/api/categories/',
+            'autocomplete': '/api/autocomplete/',
             'admin': '/admin/',
         },
         'status': 'running'
@@ -18,4 +23,8 @@ urlpatterns = [
     path('', api_root, name='api_root'),
     path('admin/', admin.site.urls),
     path('api/', include('events.urls')),
-]
\ No newline at end of file
+    path('metrics', metrics_view, name='metrics'),
+]
+
+# Event image thumbnails; production serves MEDIA_URL elsewhere.
+urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
@@ -8,14 +8,18 @@ class CategoryAdmin(admin.ModelAdmin):
     search_fields = ['name']
     readonly_fields = ['id', 'created_at', 'updated_at']
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).with_event_counts()
+
     def event_count(self, obj):
-        return obj.events.count()
+        return obj.num_events
     event_count.short_description = 'Events'
+    event_count.admin_order_field = 'num_events'
 
 
 @admin.register(Event)
 class EventAdmin(admin.ModelAdmin):
     list_display = ['title', 'category', 'venue', 'date', 'time', 'created_at']
-    list_filter = ['category', 'date', 'created_at']
+    list_filter = ['category', 'date', 'image_status', 'created_at']
     search_fields = ['title', 'venue', 'description', 'category__name']
     readonly_fields = ['id', 'created_at', 'updated_at']
\ No newline at end of file
@@ -0,0 +1,136 @@
+"""
+Async list/detail reads for the DRF viewsets, served to ASGI requests.
+
+DRF dispatches synchronously, so under ASGI every request would run in a
+thread for its whole life, waits on the database included. The async views
+below reuse each viewset's filtering, pagination, caching and serialization
+but run the page queries on Django's async ORM; only the short synchronous
+steps (authentication, filter validation, cache reads/writes) go through
+``sync_to_async``. Writes and every other action are the plain DRF view.
+"""
+from asgiref.sync import sync_to_async
+from django.core.exceptions import ValidationError
+from django.http import Http404
+from django.urls import URLPattern
+from rest_framework.response import Response
+
+
+ASYNC_ACTIONS = ('list', 'retrieve')
+
+
+class AsyncReadMixin:
+    """
+    ``as_async_view()``: like ``as_view()``, but ``list`` and ``retrieve``
+    run as coroutines. Place it after mixins that override
+    ``get_list_queryset``/``get_list_data``.
+    """
+
+    @classmethod
+    def as_async_view(cls, actions, **initkwargs):
+        actions = dict(actions)
+        if 'get' in actions:
+            actions.setdefault('head', actions['get'])
+        sync_view = sync_to_async(cls.as_view(actions, **initkwargs))
+
+        async def view(request, *args, **kwargs):
+            if actions.get(request.method.lower()) not in ASYNC_ACTIONS:
+                return await sync_view(request, *args, **kwargs)
+            self = cls(**initkwargs)
+            self.action_map = actions
+            for method, action in actions.items():
+                setattr(self, method, getattr(self, action))
+            self.request = request
+            self.args = args
+            self.kwargs = kwargs
+            return await self.adispatch(request, *args, **kwargs)
+
+        view.cls = cls
+        view.initkwargs = initkwargs
+        view.actions = actions
+        view.csrf_exempt = True
+        return view
+
+    async def adispatch(self, request, *args, **kwargs):
+        """APIView.dispatch for the async actions."""
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            response, queryset = await sync_to_async(self.prepare_read)(request, *args, **kwargs)
+            if response is None:
+                handler = getattr(self, f'a{self.action}')
+                response = await handler(queryset)
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = await sync_to_async(self.finalize_response)(
+            request, response, *args, **kwargs
+        )
+        return self.response
+
+    def prepare_read(self, request, *args, **kwargs):
+        """
+        The synchronous part of an async read, in one thread hop: checks,
+        cached response lookup and the filtered (unevaluated) queryset.
+        """
+        self.initial(request, *args, **kwargs)
+        cache_lookup = getattr(self, 'cache_lookup', None)
+        response = cache_lookup(request) if cache_lookup else None
+        if response is not None:
+            return response, None
+        if self.action == 'list':
+            return None, self.get_list_queryset()
+        return None, self.filter_queryset(self.get_queryset())
+
+    def get_list_queryset(self):
+        return self.filter_queryset(self.get_queryset())
+
+    def get_list_data(self, rows):
+        return self.get_serializer(rows, many=True).data
+
+    async def alist(self, queryset):
+        if self.paginator is not None:
+            page = await self.paginator.apaginate_queryset(queryset, self.request, view=self)
+            if page is not None:
+                return self.get_paginated_response(self.get_list_data(page))
+        if not isinstance(queryset, list):
+            queryset = [row async for row in queryset]
+        return Response(self.get_list_data(queryset))
+
+    async def aretrieve(self, queryset):
+        return Response(self.get_serializer(await self.aget_object(queryset)).data)
+
+    async def aget_object(self, queryset):
+        """GenericAPIView.get_object on the async ORM."""
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        filter_kwargs = {self.lookup_field: self.kwargs[lookup_url_kwarg]}
+        try:
+            obj = await queryset.aget(**filter_kwargs)
+        except queryset.model.DoesNotExist:
+            raise Http404(f'No {queryset.model._meta.object_name} matches the given query.')
+        except (TypeError, ValueError, ValidationError):
+            raise Http404
+        self.check_object_permissions(self.request, obj)
+        return obj
+
+
+def async_read_patterns(patterns):
+    """Router URL patterns with list/detail routes served by ``as_async_view``."""
+    async_patterns = []
+    for pattern in patterns:
+        callback = getattr(pattern, 'callback', None)
+        cls = getattr(callback, 'cls', None)
+        actions = getattr(callback, 'actions', {})
+        if (
+            isinstance(pattern, URLPattern)
+            and isinstance(cls, type)
+            and issubclass(cls, AsyncReadMixin)
+            and set(actions.values()) & set(ASYNC_ACTIONS)
+        ):
+            view = cls.as_async_view(actions, **callback.initkwargs)
+            pattern = URLPattern(pattern.pattern, view, pattern.default_args, pattern.name)
+        async_patterns.append(pattern)
+    return async_patterns
@@ -0,0 +1,297 @@
+"""
+Prefix index behind /api/autocomplete/: event titles, venues and category
+names that start with what the user has typed so far.
+
+Each worker process keeps the distinct values in sorted lists, so a lookup
+is a bisect to the first match plus a slice of ``limit`` entries, whatever
+the number of events. The index is built from the database in a background
+thread on the first request (app loading does no database work; see the
+Startup notes in the README), and requests are answered from the database
+until it is ready. It then follows the /events/changes/ feed: writes in this
+process mark it stale at once, writes in other workers show up in the shared
+cache generations, checked at most every
+``EVENTS_AUTOCOMPLETE_REFRESH_INTERVAL`` seconds.
+
+Memory is bounded by ``EVENTS_AUTOCOMPLETE_MAX_EVENTS``: the build indexes
+the newest events up to that number, and later events are left out (and
+served by nothing) while the index is full.
+"""
+import bisect
+from collections import Counter
+import logging
+import os
+import threading
+import time
+
+from django.conf import settings
+from django.db import connections
+from django.dispatch import receiver
+
+from .cache import generation_bumped, get_generations
+from .models import Category, Event, Tombstone
+from .stream import NAMESPACES, RESYNC_INTERVAL, ChangeFeed
+from .sync import decode_token, initial_token
+
+
+logger = logging.getLogger(__name__)
+
+# Characters of a value that take part in matching.
+MAX_LENGTH = 100
+
+# Suggestions of each kind per request: by default, and at most.
+DEFAULT_LIMIT = 8
+MAX_LIMIT = 20
+
+SEPARATOR = '\x00'
+
+
+def normalize(text):
+    """Case- and whitespace-insensitive form of ``text`` that prefixes are matched against."""
+    return ' '.join(text.replace(SEPARATOR, '').split()).casefold()[:MAX_LENGTH]
+
+
+class PrefixIndex:
+    """
+    Distinct strings sorted by their normalized form, each with the number of
+    rows that carry it. An entry is ``normalized + SEPARATOR + payload``, so
+    sorting and prefix matching need no key function and one string holds
+    both.
+    """
+
+    def __init__(self, entries=()):
+        self.counts = Counter(entries)
+        self.entries = sorted(self.counts)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def add(self, entry):
+        count = self.counts.get(entry, 0)
+        self.counts[entry] = count + 1
+        if not count:
+            bisect.insort(self.entries, entry)
+
+    def remove(self, entry):
+        count = self.counts.get(entry, 0)
+        if count > 1:
+            self.counts[entry] = count - 1
+        elif count:
+            del self.counts[entry]
+            index = bisect.bisect_left(self.entries, entry)
+            if index < len(self.entries) and self.entries[index] == entry:
+                del self.entries[index]
+
+    def lookup(self, prefix, limit):
+        """Payloads of the first ``limit`` entries whose normalized form starts with ``prefix``."""
+        start = bisect.bisect_left(self.entries, prefix)
+        payloads = []
+        for entry in self.entries[start:start + limit]:
+            key, _, payload = entry.partition(SEPARATOR)
+            if not key.startswith(prefix):
+                break
+            payloads.append(payload)
+        return payloads
+
+
+def entry(text, *extra):
+    return SEPARATOR.join([normalize(text), text, *extra])
+
+
+class AutocompleteIndex:
+    """Titles, venues and categories of up to ``max_events`` events, kept in sync through ``apply()``."""
+
+    def __init__(self, max_events):
+        self.max_events = max_events
+        self.titles = PrefixIndex()
+        self.venues = PrefixIndex()
+        self.categories = PrefixIndex()
+        # What each indexed event and category contributed, to take back when
+        # it changes or goes away.
+        self.events = {}
+        self.category_entries = {}
+        self.full = False
+
+    def load(self, events, categories):
+        """Fill the empty index from (id, title, venue) and (id, name) rows, newest events first."""
+        for pk, title, venue in events:
+            if len(self.events) >= self.max_events:
+                self.full = True
+                break
+            self.events[pk] = (entry(title), entry(venue))
+        self.titles = PrefixIndex(title for title, _ in self.events.values())
+        self.venues = PrefixIndex(venue for _, venue in self.events.values())
+        self.category_entries = {pk: entry(name, str(pk)) for pk, name in categories}
+        self.categories = PrefixIndex(self.category_entries.values())
+
+    def put_event(self, pk, title, venue):
+        entries = (entry(title), entry(venue))
+        previous = self.events.get(pk)
+        if previous == entries:
+            return
+        if previous is None and len(self.events) >= self.max_events:
+            self.full = True
+            return
+        self.drop_event(pk)
+        self.events[pk] = entries
+        self.titles.add(entries[0])
+        self.venues.add(entries[1])
+
+    def drop_event(self, pk):
+        previous = self.events.pop(pk, None)
+        if previous is not None:
+            self.titles.remove(previous[0])
+            self.venues.remove(previous[1])
+
+    def put_category(self, pk, name):
+        new = entry(name, str(pk))
+        if self.category_entries.get(pk) != new:
+            self.drop_category(pk)
+            self.category_entries[pk] = new
+            self.categories.add(new)
+
+    def drop_category(self, pk):
+        previous = self.category_entries.pop(pk, None)
+        if previous is not None:
+            self.categories.remove(previous)
+
+    def apply(self, changes):
+        """Apply ``read_changes`` (timestamp, id, kind, row) changes."""
+        for _, pk, kind, row in changes:
+            if kind == 'event':
+                self.put_event(pk, row.title, row.venue)
+            elif kind == 'category':
+                self.put_category(pk, row.name)
+            elif row.kind == Tombstone.EVENT:
+                self.drop_event(pk)
+            else:
+                self.drop_category(pk)
+
+    def lookup(self, text, limit):
+        prefix = normalize(text)
+        categories = []
+        for payload in self.categories.lookup(prefix, limit):
+            name, _, pk = payload.rpartition(SEPARATOR)
+            categories.append({'id': pk, 'name': name})
+        return {
+            'categories': categories,
+            'titles': self.titles.lookup(prefix, limit),
+            'venues': self.venues.lookup(prefix, limit),
+        }
+
+
+def database_lookup(text, limit):
+    """What the index would return, from the database: for requests served while it builds."""
+    prefix = ' '.join(text.split())
+    if not prefix:
+        return {'categories': [], 'titles': [], 'venues': []}
+
+    def values(field):
+        return list(
+            Event.objects.filter(**{f'{field}__istartswith': prefix})
+            .order_by(field).values_list(field, flat=True).distinct()[:limit]
+        )
+
+    return {
+        'categories': [
+            {'id': str(pk), 'name': name}
+            for pk, name in Category.objects.filter(name__istartswith=prefix)
+            .order_by('name').values_list('pk', 'name')[:limit]
+        ],
+        'titles': values('title'),
+        'venues': values('venue'),
+    }
+
+
+class Autocomplete:
+    """This process's index, its build and its catching up with the changes feed."""
+
+    def __init__(self):
+        self.index = None
+        self.lock = threading.Lock()
+        self.building = False
+        self.stale = False
+        self.checked = 0.0
+        self.read_at = 0.0
+        self.feed = None
+        self.generations = None
+
+    def build(self):
+        try:
+            # Positions and generations first: anything written while the rows
+            # are read is replayed from the feed afterwards.
+            generations = get_generations(NAMESPACES)
+            feed = ChangeFeed(*decode_token(initial_token()))
+            index = AutocompleteIndex(settings.EVENTS_AUTOCOMPLETE_MAX_EVENTS)
+            started = time.monotonic()
+            index.load(
+                Event.objects.order_by('-created_at', '-id').values_list('id', 'title', 'venue')
+                .iterator(chunk_size=10000),
+                Category.objects.values_list('id', 'name'),
+            )
+            if index.full:
+                logger.warning(
+                    'Autocomplete index is full (EVENTS_AUTOCOMPLETE_MAX_EVENTS=%s); older events are left out',
+                    index.max_events,
+                )
+            logger.info('Autocomplete index: %s events in %.1f s', len(index.events), time.monotonic() - started)
+            with self.lock:
+                self.index, self.feed, self.generations = index, feed, generations
+                self.stale = True
+        except Exception:
+            logger.exception('Building the autocomplete index failed')
+        finally:
+            self.building = False
+            connections.close_all()
+
+    def start_build(self):
+        with self.lock:
+            if self.building or self.index is not None:
+                return
+            self.building = True
+        threading.Thread(target=self.build, name='autocomplete-index', daemon=True).start()
+
+    def refresh(self):
+        """Catch up with the changes feed if anything may have been written."""
+        now = time.monotonic()
+        if not self.stale and now - self.checked < settings.EVENTS_AUTOCOMPLETE_REFRESH_INTERVAL:
+            return
+        with self.lock:
+            self.checked, stale, self.stale = now, self.stale, False
+            generations = get_generations(NAMESPACES)
+            if not stale and generations == self.generations and now - self.read_at < RESYNC_INTERVAL:
+                return
+            try:
+                pages = self.feed.read()
+            except Exception:
+                # Serve the index as it is and try again on the next request.
+                logger.exception('Updating the autocomplete index failed')
+                self.stale = True
+                return
+            for changes, _ in pages:
+                self.index.apply(changes)
+            self.generations, self.read_at = generations, now
+
+    def lookup(self, text, limit):
+        if self.index is None:
+            self.start_build()
+            return database_lookup(text, limit)
+        self.refresh()
+        return self.index.lookup(text, limit)
+
+
+_autocomplete = None
+_autocomplete_pid = None
+
+
+def get_autocomplete():
+    """This process's Autocomplete (threads and indexes do not survive a fork)."""
+    global _autocomplete, _autocomplete_pid
+    if _autocomplete is None or _autocomplete_pid != os.getpid():
+        _autocomplete, _autocomplete_pid = Autocomplete(), os.getpid()
+    return _autocomplete
+
+
+@receiver(generation_bumped)
+def mark_stale(sender, namespaces, **kwargs):
+    if _autocomplete is not None:
+        _autocomplete.stale = True
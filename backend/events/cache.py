@@ -0,0 +1,279 @@
+import hashlib
+import time
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.dispatch import Signal
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils import timezone
+from django.utils.cache import patch_vary_headers
+from django.utils.http import http_date, parse_etags, parse_http_date_safe, quote_etag
+
+from .compression import compress, response_encoding, set_encoded_content
+
+
+def get_cache():
+    return caches[getattr(settings, 'EVENTS_CACHE_ALIAS', 'default')]
+
+
+def generation_key(namespace):
+    return f'events:generation:{namespace}'
+
+
+def get_generations(namespaces):
+    """
+    Current generation of each namespace. A missing counter (never set, or
+    evicted) is seeded from the clock so it can never fall back to a value
+    that older cache entries were stored under.
+    """
+    cache = get_cache()
+    keys = [generation_key(namespace) for namespace in namespaces]
+    generations = cache.get_many(keys)
+    for key in keys:
+        if key not in generations:
+            cache.add(key, time.time_ns(), timeout=None)
+            generations[key] = cache.get(key)
+    return [generations[key] for key in keys]
+
+
+RECENT_WRITE_KEY = 'events:recent-write'
+
+# Sent with ``namespaces`` once a write's generations are bumped (after commit).
+generation_bumped = Signal()
+
+
+def bump_generation(*namespaces):
+    """
+    Invalidate every cached response of ``namespaces`` in O(1).
+
+    Runs after the surrounding transaction commits, so a concurrent reader
+    can never cache pre-commit rows under the new generation. With read
+    replicas the write is also flagged for ``EVENTS_REPLICA_LAG`` seconds
+    (see ``written_recently``).
+    """
+    def bump():
+        cache = get_cache()
+        written = {}
+        now = timezone.now()
+        for namespace in namespaces:
+            key = generation_key(namespace)
+            try:
+                generation = cache.incr(key)
+            except ValueError:
+                cache.add(key, time.time_ns(), timeout=None)
+                generation = cache.get(key)
+            written[last_write_key(namespace, generation)] = now
+        cache.set_many(written, LAST_WRITE_TIMEOUT)
+        if getattr(settings, 'EVENTS_READ_REPLICAS', None):
+            cache.set(RECENT_WRITE_KEY, True, getattr(settings, 'EVENTS_REPLICA_LAG', 5))
+        generation_bumped.send(sender=None, namespaces=namespaces)
+
+    transaction.on_commit(bump)
+
+
+# Seconds the moment of a write is kept; only the current generation's is read.
+LAST_WRITE_TIMEOUT = 24 * 60 * 60
+
+
+def last_write_key(namespace, generation):
+    return f'events:last-write:{namespace}:{generation}'
+
+
+def last_written(namespaces, load):
+    """
+    When any of ``namespaces`` was last written, as recorded by the bump that
+    moved each generation to its current value; no query. A missing record
+    (the counter was seeded, or the record evicted) is replaced by ``load()``,
+    which reads it from the database, for later requests to reuse. Keyed by
+    generation, a record can never be overwritten by an earlier write's.
+    """
+    cache = get_cache()
+    keys = [last_write_key(namespace, generation)
+            for namespace, generation in zip(namespaces, get_generations(namespaces))]
+    moments = cache.get_many(keys)
+    if len(moments) == len(keys):
+        return max(moments.values())
+    # Generations were read first: a write committed since has moved them,
+    # so this can only be recorded under ones the database already reflects.
+    moment = load()
+    if moment is not None:
+        for key in keys:
+            if key not in moments:
+                cache.add(key, moment, LAST_WRITE_TIMEOUT)
+    return moment
+
+
+def written_recently():
+    """Whether any events data was written in the last ``EVENTS_REPLICA_LAG`` seconds."""
+    return get_cache().get(RECENT_WRITE_KEY) is not None
+
+
+# Part of every key; bump it when the shape of cached entries changes.
+RESPONSE_CACHE_VERSION = '3'
+
+
+def response_cache_key(request, namespaces):
+    query = urlencode(sorted(request.query_params.lists()), doseq=True)
+    generations = ':'.join(str(generation) for generation in get_generations(namespaces))
+    raw = '|'.join([
+        RESPONSE_CACHE_VERSION,
+        generations,
+        request.get_host(),
+        request.path,
+        query,
+        request.accepted_renderer.format,
+    ])
+    return f"events:response:{hashlib.md5(raw.encode('utf-8')).hexdigest()}"
+
+
+def opaque_tag(etag):
+    return etag[2:] if etag.startswith('W/') else etag
+
+
+def etag_matches(request, etag):
+    """``If-None-Match`` check, with the weak comparison (compressed responses carry W/ ETags)."""
+    if_none_match = request.headers.get('If-None-Match')
+    if not if_none_match:
+        return False
+    etags = parse_etags(if_none_match)
+    return '*' in etags or opaque_tag(etag) in {opaque_tag(tag) for tag in etags}
+
+
+def not_modified_since(request, last_modified):
+    """``If-Modified-Since`` check; ignored when ``If-None-Match`` is sent, as RFC 9110 says."""
+    if last_modified is None or 'If-None-Match' in request.headers:
+        return False
+    since = parse_http_date_safe(request.headers.get('If-Modified-Since', ''))
+    return since is not None and last_modified <= since
+
+
+def not_modified(etag=None, last_modified=None, vary=None):
+    response = HttpResponseNotModified()
+    if etag:
+        response['ETag'] = etag
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified)
+    if vary:
+        response['Vary'] = vary
+    return response
+
+
+class CachedResponseMixin:
+    """
+    Cache rendered list/detail responses, keyed on the normalized query string
+    and the generation of every namespace the payload depends on. Writes bump
+    a generation (see events.signals), so stale entries are never read again
+    and simply expire. Responses carry an ETag either way; with the cache off
+    a matching ``If-None-Match`` saves the transfer but not the rendering.
+
+    Views that implement ``last_modified()`` also get ``Last-Modified`` and
+    ``If-Modified-Since`` handling: a cached response answers from its stored
+    timestamp, a miss from ``last_modified()``, which for lists reads the
+    moment the last bump recorded (see ``last_written``).
+
+    Entries keep a gzip/brotli variant per encoding clients asked for (see
+    events.compression), compressed once and reused by later hits.
+    """
+    cache_namespaces = ()
+
+    def cache_timeout(self):
+        return getattr(settings, 'EVENTS_CACHE_TIMEOUT', 300)
+
+    def last_modified(self):
+        """Unix time the response to this request last changed, or None if unknown."""
+        return None
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        response = self.cache_lookup(request)
+        if response is None:
+            response = handler(request, *args, **kwargs)
+        return response
+
+    def cache_lookup(self, request):
+        """
+        Return the cached response for ``request`` or a 304, or None to
+        render it (after noting the cache key and Last-Modified time, so
+        finalize_response can add them).
+        """
+        if self.cache_timeout():
+            key = response_cache_key(request, self.cache_namespaces)
+            entry = get_cache().get(key)
+            if entry is not None:
+                return self.cached_entry_response(request, key, *entry)
+            self.response_cache_key = key
+
+        self.response_last_modified = self.last_modified()
+        if not_modified_since(request, self.response_last_modified):
+            return not_modified(last_modified=self.response_last_modified)
+        return None
+
+    def cached_entry_response(self, request, key, content, content_type, etag, last_modified, variants):
+        if etag_matches(request, etag) or not_modified_since(request, last_modified):
+            response = not_modified(etag, last_modified)
+        else:
+            response = HttpResponse(content, content_type=content_type)
+            response['ETag'] = etag
+            if last_modified is not None:
+                response['Last-Modified'] = http_date(last_modified)
+            encoding = response_encoding(request, response, len(content))
+            if encoding is not None:
+                if encoding not in variants:
+                    variants[encoding] = compress(content, encoding)
+                    get_cache().set(
+                        key,
+                        (content, content_type, etag, last_modified, variants),
+                        self.cache_timeout(),
+                    )
+                self.use_variant(response, encoding, variants[encoding])
+        response['X-Cache'] = 'HIT'
+        return response
+
+    def use_variant(self, response, encoding, compressed):
+        patch_vary_headers(response, ('Accept-Encoding',))
+        if len(compressed) < len(response.content):
+            set_encoded_content(response, encoding, compressed)
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(super().retrieve, request, *args, **kwargs)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        # Only list and detail reads go through cache_lookup.
+        if response.status_code != 200 or not hasattr(self, 'response_last_modified'):
+            return response
+        last_modified = self.response_last_modified
+        if last_modified is not None:
+            response['Last-Modified'] = http_date(last_modified)
+        response.render()
+        content = response.content
+        etag = quote_etag(hashlib.md5(content).hexdigest())
+        response['ETag'] = etag
+        key = getattr(self, 'response_cache_key', None)
+        if key is None:
+            # The cache is off: the response is rendered every time, but an
+            # unchanged one still goes out as a 304 (compressed, if at all,
+            # by events.compression's middleware).
+            if etag_matches(request, etag):
+                return not_modified(etag, last_modified, response.get('Vary'))
+            return response
+
+        variants = {}
+        encoding = response_encoding(request, response, len(content))
+        if encoding is not None:
+            variants[encoding] = compress(content, encoding)
+        get_cache().set(
+            key,
+            (content, response['Content-Type'], etag, last_modified, variants),
+            self.cache_timeout(),
+        )
+        response['X-Cache'] = 'MISS'
+        if etag_matches(request, etag):
+            return not_modified(etag, last_modified, response.get('Vary'))
+        if encoding is not None:
+            self.use_variant(response, encoding, variants[encoding])
+        return response
@@ -0,0 +1,115 @@
+"""
+Process-local read-through cache of the categories table.
+
+Categories are few and rarely written, yet every event write resolves its
+category and every category list reads them all. ``category_cache`` keeps a
+snapshot of the whole table in each worker (by id, by name and in list
+order) and hands out copies. Before each use it compares the snapshot's
+version with the ``categories`` generation in the shared cache, one cache
+read, which every category write bumps on commit (see events.signals): a
+create, rename or delete in any worker is seen by the others on their next
+use. Snapshots also expire after ``EVENTS_CATEGORY_CACHE_TIMEOUT`` seconds,
+for deployments whose workers do not share a cache; 0 turns the cache off.
+
+Snapshots leave out ``event_count``, which event writes change without
+bumping the categories generation; reading it from a cached category loads
+the current value from the database.
+"""
+import copy
+import threading
+import time
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models import Max
+
+from .cache import get_generations
+from .models import Category, Tombstone
+
+
+NAMESPACE = 'categories'
+
+
+class CategorySnapshot:
+    """The categories table at one generation."""
+
+    def __init__(self, version, categories, last_modified):
+        self.version = version
+        self.created = time.monotonic()
+        self.ordered = categories
+        self.by_id = {category.pk: category for category in categories}
+        self.by_name = {category.name: category for category in categories}
+        self.last_modified = last_modified
+
+
+def load_snapshot(version):
+    # Always the primary: a replica behind it would be cached until the
+    # next write.
+    categories = list(Category.objects.using(DEFAULT_DB_ALIAS).defer('event_count'))
+    moments = [category.updated_at for category in categories] + [
+        Tombstone.objects.using(DEFAULT_DB_ALIAS).filter(kind=Tombstone.CATEGORY)
+        .aggregate(latest=Max('deleted_at'))['latest']
+    ]
+    moments = [moment for moment in moments if moment is not None]
+    return CategorySnapshot(version, categories, max(moments) if moments else None)
+
+
+class CategoryCache:
+    """The worker's category snapshot; the database is read only when it is out of date."""
+
+    def __init__(self):
+        self.current = None
+        self.lock = threading.Lock()
+
+    def enabled(self):
+        return getattr(settings, 'EVENTS_CATEGORY_CACHE_TIMEOUT', 300) > 0
+
+    def snapshot(self):
+        """The up-to-date snapshot, reloaded if a category was written since."""
+        # Read the version before the rows: a write committed in between
+        # bumps it again, so the snapshot is never kept past the write.
+        [version] = get_generations([NAMESPACE])
+        current = self.current
+        if (
+            current is not None
+            and current.version == version
+            and time.monotonic() - current.created < settings.EVENTS_CATEGORY_CACHE_TIMEOUT
+        ):
+            return current
+        with self.lock:
+            if self.current is current:
+                self.current = load_snapshot(version)
+            return self.current
+
+    def invalidate(self):
+        """Drop the snapshot; the next use loads a new one."""
+        self.current = None
+
+    def get(self, pk, snapshot=None):
+        """A copy of the category ``pk``, or None."""
+        if not self.enabled():
+            return Category.objects.filter(pk=pk).first()
+        category = (snapshot or self.snapshot()).by_id.get(pk)
+        return copy.copy(category) if category is not None else None
+
+    def get_by_name(self, name):
+        """A copy of the category named ``name`` (exactly), or None."""
+        if not self.enabled():
+            return Category.objects.filter(name=name).first()
+        category = self.snapshot().by_name.get(name)
+        return copy.copy(category) if category is not None else None
+
+    def all(self):
+        """Copies of every category, in list (name) order."""
+        if not self.enabled():
+            return list(Category.objects.all())
+        return [copy.copy(category) for category in self.snapshot().ordered]
+
+    def last_modified(self):
+        """When a category was last created, changed or deleted; None if never."""
+        if not self.enabled():
+            return load_snapshot(None).last_modified
+        return self.snapshot().last_modified
+
+
+category_cache = CategoryCache()
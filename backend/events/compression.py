@@ -0,0 +1,201 @@
+"""
+gzip/brotli compression of API responses.
+
+``CompressionMiddleware`` compresses responses of compressible types (JSON,
+MessagePack, CSV/NDJSON exports...) of at least ``EVENTS_COMPRESSION_MIN_SIZE``
+bytes in the best encoding the client accepts: brotli when the ``brotli``
+package is installed, else gzip. Streaming exports are compressed as they
+stream. A compressed response's ETag is made weak, as Django's GZipMiddleware
+does, since its bytes differ from the uncompressed one's; ``If-None-Match``
+uses the weak comparison, so either form revalidates.
+
+Cached responses (see ``events.cache``) keep their compressed variants next
+to the plain body, so a hit is served without compressing again.
+"""
+import gzip
+import zlib
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.utils.cache import patch_vary_headers
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+# Server preference, best first.
+ENCODINGS = ['br', 'gzip'] if brotli else ['gzip']
+
+# API media types only. HTML is left alone, since admin pages embed CSRF
+# tokens that compression would expose to BREACH, and so is the event stream
+# (text/event-stream), whose events must reach the client as they are sent.
+COMPRESSIBLE_TYPES = (
+    'application/json',
+    'application/msgpack',
+    'application/vnd.events.compact+json',
+    'application/x-ndjson',
+    'text/csv',
+)
+
+
+def enabled():
+    return getattr(settings, 'EVENTS_COMPRESSION_ENABLED', True)
+
+
+def min_size():
+    return getattr(settings, 'EVENTS_COMPRESSION_MIN_SIZE', 1024)
+
+
+def negotiate(request):
+    """The encoding to use for ``request`` according to its Accept-Encoding, or None."""
+    header = request.META.get('HTTP_ACCEPT_ENCODING', '')
+    if not header:
+        return None
+    qualities = {}
+    for part in header.split(','):
+        name, *params = [item.strip() for item in part.split(';')]
+        quality = 1.0
+        for param in params:
+            if param.startswith('q='):
+                try:
+                    quality = float(param[2:])
+                except ValueError:
+                    quality = 0.0
+        qualities[name.lower()] = quality
+    wildcard = qualities.get('*', 0.0)
+    best = max(ENCODINGS, key=lambda encoding: qualities.get(encoding, wildcard))
+    return best if qualities.get(best, wildcard) > 0 else None
+
+
+def is_compressible(response):
+    """Whether ``response`` is of a kind that is compressed for clients that accept it."""
+    content_type = response.get('Content-Type', '').split(';')[0].strip().lower()
+    return (
+        response.status_code == 200
+        and 'no-transform' not in response.get('Cache-Control', '')
+        and content_type.startswith(COMPRESSIBLE_TYPES)
+    )
+
+
+def response_encoding(request, response, size):
+    """The encoding to compress ``response``, ``size`` bytes long, with for ``request``, or None."""
+    if (
+        not enabled()
+        or size < min_size()
+        or response.has_header('Content-Encoding')
+        or not is_compressible(response)
+    ):
+        return None
+    return negotiate(request)
+
+
+def compress(content, encoding):
+    if encoding == 'br':
+        return brotli.compress(content, quality=getattr(settings, 'EVENTS_BROTLI_QUALITY', 4))
+    # mtime=0: the same body always compresses to the same bytes.
+    return gzip.compress(content, compresslevel=getattr(settings, 'EVENTS_GZIP_LEVEL', 6), mtime=0)
+
+
+def weak_etag(etag):
+    return etag if etag.startswith('W/') else f'W/{etag}'
+
+
+def set_encoded_content(response, encoding, content):
+    """Replace ``response``'s body with ``content``, already compressed with ``encoding``."""
+    response.content = content
+    response['Content-Length'] = str(len(content))
+    response['Content-Encoding'] = encoding
+    if response.has_header('ETag'):
+        response['ETag'] = weak_etag(response['ETag'])
+
+
+class StreamCompressor:
+    """Compress a stream chunk by chunk, flushing after each so clients see progress."""
+
+    def __init__(self, encoding):
+        if encoding == 'br':
+            self.compressor = brotli.Compressor(quality=getattr(settings, 'EVENTS_BROTLI_QUALITY', 4))
+            self.compress = self.compressor.process
+            self.flush = self.compressor.flush
+            self.finish = self.compressor.finish
+        else:
+            # wbits 31: a gzip container around the deflate stream.
+            level = getattr(settings, 'EVENTS_GZIP_LEVEL', 6)
+            self.compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+            self.compress = self.compressor.compress
+            self.flush = lambda: self.compressor.flush(zlib.Z_SYNC_FLUSH)
+            self.finish = self.compressor.flush
+
+    def chunk(self, data):
+        return self.compress(data) + self.flush()
+
+    def stream(self, chunks):
+        for data in chunks:
+            yield self.chunk(data)
+        yield self.finish()
+
+    async def astream(self, chunks):
+        async for data in chunks:
+            yield self.chunk(data)
+        yield self.finish()
+
+
+class CompressionMiddleware:
+    """
+    Compress responses as described above. ``EVENTS_COMPRESSION_ENABLED =
+    False`` removes it (leave it off when a proxy in front compresses).
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not enabled():
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return self.process_response(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        return self.process_response(request, await self.get_response(request))
+
+    def process_response(self, request, response):
+        if response.status_code == 304:
+            # Match the ETag the compressed 200 would have had.
+            if response.has_header('ETag') and negotiate(request):
+                response['ETag'] = weak_etag(response['ETag'])
+            return response
+        if not is_compressible(response):
+            return response
+        patch_vary_headers(response, ('Accept-Encoding',))
+
+        if response.streaming:
+            encoding = response_encoding(request, response, size=min_size())
+            if encoding is None:
+                return response
+            compressor = StreamCompressor(encoding)
+            if response.is_async:
+                response.streaming_content = compressor.astream(response.streaming_content)
+            else:
+                response.streaming_content = compressor.stream(response.streaming_content)
+            del response['Content-Length']
+            response['Content-Encoding'] = encoding
+            if response.has_header('ETag'):
+                response['ETag'] = weak_etag(response['ETag'])
+            return response
+
+        encoding = response_encoding(request, response, len(response.content))
+        if encoding is None:
+            return response
+        compressed = compress(response.content, encoding)
+        if len(compressed) < len(response.content):
+            set_encoded_content(response, encoding, compressed)
+        return response
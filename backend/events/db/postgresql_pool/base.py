@@ -0,0 +1,177 @@
+"""
+PostgreSQL backend with a process-wide connection pool.
+
+Django 4.2 has no pooling of its own: a connection either lives for
+``CONN_MAX_AGE`` in the thread that opened it or is closed after every
+request. Neither suits ASGI, where the threads serving a request do not
+outlive it. With this backend ``close()`` hands the connection back to a
+pool shared by every thread of the process and the next ``connect()`` takes
+it from there, so requests stop paying for the TCP/TLS/auth handshake.
+
+Configured like Django 5.1's built-in pool, through ``OPTIONS['pool']``::
+
+    'ENGINE': 'events.db.postgresql_pool',
+    'CONN_MAX_AGE': 0,
+    'OPTIONS': {'pool': {'max_size': 10, 'timeout': 10, 'max_idle': 300}},
+"""
+from collections import deque
+import os
+import threading
+import time
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.postgresql import base
+from django.db.backends.postgresql.psycopg_any import IsolationLevel
+
+
+POOL_DEFAULTS = {
+    # Connections open at once, idle or in use, per process.
+    'max_size': 10,
+    # Seconds to wait for a free connection before giving up.
+    'timeout': 10.0,
+    # Idle connections older than this many seconds are closed, not reused.
+    'max_idle': 300.0,
+}
+
+# psycopg2 and psycopg both report an idle session (no open transaction) as 0.
+TRANSACTION_STATUS_IDLE = 0
+
+
+class ConnectionPool:
+    def __init__(self, max_size, timeout, max_idle):
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self.slots = threading.BoundedSemaphore(max_size)
+        self.lock = threading.Lock()
+        # (connection, returned at) pairs, most recently returned last.
+        self.idle = deque()
+
+    def acquire(self):
+        """
+        Reserve a slot and return an idle connection, or None if the caller
+        should open a new one in it. Returns False when no slot frees up
+        within the timeout.
+        """
+        if not self.slots.acquire(timeout=self.timeout):
+            return False
+        expired = []
+        connection = None
+        with self.lock:
+            while self.idle:
+                candidate, returned_at = self.idle.pop()
+                if candidate.closed or time.monotonic() - returned_at > self.max_idle:
+                    expired.append(candidate)
+                else:
+                    connection = candidate
+                    break
+            # Whatever is left at the old end has been idle even longer.
+            while self.idle and time.monotonic() - self.idle[0][1] > self.max_idle:
+                expired.append(self.idle.popleft()[0])
+        for candidate in expired:
+            discard(candidate)
+        return connection
+
+    def release(self, connection, reusable):
+        try:
+            if reusable and not connection.closed:
+                if connection.info.transaction_status != TRANSACTION_STATUS_IDLE:
+                    connection.rollback()
+                with self.lock:
+                    self.idle.append((connection, time.monotonic()))
+            else:
+                discard(connection)
+        except Exception:
+            discard(connection)
+            raise
+        finally:
+            self.slots.release()
+
+    def release_slot(self):
+        """Give back a slot whose new connection could not be opened."""
+        self.slots.release()
+
+
+def discard(connection):
+    try:
+        connection.close()
+    except Exception:
+        pass
+
+
+pools = {}
+pools_lock = threading.Lock()
+
+
+def get_pool(key, options):
+    # Keyed on the process too: a forked worker must not share sockets with
+    # its parent.
+    key = (os.getpid(), key)
+    with pools_lock:
+        pool = pools.get(key)
+        if pool is None:
+            pool = pools[key] = ConnectionPool(**options)
+        return pool
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    def pool_options(self):
+        options = self.settings_dict['OPTIONS'].get('pool', True)
+        if not options:
+            return None
+        if self.settings_dict['CONN_MAX_AGE']:
+            raise ImproperlyConfigured(
+                'Pooled connections require CONN_MAX_AGE = 0: the pool, not the '
+                'thread, keeps them open.'
+            )
+        if options is True:
+            options = {}
+        unknown = set(options) - set(POOL_DEFAULTS)
+        if unknown:
+            raise ImproperlyConfigured(f"Unknown OPTIONS['pool'] settings: {', '.join(sorted(unknown))}")
+        return {**POOL_DEFAULTS, **options}
+
+    @property
+    def pool(self):
+        options = self.pool_options()
+        if options is None:
+            return None
+        settings_dict = self.settings_dict
+        key = (self.alias, settings_dict['NAME'], settings_dict['USER'],
+               settings_dict['HOST'], settings_dict['PORT'])
+        return get_pool(key, options)
+
+    def get_connection_params(self):
+        conn_params = super().get_connection_params()
+        conn_params.pop('pool', None)
+        return conn_params
+
+    def get_new_connection(self, conn_params):
+        pool = self.pool
+        if pool is None:
+            return super().get_new_connection(conn_params)
+        connection = pool.acquire()
+        if connection is False:
+            raise self.Database.OperationalError(
+                f'No connection available in the {self.alias!r} pool after {pool.timeout}s'
+            )
+        if connection is None:
+            try:
+                return super().get_new_connection(conn_params)
+            except BaseException:
+                pool.release_slot()
+                raise
+        # What super() would have set for a fresh connection.
+        self.isolation_level = IsolationLevel(
+            self.settings_dict['OPTIONS'].get('isolation_level', IsolationLevel.READ_COMMITTED)
+        )
+        return connection
+
+    def _close(self):
+        pool = self.pool
+        if pool is None or self.connection is None:
+            return super()._close()
+        # A connection closed inside atomic() or after an error that broke it
+        # is not handed to the next request.
+        reusable = not self.in_atomic_block and (not self.errors_occurred or self.is_usable())
+        with self.wrap_database_errors:
+            pool.release(self.connection, reusable)
@@ -0,0 +1,70 @@
+import csv
+import json
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+from .fastlist import EVENT_FIELDS, event_rows, event_values
+
+
+def export_rows(queryset):
+    """
+    Yield one dict per event, formatted like the API, without building model
+    instances. Memory stays flat: rows are read through a chunked cursor.
+    """
+    chunk = settings.EVENTS_EXPORT_CHUNK_SIZE
+    yield from event_rows(event_values(queryset).iterator(chunk_size=chunk))
+
+
+def batched(lines, size):
+    batch = []
+    for line in lines:
+        batch.append(line)
+        if len(batch) >= size:
+            yield ''.join(batch)
+            batch = []
+    if batch:
+        yield ''.join(batch)
+
+
+def ndjson_lines(queryset):
+    for row in export_rows(queryset):
+        yield json.dumps(row, ensure_ascii=False) + '\n'
+
+
+class Echo:
+    """File-like object whose write() hands the line back to csv.writer's caller."""
+
+    def write(self, value):
+        return value
+
+
+def csv_lines(queryset):
+    writer = csv.writer(Echo())
+    names = [name for name, _, _ in EVENT_FIELDS]
+    yield writer.writerow(names)
+    for row in export_rows(queryset):
+        yield writer.writerow([row.get(name) for name in names])
+
+
+EXPORT_FORMATS = {
+    'ndjson': (ndjson_lines, 'application/x-ndjson'),
+    'csv': (csv_lines, 'text/csv; charset=utf-8'),
+}
+
+
+def export_stream(queryset, output):
+    lines, content_type = EXPORT_FORMATS[output]
+    return batched(lines(queryset), 500), content_type
+
+
+async def aiterate(iterator):
+    """
+    Drive a sync iterator from async code, one item per thread hop. Under ASGI
+    Django would otherwise read a sync streaming body to the end before
+    sending any of it.
+    """
+    sentinel = object()
+    get_next = sync_to_async(next)
+    while (item := await get_next(iterator, sentinel)) is not sentinel:
+        yield item
@@ -0,0 +1,185 @@
+"""
+Read-only fast path for event lists.
+
+Rows come straight from ``values_list()`` (the category name selected in the
+same query) and are formatted with the DRF fields EventSerializer uses, so the
+rendered bytes are identical to the serializer's; see
+``events.tests.test_fastlist`` for the equivalence check.
+"""
+from django.conf import settings
+from django.db.models import OuterRef, Subquery
+from rest_framework import serializers
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+
+from .images import thumbnail_urls
+from .metrics import serializing
+from .models import Category
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+date_field = serializers.DateField()
+time_field = serializers.TimeField()
+format_datetime = serializers.DateTimeField().to_representation
+
+
+def identity(value):
+    return value
+
+
+# EventSerializer's fields in order: (name, ORM path, formatter).
+EVENT_FIELDS = [
+    ('id', 'id', str),
+    ('title', 'title', identity),
+    ('description', 'description', identity),
+    ('venue', 'venue', identity),
+    ('date', 'date', date_field.to_representation),
+    ('time', 'time', time_field.to_representation),
+    ('image', 'image', identity),
+    ('image_status', 'image_status', identity),
+    ('thumbnails', 'thumbnails', thumbnail_urls),
+    ('category', 'category_id', str),
+    ('category_id', 'category_id', str),
+    ('category_name', 'category_name', identity),
+    ('created_at', 'created_at', format_datetime),
+    ('updated_at', 'updated_at', format_datetime),
+]
+
+# Columns to select, each once (category and category_id share one).
+EVENT_PATHS = list(dict.fromkeys(path for _, path, _ in EVENT_FIELDS))
+
+FIELD_COLUMNS = [
+    (name, EVENT_PATHS.index(path), formatter) for name, path, formatter in EVENT_FIELDS
+]
+
+
+def event_paths(fields=None):
+    """
+    Columns to select for the named ``fields`` (default: all of them). The
+    category id is selected for any category field, since it decides whether
+    category_id/category_name are shown, and id/created_at always, for the
+    cursor paginator.
+    """
+    if fields is None:
+        return EVENT_PATHS
+    wanted = {'id', 'created_at'} | {path for name, path, _ in EVENT_FIELDS if name in fields}
+    if 'category_name' in wanted:
+        wanted.add('category_id')
+    return [path for path in EVENT_PATHS if path in wanted]
+
+
+def event_values(queryset, named=False, fields=None):
+    """``queryset`` as ``values_list()`` rows of ``event_paths(fields)``."""
+    paths = event_paths(fields)
+    if 'category_name' in paths:
+        # A scalar subquery rather than a join, so the paginator's COUNT(*)
+        # can drop it.
+        category_name = Category.objects.filter(pk=OuterRef('category_id')).order_by().values('name')
+        queryset = queryset.annotate(category_name=Subquery(category_name))
+    return queryset.values_list(*paths, named=named)
+
+
+def event_rows(rows, fields=None):
+    """Turn ``event_values(fields=fields)`` rows into EventSerializer-shaped dicts."""
+    paths = event_paths(fields)
+    if fields is None:
+        field_columns = FIELD_COLUMNS
+    else:
+        field_columns = [
+            (name, paths.index(path), formatter) for name, path, formatter in EVENT_FIELDS if name in fields
+        ]
+    category_column = paths.index('category_id') if 'category_id' in paths else None
+    # DateTimeField looks the active timezone up for every value; pin it once
+    # for the whole batch instead.
+    datetime_field = serializers.DateTimeField()
+    datetime_field.timezone = datetime_field.default_timezone()
+    columns = [
+        (name, column, datetime_field.to_representation if formatter is format_datetime else formatter)
+        for name, column, formatter in field_columns
+    ]
+    for values in rows:
+        row = {
+            name: None if values[column] is None else formatter(values[column])
+            for name, column, formatter in columns
+        }
+        if category_column is not None and values[category_column] is None:
+            # EventSerializer skips the category.* sourced fields for events
+            # without a category.
+            row.pop('category_id', None)
+            row.pop('category_name', None)
+        yield row
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer that encodes with orjson when it is installed.
+
+    Only used for plain str/int/None payloads, where orjson's compact UTF-8
+    output matches ``json.dumps``; anything else (indented output, ASCII-only
+    settings, values orjson rejects) goes through JSONRenderer.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (
+            orjson is None
+            or data is None
+            or self.ensure_ascii
+            or not self.compact
+            or self.get_indent(accepted_media_type, renderer_context or {}) is not None
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(data)
+        except TypeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        return ret.replace('\u2028'.encode(), b'\\u2028').replace('\u2029'.encode(), b'\\u2029')
+
+
+class FastListMixin:
+    """
+    Serve ``list`` from ``values_list()`` rows instead of EventSerializer
+    instances. ``EVENTS_FAST_LIST = False`` switches back to the serializer.
+    """
+
+    def use_fast_list(self):
+        return self.action == 'list' and getattr(settings, 'EVENTS_FAST_LIST', True)
+
+    def get_list_fields(self):
+        """Names of the fields to render, in EVENT_FIELDS order; None for all."""
+        return None
+
+    def get_renderers(self):
+        renderers = super().get_renderers()
+        if not self.use_fast_list():
+            return renderers
+        return [
+            FastJSONRenderer() if type(renderer) is JSONRenderer else renderer
+            for renderer in renderers
+        ]
+
+    def get_list_queryset(self):
+        queryset = self.filter_queryset(self.get_queryset())
+        if not self.use_fast_list():
+            return queryset
+        # Named rows expose created_at/id for the cursor paginator.
+        return event_values(queryset, named=True, fields=self.get_list_fields())
+
+    def get_list_data(self, rows):
+        if not self.use_fast_list():
+            return self.get_serializer(rows, many=True).data
+        with serializing():
+            return list(event_rows(rows, self.get_list_fields()))
+
+    def list(self, request, *args, **kwargs):
+        if not self.use_fast_list():
+            return super().list(request, *args, **kwargs)
+
+        queryset = self.get_list_queryset()
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(self.get_list_data(page))
+        return Response(self.get_list_data(queryset))
@@ -0,0 +1,43 @@
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+import django_filters
+
+from .models import Event
+
+
+class UUIDInFilter(django_filters.BaseInFilter, django_filters.UUIDFilter):
+    pass
+
+
+class EventFilter(django_filters.FilterSet):
+    """
+    ``date`` (exact, ``date__gte``, ``date__lte``) and ``category``, plus
+    ``upcoming=true`` (today onwards) and ``past=true`` (before today). All
+    served by the ``date``-leading and ``(category, date)`` indexes.
+    ``ids=<id>,...`` fetches up to ``MAX_IDS`` known events by primary key.
+    """
+    MAX_IDS = 100
+
+    upcoming = django_filters.BooleanFilter(method='filter_upcoming')
+    past = django_filters.BooleanFilter(method='filter_past')
+    ids = UUIDInFilter(method='filter_ids')
+
+    class Meta:
+        model = Event
+        fields = {
+            'date': ['exact', 'gte', 'lte'],
+            'category': ['exact'],
+        }
+
+    def filter_upcoming(self, queryset, name, value):
+        today = timezone.localdate()
+        return queryset.filter(date__gte=today) if value else queryset.filter(date__lt=today)
+
+    def filter_past(self, queryset, name, value):
+        today = timezone.localdate()
+        return queryset.filter(date__lt=today) if value else queryset.filter(date__gte=today)
+
+    def filter_ids(self, queryset, name, value):
+        if len(value) > self.MAX_IDS:
+            raise ValidationError({name: [f'At most {self.MAX_IDS} ids per request.']})
+        return queryset.filter(pk__in=value)
@@ -0,0 +1,44 @@
+"""
+Time-ordered primary keys.
+
+``uuid7()`` makes RFC 9562 version 7 UUIDs: a 48-bit Unix timestamp in
+milliseconds, then 12 bits of sub-millisecond time, then 62 random bits.
+New rows therefore get keys larger than those of older rows, and inserts
+land at the right-hand edge of the primary key index instead of in a random
+page: fewer page splits, fuller pages and a smaller, hotter index (see
+``python -m benchmarks.primary_keys``). They are still UUIDs, so they mix
+with the version 4 keys of existing rows, which keep theirs.
+
+Keys made in one process are strictly increasing even when the clock stands
+still or steps back; the timestamp then runs a little ahead of the clock.
+"""
+import os
+import threading
+import time
+import uuid
+
+
+_lock = threading.Lock()
+_last = 0
+
+
+def uuid7():
+    """A new version 7 UUID, greater than the previous one from this process."""
+    global _last
+    nanoseconds = time.time_ns()
+    # Milliseconds, then the fraction of the millisecond in 12 bits
+    # (RFC 9562 section 6.2, method 3).
+    milliseconds, fraction = divmod(nanoseconds, 1_000_000)
+    timestamp = milliseconds << 12 | fraction * 4096 // 1_000_000
+    with _lock:
+        if timestamp <= _last:
+            timestamp = _last + 1
+        _last = timestamp
+    random_bits = int.from_bytes(os.urandom(8), 'big') & (1 << 62) - 1
+    return uuid.UUID(int=(
+        (timestamp >> 12) << 80
+        | 7 << 76
+        | (timestamp & 0xFFF) << 64
+        | 0b10 << 62
+        | random_bits
+    ))
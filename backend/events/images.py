@@ -0,0 +1,237 @@
+"""
+Event image thumbnails.
+
+Saving an event whose ``image`` changed marks it ``pending`` (see
+``reset_thumbnails``). Once the transaction commits, a per-process thread
+pool fetches the URL, checks that it really is an image within the size
+limits, and stores one resized copy per ``EVENTS_THUMBNAIL_SIZES`` entry in
+the default storage; the event then turns ``ready`` (or ``failed``). Nothing
+here runs inside the request that saved the event.
+
+Thumbnails are named after a hash of the image URL, so events sharing an
+image, or reprocessing one, reuse the stored files without fetching again.
+"""
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
+from http.client import HTTPException
+import ipaddress
+from io import BytesIO
+import logging
+import os
+import socket
+import threading
+from urllib.error import URLError
+from urllib.parse import urlsplit
+from urllib.request import HTTPRedirectHandler, Request, build_opener
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connections, transaction
+from django.utils import timezone
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from .cache import bump_generation
+from .models import Event
+
+
+logger = logging.getLogger(__name__)
+
+
+class ImageRejected(Exception):
+    """The URL does not lead to a usable image."""
+
+
+def thumbnail_paths(url):
+    """Storage path of each thumbnail size of ``url``."""
+    image_format = settings.EVENTS_THUMBNAIL_FORMAT.lower()
+    extension = 'jpg' if image_format == 'jpeg' else image_format
+    digest = hashlib.sha256(url.encode('utf-8')).hexdigest()
+    return {
+        name: f'thumbnails/{digest[:2]}/{digest}/{name}-{width}.{extension}'
+        for name, width in settings.EVENTS_THUMBNAIL_SIZES.items()
+    }
+
+
+def thumbnail_urls(paths):
+    """The stored ``thumbnails`` paths as URLs, by size name."""
+    if not paths:
+        return None
+    return {name: default_storage.url(path) for name, path in paths.items()}
+
+
+def check_host(url):
+    """
+    Refuse non-HTTP(S) URLs and hosts resolving to loopback, private or
+    otherwise non-public addresses, so an event image cannot be used to probe
+    the internal network. (The fetch resolves the name again; a host that
+    changes its answer in between is not caught.)
+    """
+    parts = urlsplit(url)
+    if parts.scheme not in ('http', 'https') or not parts.hostname:
+        raise ImageRejected('Only http and https URLs are fetched.')
+    if settings.EVENTS_IMAGE_ALLOW_PRIVATE_HOSTS:
+        return
+    try:
+        addresses = socket.getaddrinfo(parts.hostname, parts.port or 80, proto=socket.IPPROTO_TCP)
+    except (socket.gaierror, UnicodeError, ValueError):
+        raise ImageRejected(f'Cannot resolve {parts.hostname}.')
+    for *_, sockaddr in addresses:
+        if not ipaddress.ip_address(sockaddr[0].split('%')[0]).is_global:
+            raise ImageRejected(f'{parts.hostname} is not a public address.')
+
+
+class CheckedRedirectHandler(HTTPRedirectHandler):
+    max_redirections = 3
+
+    def redirect_request(self, req, fp, code, msg, headers, newurl):
+        check_host(newurl)
+        return super().redirect_request(req, fp, code, msg, headers, newurl)
+
+
+def fetch(url):
+    """The body of ``url``, if it is served as an image within the byte limit."""
+    check_host(url)
+    limit = settings.EVENTS_IMAGE_MAX_BYTES
+    request = Request(url, headers={'Accept': 'image/*', 'User-Agent': 'event-management-thumbnailer'})
+    try:
+        with build_opener(CheckedRedirectHandler).open(request, timeout=settings.EVENTS_IMAGE_TIMEOUT) as response:
+            content_type = response.headers.get_content_type()
+            if not content_type.startswith('image/'):
+                raise ImageRejected(f'Served as {content_type}, not an image.')
+            length = response.headers.get('Content-Length', '')
+            if length.isdigit() and int(length) > limit:
+                raise ImageRejected(f'Larger than {limit} bytes.')
+            data = response.read(limit + 1)
+    except (URLError, HTTPException, OSError, ValueError) as exc:
+        raise ImageRejected(f'Fetch failed: {exc}')
+    if len(data) > limit:
+        raise ImageRejected(f'Larger than {limit} bytes.')
+    return data
+
+
+def open_image(data):
+    """Decode ``data``, refusing anything that is not a complete image within the pixel limit."""
+    try:
+        with Image.open(BytesIO(data)) as image:
+            width, height = image.size
+            if width * height > settings.EVENTS_IMAGE_MAX_PIXELS:
+                raise ImageRejected(f'{width}x{height} exceeds the pixel limit.')
+            image.verify()
+        image = Image.open(BytesIO(data))
+        # Let JPEG decode at a reduced scale when the largest thumbnail
+        # allows it: much faster for big photos.
+        largest = max(settings.EVENTS_THUMBNAIL_SIZES.values())
+        image.draft('RGB', (largest, max(1, height * largest // width)))
+        image.load()
+        return ImageOps.exif_transpose(image)
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError, SyntaxError, ValueError) as exc:
+        raise ImageRejected(f'Not a valid image: {exc}')
+
+
+def render_thumbnails(data):
+    """Encoded thumbnails of the image in ``data``, by size name."""
+    image_format = settings.EVENTS_THUMBNAIL_FORMAT.upper()
+    image = open_image(data)
+    has_alpha = image.mode in ('RGBA', 'LA', 'PA') or 'transparency' in image.info
+    image = image.convert('RGBA' if has_alpha else 'RGB')
+    if has_alpha and image_format == 'JPEG':
+        background = Image.new('RGB', image.size, 'white')
+        background.paste(image, mask=image.getchannel('A'))
+        image = background
+
+    rendered = {}
+    # Largest first, each size resized from the previous one.
+    for name, width in sorted(settings.EVENTS_THUMBNAIL_SIZES.items(), key=lambda size: -size[1]):
+        if image.width > width:
+            image = image.resize(
+                (width, max(1, round(image.height * width / image.width))),
+                Image.Resampling.LANCZOS,
+                reducing_gap=3.0,
+            )
+        buffer = BytesIO()
+        image.save(buffer, format=image_format, quality=80)
+        rendered[name] = buffer.getvalue()
+    return rendered
+
+
+def generate_thumbnails(url):
+    """Storage paths of ``url``'s thumbnails, fetching and storing them unless they exist."""
+    paths = thumbnail_paths(url)
+    if all(default_storage.exists(path) for path in paths.values()):
+        return paths
+    rendered = render_thumbnails(fetch(url))
+    for name, path in paths.items():
+        # A partial earlier run; save() would pick another name instead.
+        if default_storage.exists(path):
+            default_storage.delete(path)
+        paths[name] = default_storage.save(path, ContentFile(rendered[name]))
+    return paths
+
+
+def process_event_image(pk):
+    """Generate the thumbnails of event ``pk``'s current image and record the outcome."""
+    url = Event.objects.filter(pk=pk).values_list('image', flat=True).first()
+    if not url:
+        return None
+    try:
+        thumbnails, status = generate_thumbnails(url), Event.IMAGE_READY
+    except ImageRejected as exc:
+        logger.warning('No thumbnails for event %s (%s): %s', pk, url, exc)
+        thumbnails, status = None, Event.IMAGE_FAILED
+    # Only if the image is still the same; a change scheduled its own run.
+    # updated_at moves, so delta sync clients pick the thumbnails up.
+    updated = Event.objects.filter(pk=pk, image=url).update(
+        image_status=status, thumbnails=thumbnails, updated_at=timezone.now()
+    )
+    if updated:
+        bump_generation('events')
+    return status
+
+
+def reset_thumbnails(event):
+    """Mark ``event``, whose image just changed, for processing (or clear it if the image was removed)."""
+    event.thumbnails = None
+    event.image_status = Event.IMAGE_PENDING if event.image else ''
+
+
+executor = None
+executor_pid = None
+executor_lock = threading.Lock()
+
+
+def get_executor():
+    global executor, executor_pid
+    with executor_lock:
+        # Threads do not survive a fork; gunicorn workers each need their own.
+        if executor is None or executor_pid != os.getpid():
+            executor = ThreadPoolExecutor(
+                max_workers=settings.EVENTS_IMAGE_WORKERS, thread_name_prefix='event-images'
+            )
+            executor_pid = os.getpid()
+        return executor
+
+
+def run_job(pk):
+    try:
+        process_event_image(pk)
+    except Exception:
+        # Stays pending; "python manage.py process_images" retries it.
+        logger.exception('Processing the image of event %s failed', pk)
+    finally:
+        # Hand this thread's connection back (to the pool, if there is one).
+        connections.close_all()
+
+
+def schedule(pks):
+    """Process the images of events ``pks`` in the background once the transaction commits."""
+    pks = list(pks)
+    if not pks or not settings.EVENTS_IMAGE_WORKERS:
+        return
+
+    def submit():
+        pool = get_executor()
+        for pk in pks:
+            pool.submit(run_job, pk)
+
+    transaction.on_commit(submit)
@@ -0,0 +1,132 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Count
+from django.utils import timezone
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from events.models import Category, Event
+from events.sync import after
+from events.views import EventViewSet
+
+
+# Every filter/order combination the events list exposes.
+FILTER_COMBINATIONS = [
+    {},
+    {'date': '2025-01-01'},
+    {'category': '{category}'},
+    {'date': '2025-01-01', 'category': '{category}'},
+    {'date__gte': '2025-01-01', 'date__lte': '2025-01-31'},
+    {'date__gte': '2025-01-01', 'date__lte': '2025-01-31', 'category': '{category}'},
+    {'upcoming': 'true'},
+    {'upcoming': 'true', 'category': '{category}'},
+    {'past': 'true'},
+    {'past': 'true', 'category': '{category}'},
+    {'search': 'conference'},
+    {'search': 'conference', 'category': '{category}'},
+]
+
+# /events/calendar/ groups one month of the filtered list by day.
+CALENDAR_FILTERS = [
+    {},
+    {'category': '{category}'},
+]
+
+ORDERINGS = {
+    'page': ('-created_at',),
+    'cursor': ('-created_at', '-id'),
+}
+
+
+class Command(BaseCommand):
+    help = 'EXPLAIN every event list filter/order combination and fail on a full table scan'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--verbose-plans',
+            action='store_true',
+            help='Print the full plan for every query, not only failures',
+        )
+
+    def handle(self, *args, **options):
+        category = Category.objects.first()
+        if category is None:
+            raise CommandError('No categories found; run "python manage.py init_db" first.')
+        category_id = str(category.id)
+        factory = APIRequestFactory()
+        failures = []
+
+        for params in FILTER_COMBINATIONS:
+            params = {key: value.format(category=category_id) for key, value in params.items()}
+            for mode, ordering in ORDERINGS.items():
+                queryset = self.list_queryset(factory, params).order_by(*ordering)[:20]
+                plan = self.explain(queryset)
+                label = f"{mode:<6} {', '.join(sorted(params)) or '(no filters)'}"
+                self.report(label, plan, failures, options)
+
+        for params in CALENDAR_FILTERS:
+            params = {key: value.format(category=category_id) for key, value in params.items()}
+            plan = self.explain(self.calendar_queryset(factory, params))
+            label = f"calendar {', '.join(sorted(params)) or '(no filters)'}"
+            self.report(label, plan, failures, options)
+
+        # /events/changes/ keyset pages and the Last-Modified lookup.
+        changed = Event.objects.filter(after('updated_at', 'id', timezone.now(), category.id))
+        self.report('changes', self.explain(changed.order_by('updated_at', 'id')[:101]), failures, options)
+        self.report(
+            'last-modified',
+            self.explain(Event.objects.order_by('-updated_at').values('updated_at')[:1]),
+            failures,
+            options,
+        )
+
+        if failures:
+            raise CommandError(f'{len(failures)} event list queries fall back to a full table scan')
+        self.stdout.write(self.style.SUCCESS('All event list queries use an index.'))
+
+    def report(self, label, plan, failures, options):
+        if self.is_full_scan(plan):
+            failures.append(label)
+            self.stdout.write(self.style.ERROR(f'FAIL  {label}'))
+            self.stdout.write(plan)
+        else:
+            self.stdout.write(self.style.SUCCESS(f'ok    {label}'))
+            if options['verbose_plans']:
+                self.stdout.write(plan)
+
+    def list_queryset(self, factory, params):
+        view = EventViewSet(action='list', format_kwarg=None, kwargs={})
+        view.request = Request(factory.get('/api/events/', params))
+        return view.filter_queryset(view.get_queryset())
+
+    def calendar_queryset(self, factory, params):
+        return (
+            self.list_queryset(factory, params)
+            .filter(date__gte='2025-01-01', date__lte='2025-01-31')
+            .order_by()
+            .values_list('date')
+            .annotate(total=Count('pk'))
+        )
+
+    def explain(self, queryset):
+        if connection.vendor != 'postgresql':
+            return queryset.explain()
+        # Tiny development tables always plan as a sequential scan; disabling it
+        # asks PostgreSQL whether an index *could* serve the query.
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                cursor.execute('SET LOCAL enable_seqscan = off')
+            return queryset.explain()
+
+    def is_full_scan(self, plan):
+        table = 'events_event'
+        for line in plan.splitlines():
+            if connection.vendor == 'postgresql':
+                if f'Seq Scan on {table}' in line:
+                    return True
+            elif connection.vendor == 'sqlite':
+                # "SCAN events_event USING INDEX ..." walks an index in order and
+                # stops at the LIMIT; a bare "SCAN events_event" reads every row.
+                if line.split('SCAN ', 1)[-1].strip() == table:
+                    return True
+        return False
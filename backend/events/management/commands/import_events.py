@@ -0,0 +1,236 @@
+from contextlib import nullcontext
+import csv
+import gzip
+import io
+import json
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_time
+
+from events.cache import bump_generation
+from events.categories import category_cache
+from events.images import schedule
+from events.models import Category, Event
+
+
+COLUMNS = ['id', 'title', 'description', 'venue', 'date', 'time', 'image', 'image_status',
+           'thumbnails', 'category_id', 'created_at', 'updated_at']
+
+
+def open_source(path):
+    if path == '-':
+        # Reading stdin must not close it.
+        return nullcontext(sys.stdin)
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rt', encoding='utf-8', newline='')
+    return open(path, encoding='utf-8', newline='')
+
+
+def read_records(source, fmt):
+    if fmt == 'csv':
+        yield from csv.DictReader(source)
+        return
+    for line in source:
+        line = line.strip()
+        if line:
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                # Counted as invalid by clean().
+                yield None
+
+
+class Command(BaseCommand):
+    help = 'Stream events from a CSV or NDJSON file into the database in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV or NDJSON file (optionally .gz), or "-" for stdin')
+        parser.add_argument(
+            '--format',
+            choices=['csv', 'ndjson'],
+            help='Input format (default: guessed from the file extension)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='Rows inserted per batch and transaction (default: 5000)',
+        )
+        parser.add_argument(
+            '--no-copy',
+            action='store_true',
+            help='Use bulk_create even when PostgreSQL COPY is available',
+        )
+
+    def handle(self, *args, **options):
+        fmt = options['format'] or self.guess_format(options['path'])
+        batch_size = options['batch_size']
+        if batch_size <= 0:
+            raise CommandError('--batch-size must be positive.')
+
+        self.categories = {category.name.lower(): category.pk for category in category_cache.all()}
+        self.use_copy = (
+            connection.vendor == 'postgresql'
+            and not options['no_copy']
+            and self.supports_copy()
+        )
+        self.new_id = Event._meta.pk.get_default
+        self.max_lengths = {
+            'title': Event._meta.get_field('title').max_length,
+            'venue': Event._meta.get_field('venue').max_length,
+            'image': Event._meta.get_field('image').max_length,
+            'category': Category._meta.get_field('name').max_length,
+        }
+
+        stats = {'imported': 0, 'duplicates': 0, 'invalid': 0}
+        started = time.monotonic()
+        batch = []
+
+        with open_source(options['path']) as source:
+            for line_number, record in enumerate(read_records(source, fmt), start=1):
+                row = self.clean(record)
+                if row is None:
+                    stats['invalid'] += 1
+                    if stats['invalid'] <= 10:
+                        self.stderr.write(f'Skipping invalid record {line_number}')
+                    continue
+                batch.append(row)
+                if len(batch) >= batch_size:
+                    self.flush(batch, stats, started)
+                    batch = []
+            if batch:
+                self.flush(batch, stats, started)
+
+        if stats['imported']:
+            bump_generation('events')
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {stats['imported']} events in {elapsed:.1f}s "
+            f"({stats['imported'] / max(elapsed, 1e-9):.0f} rows/s); "
+            f"{stats['duplicates']} duplicates and {stats['invalid']} invalid rows skipped."
+        ))
+
+    def supports_copy(self):
+        with connection.cursor() as cursor:
+            return hasattr(cursor.cursor, 'copy_expert')
+
+    def guess_format(self, path):
+        name = path[:-3] if path.endswith('.gz') else path
+        if name.endswith('.csv'):
+            return 'csv'
+        if name.endswith(('.ndjson', '.jsonl')):
+            return 'ndjson'
+        raise CommandError('Cannot guess the input format; pass --format csv or --format ndjson.')
+
+    def category_id(self, name):
+        name = (name or '').strip()
+        if not name:
+            return None
+        key = name.lower()
+        if key not in self.categories:
+            # Same normalization as CategorySerializer.validate_name.
+            category, _ = Category.objects.get_or_create(name=name.title())
+            self.categories[key] = category.id
+        return self.categories[key]
+
+    def clean(self, record):
+        """Return a tuple in COLUMNS order, or None if the record is unusable."""
+        if not isinstance(record, dict):
+            return None
+        try:
+            title = str(record.get('title') or '').strip()
+            venue = str(record.get('venue') or '').strip()
+            image = str(record.get('image') or '').strip() or None
+            description = str(record.get('description') or '') or None
+            category = str(record.get('category_name') or record.get('category') or '').strip()
+            date = parse_date(record.get('date') or '')
+            event_time = parse_time(record.get('time') or '')
+        except (TypeError, ValueError):
+            # e.g. a number where a date string belongs
+            return None
+        if not title or not venue or date is None or event_time is None:
+            return None
+        # One over-long value would fail the whole batch on PostgreSQL.
+        if (
+            len(title) > self.max_lengths['title']
+            or len(venue) > self.max_lengths['venue']
+            or len(image or '') > self.max_lengths['image']
+            or len(category) > self.max_lengths['category']
+        ):
+            return None
+
+        now = timezone.now()
+        return (
+            self.new_id(),
+            title,
+            description,
+            venue,
+            date,
+            event_time,
+            image,
+            # Thumbnails are made for this database (see events.images), not
+            # taken from the file.
+            Event.IMAGE_PENDING if image else '',
+            None,
+            self.category_id(category),
+            now,
+            now,
+        )
+
+    def natural_key(self, row):
+        # (title, venue, date, time)
+        return row[1], row[3], row[4], row[5]
+
+    def flush(self, batch, stats, started):
+        keys = {}
+        for row in batch:
+            keys.setdefault(self.natural_key(row), row)
+        stats['duplicates'] += len(batch) - len(keys)
+
+        # Rows from earlier batches are already committed, so one indexed
+        # query per batch dedupes against the whole table.
+        existing = Event.objects.filter(
+            date__in={key[2] for key in keys},
+            title__in={key[0] for key in keys},
+        ).values_list('title', 'venue', 'date', 'time')
+        for key in existing:
+            if keys.pop(key, None) is not None:
+                stats['duplicates'] += 1
+
+        rows = list(keys.values())
+        with transaction.atomic():
+            if self.use_copy:
+                self.copy_rows(rows)
+            else:
+                Event.objects.bulk_create(
+                    [Event(**dict(zip(COLUMNS, row))) for row in rows],
+                    batch_size=len(rows) or None,
+                )
+            Category.objects.filter(pk__in={row[9] for row in rows}).refresh_event_counts()
+            # Neither COPY nor bulk_create sends signals: queue the images here.
+            schedule(row[0] for row in rows if row[6])
+        stats['imported'] += len(rows)
+
+        elapsed = time.monotonic() - started
+        self.stdout.write(
+            f"{stats['imported']} imported ({stats['imported'] / max(elapsed, 1e-9):.0f} rows/s)"
+        )
+
+    def copy_rows(self, rows):
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in rows:
+            # COPY's CSV format reads an unquoted empty field as NULL, except
+            # in the FORCE_NOT_NULL columns, where it is an empty string.
+            writer.writerow(['' if value is None else value for value in row])
+        buffer.seek(0)
+        with connection.cursor() as cursor:
+            cursor.copy_expert(
+                f"COPY {Event._meta.db_table} ({', '.join(COLUMNS)}) FROM STDIN "
+                "WITH (FORMAT csv, FORCE_NOT_NULL (image_status))",
+                buffer,
+            )
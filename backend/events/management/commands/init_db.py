@@ -1,15 +1,30 @@
+from django.core.management import call_command
 from django.core.management.base import BaseCommand
+from events.categories import category_cache
 from events.models import Category
 
 
+DEFAULT_CATEGORIES = ['Conference', 'Workshop', 'Seminar', 'Webinar', 'Training']
+
+
 class Command(BaseCommand):
-    help = 'Initialize database with default categories'
+    help = 'Apply migrations and create the default categories (safe to run repeatedly)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--skip-migrate',
+            action='store_true',
+            help='Only create the default categories',
+        )
 
     def handle(self, *args, **options):
-        categories = ['Conference', 'Workshop', 'Seminar', 'Webinar', 'Training']
-        
-        for cat_name in categories:
-            category, created = Category.objects.get_or_create(name=cat_name)
+        if not options['skip_migrate']:
+            call_command('migrate', interactive=False, verbosity=options['verbosity'])
+
+        for cat_name in DEFAULT_CATEGORIES:
+            created = False
+            if category_cache.get_by_name(cat_name) is None:
+                category, created = Category.objects.get_or_create(name=cat_name)
             if created:
                 self.stdout.write(
                     self.style.SUCCESS(f'Successfully created category "{cat_name}"')
@@ -19,4 +34,4 @@ class Command(BaseCommand):
         
         self.stdout.write(
             self.style.SUCCESS('Database initialization completed!')
-        )
\ No newline at end of file
+        )
@@ -1,4 +1,5 @@
 from django.core.management.base import BaseCommand
+from events.categories import category_cache
 from events.models import Category, Event
 from datetime import date, time
 
@@ -15,15 +16,17 @@ class Command(BaseCommand):
         ]
         
         for cat_name in categories_data:
+            if category_cache.get_by_name(cat_name) is not None:
+                continue
             category, created = Category.objects.get_or_create(name=cat_name)
             if created:
                 self.stdout.write(f'✓ Created category: {cat_name}')
 
         # Get categories for events
-        conference = Category.objects.get(name='Conference')
-        workshop = Category.objects.get(name='Workshop')
-        seminar = Category.objects.get(name='Seminar')
-        webinar = Category.objects.get(name='Webinar')
+        conference = category_cache.get_by_name('Conference')
+        workshop = category_cache.get_by_name('Workshop')
+        seminar = category_cache.get_by_name('Seminar')
+        webinar = category_cache.get_by_name('Webinar')
 
         # Create sample events
         sample_events = [
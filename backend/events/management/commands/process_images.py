@@ -0,0 +1,46 @@
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from events.images import process_event_image
+from events.models import Event
+
+
+class Command(BaseCommand):
+    help = 'Generate event image thumbnails that are pending (or failed, or all of them)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--status',
+            choices=[Event.IMAGE_PENDING, Event.IMAGE_FAILED, 'all'],
+            default=Event.IMAGE_PENDING,
+            help='Which events to process (default: pending)',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=4,
+            help='Images fetched and resized in parallel (default: 4)',
+        )
+
+    def handle(self, *args, **options):
+        events = Event.objects.exclude(image__isnull=True).exclude(image='')
+        if options['status'] != 'all':
+            events = events.filter(image_status=options['status'])
+        pks = list(events.values_list('pk', flat=True))
+
+        def process(pk):
+            try:
+                return process_event_image(pk)
+            finally:
+                connections.close_all()
+
+        with ThreadPoolExecutor(max_workers=max(1, options['workers'])) as pool:
+            outcomes = Counter(pool.map(process, pks))
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Processed {len(pks)} event images: {outcomes[Event.IMAGE_READY]} ready, "
+            f"{outcomes[Event.IMAGE_FAILED]} failed."
+        ))
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from events.search import backend_for_vendor
+
+
+class Command(BaseCommand):
+    help = 'Reinstall the full-text search triggers and reindex every event'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--database',
+            default=DEFAULT_DB_ALIAS,
+            help='Database alias to reindex (default: "default")',
+        )
+
+    def handle(self, *args, **options):
+        connection = connections[options['database']]
+        backend = backend_for_vendor(connection.vendor)
+        if backend is None or not backend.is_supported(connection):
+            raise CommandError(
+                f'No full-text search backend for {connection.vendor}; '
+                'searches use icontains matching.'
+            )
+
+        with connection.schema_editor() as schema_editor:
+            backend.rebuild(schema_editor)
+
+        self.stdout.write(
+            self.style.SUCCESS(f'Search index rebuilt with {backend.__class__.__name__}.')
+        )
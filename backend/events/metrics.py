@@ -0,0 +1,318 @@
+"""
+Per-request timing and SQL instrumentation, exported in the Prometheus text
+format.
+
+Metrics live in the memory of each worker process, like the default
+prometheus_client registry: scrape every worker (or run a single one behind
+/metrics) to see the whole picture. /metrics answers only the scrapers that
+``EVENTS_METRICS_TOKEN`` and ``EVENTS_METRICS_ALLOWED_IPS`` let in, and
+everyone else, as when metrics are off, with a 404.
+"""
+from bisect import bisect_left
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+import hmac
+import ipaddress
+import logging
+import random
+import threading
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.http import Http404, HttpResponse
+
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+
+class Histogram:
+    def __init__(self, name, help_text, buckets):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = buckets
+        # {label value: [bucket counts..., +Inf count, sum]}
+        self.series = {}
+
+    def observe(self, label, value):
+        series = self.series.get(label)
+        if series is None:
+            series = self.series.setdefault(label, [0] * (len(self.buckets) + 1) + [0.0])
+        # Counts are stored per bucket and made cumulative on export.
+        series[bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def expose(self, label_name):
+        yield f'# HELP {self.name} {self.help_text}'
+        yield f'# TYPE {self.name} histogram'
+        for label, series in sorted(self.series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + ('+Inf',), series):
+                cumulative += count
+                yield f'{self.name}_bucket{{{label_name}="{label}",le="{bound}"}} {cumulative}'
+            yield f'{self.name}_sum{{{label_name}="{label}"}} {series[-1]:.6f}'
+            yield f'{self.name}_count{{{label_name}="{label}"}} {cumulative}'
+
+
+class CounterMetric:
+    def __init__(self, name, help_text, label_names):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.series = Counter()
+
+    def inc(self, *labels):
+        self.series[labels] += 1
+
+    def expose(self):
+        yield f'# HELP {self.name} {self.help_text}'
+        yield f'# TYPE {self.name} counter'
+        for labels, value in sorted(self.series.items()):
+            pairs = ','.join(f'{name}="{label}"' for name, label in zip(self.label_names, labels))
+            yield f'{self.name}{{{pairs}}} {value}'
+
+
+class Registry:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.requests = CounterMetric(
+            'events_http_requests_total', 'Requests by view, method and status.',
+            ('view', 'method', 'status'),
+        )
+        self.latency = Histogram(
+            'events_http_request_duration_seconds', 'Total request latency.', LATENCY_BUCKETS,
+        )
+        self.db_time = Histogram(
+            'events_db_duration_seconds', 'Time spent in SQL per sampled request.', LATENCY_BUCKETS,
+        )
+        self.serialize_time = Histogram(
+            'events_serialize_duration_seconds',
+            'Time spent serializing and rendering per sampled request.', LATENCY_BUCKETS,
+        )
+        self.queries = Histogram(
+            'events_db_queries', 'SQL queries per sampled request.', QUERY_BUCKETS,
+        )
+        self.n_plus_one = CounterMetric(
+            'events_n_plus_one_total',
+            'Sampled requests that repeated one SQL statement past the threshold.', ('view',),
+        )
+
+    def record(self, view, method, status, duration, request_metrics):
+        with self.lock:
+            self.requests.inc(view, method, status)
+            self.latency.observe(view, duration)
+            if request_metrics is not None:
+                self.db_time.observe(view, request_metrics.db_time)
+                self.serialize_time.observe(view, request_metrics.serialize_time)
+                self.queries.observe(view, request_metrics.query_count)
+                if request_metrics.repeated_query() is not None:
+                    self.n_plus_one.inc(view)
+
+    def expose(self):
+        with self.lock:
+            lines = [
+                *self.requests.expose(),
+                *self.latency.expose('view'),
+                *self.db_time.expose('view'),
+                *self.serialize_time.expose('view'),
+                *self.queries.expose('view'),
+                *self.n_plus_one.expose(),
+            ]
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+
+current_request = ContextVar('events_request_metrics', default=None)
+
+
+class RequestMetrics:
+    """SQL and serialization timings of one sampled request."""
+
+    def __init__(self, n_plus_one_threshold):
+        self.n_plus_one_threshold = n_plus_one_threshold
+        self.query_count = 0
+        self.db_time = 0.0
+        self.serialize_time = 0.0
+        self.serializing = False
+        self.statements = Counter()
+
+    def record_query(self, sql, duration):
+        # Statements are counted before parameters are bound, so the same
+        # query run once per row shows up as one repeated statement.
+        self.db_time += duration
+        self.query_count += 1
+        self.statements[sql] += 1
+
+    def repeated_query(self):
+        if not self.statements:
+            return None
+        sql, count = self.statements.most_common(1)[0]
+        if count < self.n_plus_one_threshold:
+            return None
+        return sql, count
+
+
+def measure_query(execute, sql, params, many, context):
+    """execute_wrapper installed on every connection; a no-op outside sampled requests."""
+    metrics = current_request.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.record_query(sql, time.perf_counter() - started)
+
+
+def instrument_connection(connection, **kwargs):
+    # Connections are per thread, and under ASGI the ORM runs in threads other
+    # than the middleware's, so the wrapper lives on each connection and finds
+    # the request through the context variable (which sync_to_async carries).
+    if measure_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(measure_query)
+
+
+@contextmanager
+def serializing():
+    """Add the enclosed time to the current request's serialization time."""
+    metrics = current_request.get()
+    if metrics is None or metrics.serializing:
+        yield
+        return
+    metrics.serializing = True
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.serialize_time += time.perf_counter() - started
+        metrics.serializing = False
+
+
+class TimedRepresentationMixin:
+    """Serializer mixin that counts ``to_representation`` as serialization time."""
+
+    def to_representation(self, instance):
+        with serializing():
+            return super().to_representation(instance)
+
+
+def view_label(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return 'unresolved'
+    return match.view_name or match.url_name or 'unnamed'
+
+
+class MetricsMiddleware:
+    """
+    Record latency for every request and, for a sample of them
+    (``EVENTS_METRICS_SAMPLE_RATE``), query count, SQL time and serialization
+    time per view. A sampled request that repeats one statement at least
+    ``EVENTS_METRICS_N_PLUS_ONE_THRESHOLD`` times is logged as a likely N+1.
+
+    Set ``EVENTS_METRICS_ENABLED = False`` to remove the middleware entirely.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'EVENTS_METRICS_ENABLED', True):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.sample_rate = getattr(settings, 'EVENTS_METRICS_SAMPLE_RATE', 1.0)
+        self.n_plus_one_threshold = getattr(settings, 'EVENTS_METRICS_N_PLUS_ONE_THRESHOLD', 10)
+        connection_created.connect(instrument_connection, dispatch_uid='events_metrics')
+        for connection in connections.all(initialized_only=True):
+            instrument_connection(connection)
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        started = time.perf_counter()
+        request_metrics = self.sample()
+        with self.collecting(request_metrics):
+            response = self.get_response(request)
+        self.record(request, response, time.perf_counter() - started, request_metrics)
+        return response
+
+    async def __acall__(self, request):
+        started = time.perf_counter()
+        request_metrics = self.sample()
+        with self.collecting(request_metrics):
+            response = await self.get_response(request)
+        self.record(request, response, time.perf_counter() - started, request_metrics)
+        return response
+
+    def sample(self):
+        if self.sample_rate >= 1 or random.random() < self.sample_rate:
+            return RequestMetrics(self.n_plus_one_threshold)
+        return None
+
+    @contextmanager
+    def collecting(self, request_metrics):
+        if request_metrics is None:
+            yield
+            return
+        token = current_request.set(request_metrics)
+        try:
+            yield
+        finally:
+            current_request.reset(token)
+
+    def record(self, request, response, duration, request_metrics):
+        view = view_label(request)
+        repeated = request_metrics.repeated_query() if request_metrics else None
+        if repeated is not None:
+            logger.warning(
+                'Possible N+1 in %s %s (%s): %d executions of %s',
+                request.method, request.path, view, repeated[1], repeated[0],
+            )
+        registry.record(view, request.method, response.status_code, duration, request_metrics)
+
+    def process_template_response(self, request, response):
+        # DRF responses are rendered right after this hook; count the render
+        # as serialization.
+        if current_request.get() is not None:
+            render = response.render
+
+            def timed_render():
+                with serializing():
+                    return render()
+
+            response.render = timed_render
+        return response
+
+
+def may_scrape(request):
+    """Whether ``request`` carries the metrics token or comes from an allowed address."""
+    token = getattr(settings, 'EVENTS_METRICS_TOKEN', '')
+    if token:
+        scheme, _, credentials = request.META.get('HTTP_AUTHORIZATION', '').partition(' ')
+        if scheme.lower() == 'bearer' and hmac.compare_digest(credentials.strip().encode(), token.encode()):
+            return True
+    # REMOTE_ADDR, not X-Forwarded-For, which any client can write.
+    try:
+        address = ipaddress.ip_address(request.META.get('REMOTE_ADDR', ''))
+    except ValueError:
+        return False
+    return any(
+        address in ipaddress.ip_network(network, strict=False)
+        for network in getattr(settings, 'EVENTS_METRICS_ALLOWED_IPS', ['127.0.0.1', '::1'])
+    )
+
+
+def metrics_view(request):
+    if not getattr(settings, 'EVENTS_METRICS_ENABLED', True) or not may_scrape(request):
+        raise Http404
+    return HttpResponse(registry.expose(), content_type='text/plain; version=0.0.4; charset=utf-8')
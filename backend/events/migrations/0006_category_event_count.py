@@ -0,0 +1,34 @@
+# Generated by Django 4.2.27 on 2026-10-18 13:02
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from events.search import without_search_triggers
+
+
+def backfill_event_counts(apps, schema_editor):
+    Category = apps.get_model('events', 'Category')
+    Event = apps.get_model('events', 'Event')
+    alias = schema_editor.connection.alias
+    counts = Event.objects.using(alias).filter(category=OuterRef('pk')).order_by().values('category')
+    Category.objects.using(alias).update(event_count=Coalesce(
+        Subquery(counts.annotate(total=Count('pk')).values('total')),
+        0,
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0005_event_search_index'),
+    ]
+
+    operations = without_search_triggers(
+        migrations.AddField(
+            model_name='category',
+            name='event_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_event_counts, migrations.RunPython.noop),
+    )
@@ -0,0 +1,35 @@
+# Generated by Django 4.2.27 on 2026-10-18 13:40
+
+from django.db import migrations, models
+
+from events.search import without_search_triggers
+
+
+def queue_existing_images(apps, schema_editor):
+    # "python manage.py process_images" picks these up.
+    Event = apps.get_model('events', 'Event')
+    alias = schema_editor.connection.alias
+    Event.objects.using(alias).exclude(image__isnull=True).exclude(image='').update(
+        image_status='pending'
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0007_change_tracking'),
+    ]
+
+    operations = without_search_triggers(
+        migrations.AddField(
+            model_name='event',
+            name='image_status',
+            field=models.CharField(blank=True, choices=[('pending', 'Pending'), ('ready', 'Ready'), ('failed', 'Failed')], default='', editable=False, max_length=10),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='thumbnails',
+            field=models.JSONField(blank=True, editable=False, help_text='Thumbnail storage paths by size name', null=True),
+        ),
+        migrations.RunPython(queue_existing_images, migrations.RunPython.noop),
+    )
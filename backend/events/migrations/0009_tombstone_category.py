@@ -0,0 +1,18 @@
+# Generated by Django 4.2.27 on 2026-10-18 13:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0008_event_thumbnails'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tombstone',
+            name='category_id',
+            field=models.UUIDField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 4.2.27 on 2026-10-18 14:16
+
+from django.db import migrations, models
+import events.ids
+
+
+class Migration(migrations.Migration):
+    """
+    New events and categories get time-ordered (version 7) ids. The default
+    is applied by Django, not the database, so nothing in the schema changes:
+    the operations only update the migration state, with no table rebuild
+    (which SQLite's AlterField would otherwise do) and no lock. Existing rows
+    keep their version 4 ids, which clients, sync tokens and tombstones refer
+    to; both kinds are UUIDs and live side by side in the same columns.
+    """
+
+    dependencies = [
+        ('events', '0009_tombstone_category'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AlterField(
+                    model_name='category',
+                    name='id',
+                    field=models.UUIDField(default=events.ids.uuid7, editable=False, primary_key=True, serialize=False),
+                ),
+                migrations.AlterField(
+                    model_name='event',
+                    name='id',
+                    field=models.UUIDField(default=events.ids.uuid7, editable=False, primary_key=True, serialize=False),
+                ),
+            ],
+        ),
+    ]
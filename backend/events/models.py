@@ -1,35 +1,142 @@
-import uuid
+from datetime import timedelta
+
+from django.conf import settings
 from django.db import models
+from django.db.models import Count, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .ids import uuid7
+
+
+class CategoryQuerySet(models.QuerySet):
+    def with_event_counts(self):
+        """Annotate ``num_events`` and ``num_upcoming_events`` in the same query."""
+        queryset = self.annotate(
+            num_events=Count('events'),
+            num_upcoming_events=Count('events', filter=Q(events__date__gte=timezone.localdate())),
+        )
+        # Meta.ordering is dropped from GROUP BY queries; keep it explicit.
+        if not queryset.query.order_by:
+            queryset = queryset.order_by(*self.model._meta.ordering)
+        return queryset
+
+    def refresh_event_counts(self):
+        """Recompute the denormalized ``event_count`` with one UPDATE."""
+        counts = Event.objects.filter(category=OuterRef('pk')).order_by().values('category')
+        return self.update(event_count=Coalesce(
+            Subquery(counts.annotate(total=Count('pk')).values('total')),
+            0,
+        ))
 
 
 class Category(models.Model):
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     name = models.CharField(max_length=100, unique=True)
+    # Maintained by events.signals and the bulk write paths.
+    event_count = models.PositiveIntegerField(default=0, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = CategoryQuerySet.as_manager()
+
     class Meta:
         ordering = ['name']
         verbose_name_plural = 'Categories'
+        indexes = [
+            # /events/changes/ keyset and the Last-Modified lookup.
+            models.Index(fields=['updated_at', 'id'], name='category_updated_id_idx'),
+        ]
 
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        # event_count is maintained with F() updates; never write back a
+        # possibly stale in-memory value when saving an existing category.
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != 'event_count'
+            ]
+        super().save(*args, **kwargs)
+
 
 class Event(models.Model):
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    IMAGE_PENDING = 'pending'
+    IMAGE_READY = 'ready'
+    IMAGE_FAILED = 'failed'
+    IMAGE_STATUS_CHOICES = [
+        (IMAGE_PENDING, 'Pending'),
+        (IMAGE_READY, 'Ready'),
+        (IMAGE_FAILED, 'Failed'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     title = models.CharField(max_length=200)
     description = models.TextField(blank=True, null=True)
     venue = models.CharField(max_length=200)
     date = models.DateField()
     time = models.TimeField()
     image = models.URLField(max_length=500, blank=True, null=True, help_text="Event image URL")
+    # Maintained by events.images: thumbnails are generated in the background
+    # whenever ``image`` changes.
+    image_status = models.CharField(
+        max_length=10, choices=IMAGE_STATUS_CHOICES, blank=True, default='', editable=False
+    )
+    thumbnails = models.JSONField(
+        blank=True, null=True, editable=False, help_text="Thumbnail storage paths by size name"
+    )
     category = models.ForeignKey(Category, on_delete=models.CASCADE, related_name='events', null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Default list order, plus the id tie-breaker used by cursor pagination.
+            models.Index(fields=['created_at', 'id'], name='event_created_id_idx'),
+            # ?category= / ?category=&date= filters.
+            models.Index(fields=['category', 'date'], name='event_category_date_idx'),
+            models.Index(fields=['category', 'created_at', 'id'], name='event_category_created_idx'),
+            # ?date= filter, returned in list order.
+            models.Index(fields=['date', 'created_at', 'id'], name='event_date_created_idx'),
+            # /events/changes/ keyset and the Last-Modified lookup.
+            models.Index(fields=['updated_at', 'id'], name='event_updated_id_idx'),
+        ]
+
+    def __str__(self):
+        return self.title
+
+
+class TombstoneQuerySet(models.QuerySet):
+    def expired(self):
+        """Tombstones older than ``EVENTS_TOMBSTONE_RETENTION_DAYS``."""
+        retention = getattr(settings, 'EVENTS_TOMBSTONE_RETENTION_DAYS', 30)
+        return self.filter(deleted_at__lt=timezone.now() - timedelta(days=retention))
+
+
+class Tombstone(models.Model):
+    """
+    A deleted event or category, kept for ``EVENTS_TOMBSTONE_RETENTION_DAYS``
+    so /events/changes/ can report it.
+    """
+    EVENT = 'event'
+    CATEGORY = 'category'
+    KIND_CHOICES = [(EVENT, 'Event'), (CATEGORY, 'Category')]
+
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    object_id = models.UUIDField()
+    # For a deleted event, the category it was in (category-filtered streams).
+    category_id = models.UUIDField(null=True, blank=True)
+    deleted_at = models.DateTimeField(default=timezone.now)
+
+    objects = TombstoneQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['deleted_at', 'object_id'], name='tombstone_deleted_idx'),
+        ]
 
     def __str__(self):
-        return self.title
\ No newline at end of file
+        return f'{self.kind} {self.object_id}'
\ No newline at end of file
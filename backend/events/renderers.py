@@ -0,0 +1,124 @@
+"""
+Response formats for the events API besides plain JSON, picked by the
+``Accept`` header or ``?format=``:
+
+* ``compact`` (``application/vnd.events.compact+json``): JSON in which every
+  non-empty list of objects, at the top level or one level down (``results``,
+  ``days``, ``categories``...), becomes ``{"fields": [...], "rows": [[...]]}``
+  so keys are sent once per list instead of once per object. A key missing
+  from some objects is null in their rows, and its ``[row, field]`` index
+  pair is listed under ``"absent"``, so it is told apart from a real null.
+  ``expand_columns`` undoes it.
+* ``msgpack`` (``application/msgpack``): the plain JSON payload as
+  MessagePack. Request bodies may be sent as MessagePack too.
+
+See ``events.tests.test_formats`` for the round-trip check and
+``benchmarks.formats`` for the size comparison.
+"""
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+from rest_framework.renderers import BaseRenderer
+from rest_framework.settings import api_settings
+from rest_framework.utils.encoders import JSONEncoder
+
+from .fastlist import FastJSONRenderer
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+def is_table(value):
+    return isinstance(value, list) and bool(value) and all(isinstance(row, dict) for row in value)
+
+
+def to_columns(rows):
+    fields = list(dict.fromkeys(key for row in rows for key in row))
+    table = {'fields': fields, 'rows': [[row.get(field) for field in fields] for row in rows]}
+    absent = [
+        [index, position]
+        for index, row in enumerate(rows) if len(row) < len(fields)
+        for position, field in enumerate(fields) if field not in row
+    ]
+    if absent:
+        table['absent'] = absent
+    return table
+
+
+def from_columns(table):
+    rows = [dict(zip(table['fields'], row)) for row in table['rows']]
+    for index, position in table.get('absent', ()):
+        del rows[index][table['fields'][position]]
+    return rows
+
+
+def compact_columns(data):
+    """``data`` with its lists of objects in columnar form."""
+    if is_table(data):
+        return to_columns(data)
+    if isinstance(data, dict):
+        return {key: to_columns(value) if is_table(value) else value for key, value in data.items()}
+    return data
+
+
+def is_columns(value):
+    return isinstance(value, dict) and value.keys() in ({'fields', 'rows'}, {'fields', 'rows', 'absent'})
+
+
+def expand_columns(data):
+    """Inverse of ``compact_columns``, for clients and the round-trip check."""
+    if is_columns(data):
+        return from_columns(data)
+    if isinstance(data, dict):
+        return {key: from_columns(value) if is_columns(value) else value for key, value in data.items()}
+    return data
+
+
+class CompactJSONRenderer(FastJSONRenderer):
+    media_type = 'application/vnd.events.compact+json'
+    format = 'compact'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        response = (renderer_context or {}).get('response')
+        # Error payloads (bulk validation errors are lists of objects too)
+        # keep their usual shape.
+        if response is None or response.status_code < 400:
+            data = compact_columns(data)
+        return super().render(data, accepted_media_type, renderer_context)
+
+
+class MessagePackRenderer(BaseRenderer):
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        # Dates, UUIDs, decimals... as JSONRenderer would write them.
+        return msgpack.packb(data, default=JSONEncoder().default)
+
+
+class MessagePackParser(BaseParser):
+    media_type = 'application/msgpack'
+    renderer_class = MessagePackRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return msgpack.unpackb(stream.read())
+        except (ValueError, TypeError, msgpack.UnpackException) as exc:
+            raise ParseError(f'MessagePack parse error - {exc}')
+
+
+# MessagePack is only offered when msgpack is installed.
+API_RENDERER_CLASSES = [
+    *api_settings.DEFAULT_RENDERER_CLASSES,
+    CompactJSONRenderer,
+    *([MessagePackRenderer] if msgpack else []),
+]
+API_PARSER_CLASSES = [
+    *api_settings.DEFAULT_PARSER_CLASSES,
+    *([MessagePackParser] if msgpack else []),
+]
@@ -0,0 +1,67 @@
+"""
+Read-replica routing for the events API.
+
+Only reads made while serving a safe (GET/HEAD/OPTIONS) request of a view
+using ``ReplicaReadMixin`` go to a replica; everything else, writes and the
+reads a write makes included, uses the primary. After any write the primary
+serves all events reads for ``EVENTS_REPLICA_LAG`` seconds, so a client
+reads its own writes and the response cache is never filled from a replica
+that has not caught up. The flag lives in the shared cache, like the
+response cache generations.
+"""
+from contextvars import ContextVar
+import random
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+from rest_framework.permissions import SAFE_METHODS
+
+from .cache import written_recently
+
+
+# The replica alias this request reads from, or None for the primary.
+read_alias = ContextVar('events_read_alias', default=None)
+
+
+def replica_aliases():
+    return getattr(settings, 'EVENTS_READ_REPLICAS', [])
+
+
+class ReplicaRouter:
+    app_label = 'events'
+
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label != self.app_label:
+            return None
+        return read_alias.get()
+
+    def db_for_write(self, model, **hints):
+        # Explicit, or an instance read from a replica would be saved back
+        # there.
+        if model._meta.app_label != self.app_label:
+            return None
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *replica_aliases()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+
+class ReplicaReadMixin:
+    """Serve the viewset's safe requests from a replica, when one is configured."""
+
+    def initial(self, request, *args, **kwargs):
+        alias = None
+        replicas = replica_aliases()
+        if replicas and request.method in SAFE_METHODS and not written_recently():
+            alias = random.choice(replicas)
+        read_alias.set(alias)
+        super().initial(request, *args, **kwargs)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        # Threads are reused across requests: do not leak the choice into
+        # whatever this one serves next.
+        read_alias.set(None)
+        return super().finalize_response(request, response, *args, **kwargs)
@@ -0,0 +1,378 @@
+from functools import lru_cache
+import re
+
+from django.conf import settings
+from django.db import connections, migrations
+from django.db.models import BooleanField, FloatField
+from django.db.models.expressions import RawSQL
+from django.utils.module_loading import import_string
+from rest_framework import filters
+
+
+TOKEN_RE = re.compile(r'\w+')
+
+
+def tokenize(terms):
+    tokens = []
+    for term in terms:
+        tokens.extend(TOKEN_RE.findall(term.lower()))
+    return tokens
+
+
+class SearchBackend:
+    """
+    Full-text search over Event title, description, venue and category name.
+
+    Backends that can rank cheaply order the results by relevance; the others
+    keep the list's default order.
+    """
+    vendor = None
+
+    def is_available(self, connection):
+        return connection.vendor == self.vendor
+
+    def is_supported(self, connection):
+        return True
+
+    def search(self, queryset, tokens):
+        """
+        ``queryset`` narrowed to events matching every token, or None when the
+        index cannot serve ``tokens``; the filter then falls back to icontains.
+        """
+        raise NotImplementedError
+
+    def install(self, schema_editor):
+        """Create the index structures and sync triggers (idempotent)."""
+        raise NotImplementedError
+
+    def uninstall(self, schema_editor):
+        raise NotImplementedError
+
+    def rebuild(self, schema_editor):
+        """Install, then reindex every event."""
+        raise NotImplementedError
+
+
+@lru_cache(maxsize=1024)
+def has_lexemes(alias, config, query):
+    """Whether PostgreSQL's ``to_tsquery`` keeps anything of ``query``; stop words are dropped."""
+    with connections[alias].cursor() as cursor:
+        cursor.execute('SELECT numnode(to_tsquery(%s::regconfig, %s)) > 0', [config, query])
+        return cursor.fetchone()[0]
+
+
+class PostgresSearchBackend(SearchBackend):
+    """
+    A ``search_vector`` tsvector column maintained by triggers and served by a
+    GIN index. Title weighs more than category and venue, which weigh more than
+    the description.
+    """
+    vendor = 'postgresql'
+    config = 'english'
+
+    install_sql = [
+        'ALTER TABLE events_event ADD COLUMN IF NOT EXISTS search_vector tsvector',
+        """
+        CREATE OR REPLACE FUNCTION events_event_search_vector_update() RETURNS trigger AS $$
+        BEGIN
+            NEW.search_vector :=
+                setweight(to_tsvector('{config}', coalesce(NEW.title, '')), 'A') ||
+                setweight(to_tsvector('{config}', coalesce(
+                    (SELECT name FROM events_category WHERE id = NEW.category_id), '')), 'B') ||
+                setweight(to_tsvector('{config}', coalesce(NEW.venue, '')), 'B') ||
+                setweight(to_tsvector('{config}', coalesce(NEW.description, '')), 'C');
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql
+        """,
+        'DROP TRIGGER IF EXISTS events_event_search_vector_trigger ON events_event',
+        """
+        CREATE TRIGGER events_event_search_vector_trigger
+        BEFORE INSERT OR UPDATE OF title, description, venue, category_id ON events_event
+        FOR EACH ROW EXECUTE PROCEDURE events_event_search_vector_update()
+        """,
+        """
+        CREATE OR REPLACE FUNCTION events_category_search_vector_update() RETURNS trigger AS $$
+        BEGIN
+            UPDATE events_event SET title = title WHERE category_id = NEW.id;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+        """,
+        'DROP TRIGGER IF EXISTS events_category_search_vector_trigger ON events_category',
+        """
+        CREATE TRIGGER events_category_search_vector_trigger
+        AFTER UPDATE OF name ON events_category
+        FOR EACH ROW WHEN (OLD.name IS DISTINCT FROM NEW.name)
+        EXECUTE PROCEDURE events_category_search_vector_update()
+        """,
+        'CREATE INDEX IF NOT EXISTS event_search_vector_idx ON events_event USING gin (search_vector)',
+    ]
+
+    uninstall_sql = [
+        'DROP TRIGGER IF EXISTS events_category_search_vector_trigger ON events_category',
+        'DROP TRIGGER IF EXISTS events_event_search_vector_trigger ON events_event',
+        'DROP FUNCTION IF EXISTS events_category_search_vector_update()',
+        'DROP FUNCTION IF EXISTS events_event_search_vector_update()',
+        'DROP INDEX IF EXISTS event_search_vector_idx',
+        'ALTER TABLE events_event DROP COLUMN IF EXISTS search_vector',
+    ]
+
+    def search(self, queryset, tokens):
+        # Prefix-match every token, like typing into the old icontains search.
+        query = ' & '.join(f'{token}:*' for token in tokens)
+        if not has_lexemes(queryset.db, self.config, query):
+            # Only stop words ("the", "and"): the tsquery is empty and would
+            # match nothing.
+            return None
+        tsquery = f"to_tsquery('{self.config}', %s)"
+        return queryset.filter(
+            RawSQL(f'events_event.search_vector @@ {tsquery}', [query], output_field=BooleanField())
+        ).annotate(
+            search_rank=RawSQL(f'ts_rank(events_event.search_vector, {tsquery})', [query],
+                               output_field=FloatField())
+        ).order_by('-search_rank', *queryset.model._meta.ordering)
+
+    def install(self, schema_editor):
+        for sql in self.install_sql:
+            schema_editor.execute(sql.replace('{config}', self.config))
+
+    def uninstall(self, schema_editor):
+        for sql in self.uninstall_sql:
+            schema_editor.execute(sql)
+
+    def rebuild(self, schema_editor):
+        self.install(schema_editor)
+        schema_editor.execute('UPDATE events_event SET title = title')
+
+
+class SQLiteSearchBackend(SearchBackend):
+    """
+    An FTS5 virtual table kept in sync by triggers.
+
+    Django rebuilds SQLite tables for most schema changes, which fails while
+    these triggers reference the table and would drop them anyway. Migrations
+    that alter events_event or events_category therefore wrap the change in
+    ``without_search_triggers``.
+
+    FTS rows are keyed on ``events_event_search.docid`` rather than the event
+    table's implicit rowid, which VACUUM is free to renumber.
+    """
+    vendor = 'sqlite'
+
+    tables_sql = [
+        """
+        CREATE TABLE IF NOT EXISTS events_event_search (
+            docid INTEGER PRIMARY KEY,
+            event_id char(32) NOT NULL UNIQUE
+        )
+        """,
+        """
+        CREATE VIRTUAL TABLE IF NOT EXISTS events_event_fts USING fts5(
+            title, description, venue, category_name,
+            tokenize = 'unicode61 remove_diacritics 2'
+        )
+        """,
+    ]
+
+    # Trigger name -> CREATE TRIGGER statement; the only place they are defined.
+    triggers_sql = {
+        'events_event_fts_insert': """
+        CREATE TRIGGER events_event_fts_insert AFTER INSERT ON events_event BEGIN
+            INSERT INTO events_event_search (event_id) VALUES (NEW.id);
+            INSERT INTO events_event_fts (rowid, title, description, venue, category_name)
+            VALUES (
+                (SELECT docid FROM events_event_search WHERE event_id = NEW.id),
+                NEW.title, NEW.description, NEW.venue,
+                (SELECT name FROM events_category WHERE id = NEW.category_id)
+            );
+        END
+        """,
+        'events_event_fts_update': """
+        CREATE TRIGGER events_event_fts_update
+        AFTER UPDATE OF title, description, venue, category_id ON events_event BEGIN
+            UPDATE events_event_fts SET
+                title = NEW.title,
+                description = NEW.description,
+                venue = NEW.venue,
+                category_name = (SELECT name FROM events_category WHERE id = NEW.category_id)
+            WHERE rowid = (SELECT docid FROM events_event_search WHERE event_id = NEW.id);
+        END
+        """,
+        'events_event_fts_delete': """
+        CREATE TRIGGER events_event_fts_delete AFTER DELETE ON events_event BEGIN
+            DELETE FROM events_event_fts
+            WHERE rowid = (SELECT docid FROM events_event_search WHERE event_id = OLD.id);
+            DELETE FROM events_event_search WHERE event_id = OLD.id;
+        END
+        """,
+        'events_category_fts_update': """
+        CREATE TRIGGER events_category_fts_update AFTER UPDATE OF name ON events_category BEGIN
+            UPDATE events_event_fts SET category_name = NEW.name
+            WHERE rowid IN (
+                SELECT s.docid FROM events_event_search s
+                JOIN events_event e ON e.id = s.event_id
+                WHERE e.category_id = NEW.id
+            );
+        END
+        """,
+    }
+
+    backfill_sql = [
+        'DELETE FROM events_event_fts',
+        'DELETE FROM events_event_search',
+        'INSERT INTO events_event_search (event_id) SELECT id FROM events_event',
+        """
+        INSERT INTO events_event_fts (rowid, title, description, venue, category_name)
+        SELECT s.docid, e.title, e.description, e.venue, c.name
+        FROM events_event e
+        JOIN events_event_search s ON s.event_id = e.id
+        LEFT JOIN events_category c ON c.id = e.category_id
+        """,
+    ]
+
+    drop_tables_sql = [
+        'DROP TABLE IF EXISTS events_event_fts',
+        'DROP TABLE IF EXISTS events_event_search',
+    ]
+
+    match_sql = """
+        SELECT s.event_id FROM events_event_fts
+        JOIN events_event_search s ON s.docid = events_event_fts.rowid
+        WHERE events_event_fts MATCH %s
+    """
+
+    def __init__(self):
+        self.fts5_tables = {}
+
+    def is_available(self, connection):
+        if connection.vendor != self.vendor:
+            return False
+        if connection.alias not in self.fts5_tables:
+            self.fts5_tables[connection.alias] = (
+                'events_event_fts' in connection.introspection.table_names()
+            )
+        return self.fts5_tables[connection.alias]
+
+    def is_supported(self, connection):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5')")
+            return bool(cursor.fetchone()[0])
+
+    def search(self, queryset, tokens):
+        # Results keep the list order: ranking by bm25() needs a correlated
+        # MATCH per row, which costs more than the search itself.
+        query = ' '.join(f'"{token}"*' for token in tokens)
+        return queryset.filter(
+            RawSQL(f'events_event.id IN ({self.match_sql})', [query], output_field=BooleanField())
+        )
+
+    def install(self, schema_editor):
+        for sql in self.tables_sql:
+            schema_editor.execute(sql)
+        self.install_triggers(schema_editor)
+        self.fts5_tables.pop(schema_editor.connection.alias, None)
+
+    def rebuild(self, schema_editor):
+        self.install(schema_editor)
+        for sql in self.backfill_sql:
+            schema_editor.execute(sql)
+
+    def uninstall(self, schema_editor):
+        self.drop_triggers(schema_editor)
+        for sql in self.drop_tables_sql:
+            schema_editor.execute(sql)
+        self.fts5_tables.pop(schema_editor.connection.alias, None)
+
+    def install_triggers(self, schema_editor):
+        for name, sql in self.triggers_sql.items():
+            schema_editor.execute(f'DROP TRIGGER IF EXISTS {name}')
+            schema_editor.execute(sql)
+
+    def drop_triggers(self, schema_editor):
+        for name in reversed(self.triggers_sql):
+            schema_editor.execute(f'DROP TRIGGER IF EXISTS {name}')
+
+
+SEARCH_BACKENDS = [PostgresSearchBackend(), SQLiteSearchBackend()]
+
+
+def backend_for_vendor(vendor):
+    for backend in SEARCH_BACKENDS:
+        if backend.vendor == vendor:
+            return backend
+    return None
+
+
+def install_search_index(apps, schema_editor):
+    """RunPython step that creates and fills the search index, where the database has one."""
+    backend = backend_for_vendor(schema_editor.connection.vendor)
+    if backend is not None and backend.is_supported(schema_editor.connection):
+        backend.rebuild(schema_editor)
+
+
+def uninstall_search_index(apps, schema_editor):
+    backend = backend_for_vendor(schema_editor.connection.vendor)
+    if backend is not None:
+        backend.uninstall(schema_editor)
+
+
+def drop_search_triggers(apps, schema_editor):
+    """RunPython step to run before a migration rebuilds an events table on SQLite."""
+    if schema_editor.connection.vendor == 'sqlite':
+        backend_for_vendor('sqlite').drop_triggers(schema_editor)
+
+
+def reinstall_search_triggers(apps, schema_editor):
+    """RunPython step to run after a migration rebuilds an events table on SQLite."""
+    connection = schema_editor.connection
+    if connection.vendor == 'sqlite':
+        backend = backend_for_vendor('sqlite')
+        if backend.is_supported(connection):
+            backend.install(schema_editor)
+
+
+def without_search_triggers(*operations):
+    """
+    Migration ``operations`` that rebuild an events table on SQLite, between
+    steps that drop the search triggers before them and reinstall them after
+    (the other way round when unapplied).
+    """
+    return [
+        migrations.RunPython(drop_search_triggers, reinstall_search_triggers),
+        *operations,
+        migrations.RunPython(reinstall_search_triggers, drop_search_triggers),
+    ]
+
+
+@lru_cache(maxsize=None)
+def configured_backends(backend_path):
+    return [import_string(backend_path)()]
+
+
+def get_search_backend(connection):
+    """
+    Return the search backend for ``connection``, or None to fall back to
+    DRF's icontains search. ``EVENTS_SEARCH_BACKEND`` may name a backend class.
+    """
+    backend_path = getattr(settings, 'EVENTS_SEARCH_BACKEND', None)
+    backends = configured_backends(backend_path) if backend_path else SEARCH_BACKENDS
+    for backend in backends:
+        if backend.is_available(connection):
+            return backend
+    return None
+
+
+class EventSearchFilter(filters.SearchFilter):
+    """
+    Same ``?search=`` parameter as SearchFilter, served by a full-text index
+    when the database has one.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        tokens = tokenize(self.get_search_terms(request))
+        backend = get_search_backend(connections[queryset.db])
+        results = backend.search(queryset, tokens) if tokens and backend is not None else None
+        if results is None:
+            return super().filter_queryset(request, queryset, view)
+        return results
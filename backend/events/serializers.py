@@ -1,8 +1,16 @@
+import uuid
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+from django.utils import timezone
 from rest_framework import serializers
+from .categories import category_cache
+from .images import reset_thumbnails, schedule, thumbnail_urls
+from .metrics import TimedRepresentationMixin
 from .models import Event, Category
 
 
-class CategorySerializer(serializers.ModelSerializer):
+class CategorySerializer(TimedRepresentationMixin, serializers.ModelSerializer):
     class Meta:
         model = Category
         fields = ['id', 'name', 'created_at', 'updated_at']
@@ -14,17 +22,169 @@ class CategorySerializer(serializers.ModelSerializer):
         return value.strip().title()
 
 
-class EventSerializer(serializers.ModelSerializer):
+class CategoryWithCountsSerializer(CategorySerializer):
+    """CategorySerializer plus counts from ``Category.objects.with_event_counts()``."""
+    event_count = serializers.IntegerField(source='num_events', read_only=True)
+    upcoming_event_count = serializers.IntegerField(source='num_upcoming_events', read_only=True)
+
+    class Meta(CategorySerializer.Meta):
+        fields = CategorySerializer.Meta.fields + ['event_count', 'upcoming_event_count']
+
+
+class EventListSerializer(TimedRepresentationMixin, serializers.ListSerializer):
+    """
+    Bulk create/update for EventSerializer(many=True).
+
+    For updates, ``instance`` is a ``{pk: Event}`` mapping and every item must
+    carry the ``id`` of the event it changes.
+    """
+
+    @staticmethod
+    def parse_id(data):
+        try:
+            return uuid.UUID(str(data['id']))
+        except (KeyError, TypeError, ValueError):
+            return None
+
+    def to_internal_value(self, data):
+        # Ids of the update items validated so far.
+        self.seen_ids = set()
+        return super().to_internal_value(data)
+
+    def run_child_validation(self, data):
+        if self.instance is None:
+            return super().run_child_validation(data)
+
+        pk = self.parse_id(data)
+        if pk is None:
+            raise serializers.ValidationError({'id': ['A valid event id is required.']})
+        if pk in self.seen_ids:
+            raise serializers.ValidationError({'id': ['Duplicate event id; each event may appear once.']})
+        self.seen_ids.add(pk)
+        self.child.instance = self.instance.get(pk)
+        if self.child.instance is None:
+            raise serializers.ValidationError({'id': ['Event not found.']})
+        self.child.initial_data = data
+        validated = super().run_child_validation(data)
+        validated['id'] = self.child.instance.pk
+        return validated
+
+    def create(self, validated_data):
+        events = [Event(**attrs) for attrs in validated_data]
+        for event in events:
+            reset_thumbnails(event)
+        events = Event.objects.bulk_create(events, batch_size=settings.EVENTS_BULK_BATCH_SIZE)
+        # bulk_create sends no signals, so refresh the denormalized counters
+        # and queue the images here.
+        Category.objects.filter(pk__in={event.category_id for event in events}).refresh_event_counts()
+        schedule(event.pk for event in events if event.image)
+        return events
+
+    def update(self, instance, validated_data):
+        now = timezone.now()
+        fields = {'updated_at'}
+        events = []
+        category_ids = set()
+        new_images = []
+        for attrs in validated_data:
+            event = instance[attrs.pop('id')]
+            category_ids.add(event.category_id)
+            previous_image = event.image
+            for field, value in attrs.items():
+                setattr(event, field, value)
+            if (event.image or None) != (previous_image or None):
+                reset_thumbnails(event)
+                fields.update(['image_status', 'thumbnails'])
+                if event.image:
+                    new_images.append(event.pk)
+            event.updated_at = now
+            fields.update(attrs)
+            events.append(event)
+        Event.objects.bulk_update(events, sorted(fields), batch_size=settings.EVENTS_BULK_BATCH_SIZE)
+        if 'category' in fields:
+            category_ids.update(event.category_id for event in events)
+            Category.objects.filter(pk__in=category_ids).refresh_event_counts()
+        schedule(new_images)
+        return events
+
+
+class EventBulkDeleteSerializer(serializers.Serializer):
+    ids = serializers.ListField(
+        child=serializers.UUIDField(),
+        allow_empty=False,
+        max_length=settings.EVENTS_BULK_MAX_ITEMS,
+    )
+
+
+class ThumbnailsField(serializers.ReadOnlyField):
+    """Thumbnail URLs by size name, or null until they have been generated."""
+
+    def to_representation(self, value):
+        return thumbnail_urls(value)
+
+
+class CachedCategoryField(serializers.PrimaryKeyRelatedField):
+    """
+    PrimaryKeyRelatedField resolving ids through ``category_cache`` instead
+    of a query per value, with the same errors. A bulk write checks the
+    cache version once.
+
+    A category found in the snapshot is still confirmed with one EXISTS
+    query per distinct id and write: another worker may have deleted it
+    without this one hearing of it (no shared cache, or not yet), and the
+    insert would then fail on the foreign key instead of with a 400.
+    """
+
+    def to_internal_value(self, data):
+        if isinstance(data, bool):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        # Raises the same "is not a valid UUID" error as the queryset lookup.
+        pk = Category._meta.pk.to_python(data)
+        root = self.root
+        if category_cache.enabled() and getattr(root, '_category_snapshot', None) is None:
+            root._category_snapshot = category_cache.snapshot()
+        category = category_cache.get(pk, getattr(root, '_category_snapshot', None))
+        if category is None or not self.confirm(root, pk):
+            self.fail('does_not_exist', pk_value=data)
+        return category
+
+    def confirm(self, root, pk):
+        """Whether category ``pk`` is still in the primary database, asked once per write."""
+        if not category_cache.enabled():
+            return True
+        confirmed = getattr(root, '_confirmed_categories', None)
+        if confirmed is None:
+            confirmed = root._confirmed_categories = {}
+        if pk not in confirmed:
+            confirmed[pk] = Category.objects.using(DEFAULT_DB_ALIAS).filter(pk=pk).exists()
+            if not confirmed[pk]:
+                category_cache.invalidate()
+        return confirmed[pk]
+
+
+class EventSerializer(TimedRepresentationMixin, serializers.ModelSerializer):
+    category = CachedCategoryField(queryset=Category.objects.all(), allow_null=True, required=False)
     category_name = serializers.CharField(source='category.name', read_only=True)
     category_id = serializers.UUIDField(source='category.id', read_only=True)
+    thumbnails = ThumbnailsField()
 
     class Meta:
         model = Event
         fields = [
-            'id', 'title', 'description', 'venue', 'date', 'time', 'image',
-            'category', 'category_id', 'category_name', 'created_at', 'updated_at'
+            'id', 'title', 'description', 'venue', 'date', 'time', 'image', 'image_status',
+            'thumbnails', 'category', 'category_id', 'category_name', 'created_at', 'updated_at'
+        ]
+        read_only_fields = [
+            'id', 'image_status', 'category_id', 'category_name', 'created_at', 'updated_at'
         ]
-        read_only_fields = ['id', 'category_id', 'category_name', 'created_at', 'updated_at']
+        list_serializer_class = EventListSerializer
+
+    def __init__(self, *args, fields=None, **kwargs):
+        """``fields``: render only these of Meta.fields (see events.sparse)."""
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
 
     def validate_title(self, value):
         if not value.strip():
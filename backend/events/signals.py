@@ -0,0 +1,83 @@
+import time
+
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .cache import bump_generation
+from .images import reset_thumbnails, schedule
+from .models import Category, Event, Tombstone
+
+
+@receiver([post_save, post_delete], sender=Event)
+def event_changed(sender, instance, **kwargs):
+    bump_generation('events')
+
+
+@receiver([post_save, post_delete], sender=Category)
+def category_changed(sender, instance, **kwargs):
+    bump_generation('categories')
+
+
+def adjust_event_count(category_id, delta):
+    if category_id is not None:
+        Category.objects.filter(pk=category_id).update(event_count=F('event_count') + delta)
+
+
+@receiver(pre_save, sender=Event)
+def remember_previous_values(sender, instance, raw=False, **kwargs):
+    if raw:
+        instance._previous_category_id = None
+        instance._image_changed = False
+        return
+    previous_category_id, previous_image = None, None
+    if not instance._state.adding:
+        previous_category_id, previous_image = (
+            Event.objects.filter(pk=instance.pk).values_list('category_id', 'image').first()
+            or (None, None)
+        )
+    instance._previous_category_id = previous_category_id
+    instance._image_changed = (instance.image or None) != (previous_image or None)
+    if instance._image_changed:
+        reset_thumbnails(instance)
+
+
+@receiver(post_save, sender=Event)
+def update_event_count_on_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    previous = None if created else instance._previous_category_id
+    if created or previous != instance.category_id:
+        adjust_event_count(previous, -1)
+        adjust_event_count(instance.category_id, 1)
+
+
+@receiver(post_save, sender=Event)
+def process_image_on_save(sender, instance, raw=False, **kwargs):
+    if not raw and instance._image_changed and instance.image:
+        schedule([instance.pk])
+
+
+@receiver(post_delete, sender=Event)
+def update_event_count_on_delete(sender, instance, **kwargs):
+    adjust_event_count(instance.category_id, -1)
+
+
+# Process-local: pruning is opportunistic, at most this often per worker.
+PRUNE_INTERVAL = 3600
+last_pruned = 0.0
+
+
+@receiver(post_delete, sender=Event)
+@receiver(post_delete, sender=Category)
+def record_tombstone(sender, instance, **kwargs):
+    global last_pruned
+    kind = Tombstone.EVENT if sender is Event else Tombstone.CATEGORY
+    Tombstone.objects.create(
+        kind=kind,
+        object_id=instance.pk,
+        category_id=instance.category_id if sender is Event else None,
+    )
+    if time.monotonic() - last_pruned > PRUNE_INTERVAL:
+        last_pruned = time.monotonic()
+        Tombstone.objects.expired().delete()
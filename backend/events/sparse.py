@@ -0,0 +1,108 @@
+"""
+Sparse fieldsets for event reads: ``?fields=title,date`` renders only those
+fields, ``?omit=description`` all but those. Both apply to the list and
+detail actions, and trim the SQL as well as the payload: the queryset loads
+only the columns behind the chosen fields (``.only()``/``.defer()``) and
+skips the category join when no category.* field is shown, and the list fast
+path selects the same columns. ``id`` is always rendered.
+"""
+from rest_framework.exceptions import ParseError
+
+from .serializers import EventSerializer
+
+
+SPARSE_ACTIONS = ('list', 'retrieve')
+
+# Plain columns that ``omit`` can defer; created_at stays loaded for the
+# cursor paginator.
+DEFERRABLE = (
+    'title', 'description', 'venue', 'date', 'time', 'image', 'image_status',
+    'thumbnails', 'updated_at',
+)
+
+# Fields read through the category relation.
+CATEGORY_FIELDS = ('category_id', 'category_name')
+
+
+def parse_names(value):
+    return [name.strip() for name in value.split(',') if name.strip()]
+
+
+def select_fields(fields, omit, available):
+    """
+    The names to render, in ``available`` order, for ``?fields=``/``?omit=``
+    values (None when absent); None when that is every field.
+    """
+    unknown = [name for name in parse_names(fields or '') + parse_names(omit or '') if name not in available]
+    if unknown:
+        raise ParseError({
+            'error': f"Unknown field(s): {', '.join(unknown)}. Use any of: {', '.join(available)}."
+        })
+    selected = set(parse_names(fields)) if fields is not None else set(available)
+    selected -= set(parse_names(omit or ''))
+    selected.add('id')
+    if len(selected) == len(available):
+        return None
+    return tuple(name for name in available if name in selected)
+
+
+def only_paths(fields):
+    """``.only()`` arguments for rendering ``fields``."""
+    paths = {'id', 'created_at'}
+    for name in fields:
+        if name in CATEGORY_FIELDS:
+            paths.update(['category__id', 'category__name'])
+        else:
+            paths.add(name)
+    return sorted(paths)
+
+
+class SparseFieldsMixin:
+    """
+    ``?fields=``/``?omit=`` for EventViewSet. Place it before FastListMixin,
+    whose ``get_list_fields`` it provides.
+    """
+
+    fields_query_param = 'fields'
+    omit_query_param = 'omit'
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        # Reject unknown names before the cache lookup.
+        self.get_sparse_fields()
+
+    def get_sparse_fields(self):
+        """The field names to render, or None for all of them."""
+        if not hasattr(self, '_sparse_fields'):
+            params = self.request.query_params
+            self._sparse_fields = None
+            if self.action in SPARSE_ACTIONS:
+                self._sparse_fields = select_fields(
+                    params.get(self.fields_query_param),
+                    params.get(self.omit_query_param),
+                    EventSerializer.Meta.fields,
+                )
+        return self._sparse_fields
+
+    def get_list_fields(self):
+        return self.get_sparse_fields()
+
+    def get_serializer(self, *args, **kwargs):
+        fields = self.get_sparse_fields()
+        if fields is not None:
+            kwargs.setdefault('fields', fields)
+        return super().get_serializer(*args, **kwargs)
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        fields = self.get_sparse_fields()
+        if fields is None:
+            return queryset
+        if not set(CATEGORY_FIELDS) & set(fields):
+            queryset = queryset.select_related(None)
+        if self.request.query_params.get(self.fields_query_param) is not None:
+            return queryset.only(*only_paths(fields))
+        deferred = [name for name in DEFERRABLE if name not in fields]
+        if 'category' not in fields and not set(CATEGORY_FIELDS) & set(fields):
+            deferred.append('category')
+        return queryset.defer(*deferred)
@@ -0,0 +1,322 @@
+"""
+Server-Sent Events stream of event and category changes (/events/stream/).
+
+Each message carries what /events/changes/ returns for the changes it
+reports (changed events as the list renders them, changed categories, ids
+of deleted ones) and the sync token after them as its SSE id, so a
+reconnecting EventSource resumes where it stopped (``Last-Event-ID``, or
+``?since=`` with a token from /changes/). As with /changes/, a change made
+in the last ``EVENTS_SYNC_WINDOW`` seconds may arrive twice: apply changes
+as upserts. ``?category=<id>,...`` keeps changes of those categories and of
+their events.
+
+Under ASGI a single ``Broadcaster`` per process reads the changes feed for
+all of its subscribers, right after a write in the same process commits
+(``generation_bumped``) and otherwise when the shared cache generations,
+checked every ``EVENTS_STREAM_POLL_INTERVAL`` seconds, show a write made by
+another worker. Under WSGI each stream polls from its own thread, which is
+meant for development.
+
+Streams end after ``EVENTS_STREAM_MAX_AGE`` seconds, and a subscriber that
+falls more than ``QUEUE_SIZE`` messages behind is dropped; EventSource then
+reconnects and catches up from its last id. The ending also bounds streams
+whose client went away, which Django 4.2's ASGI handler does not notice.
+"""
+import asyncio
+import logging
+import threading
+import time
+import uuid
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.dispatch import receiver
+from rest_framework.renderers import BaseRenderer
+
+from .cache import generation_bumped, get_generations
+from .fastlist import FastJSONRenderer
+from .models import Tombstone
+from .sync import decode_token, initial_token, read_changes, render_changes
+
+
+logger = logging.getLogger(__name__)
+
+NAMESPACES = ('events', 'categories')
+
+# Messages a subscriber may fall behind before it is dropped.
+QUEUE_SIZE = 100
+
+# Read the feed at least this often even when no generation moved, for
+# deployments whose workers do not share a cache.
+RESYNC_INTERVAL = 30
+
+# Reconnection delay (milliseconds) suggested to EventSource.
+RETRY_MS = 3000
+
+
+def setting(name):
+    return getattr(settings, f'EVENTS_STREAM_{name}')
+
+
+def parse_categories(value):
+    """``?category=`` as a set of category ids; None when absent."""
+    if not value:
+        return None
+    return {str(uuid.UUID(item.strip())) for item in value.split(',') if item.strip()}
+
+
+def matches(change, categories):
+    if categories is None:
+        return True
+    _, pk, kind, row = change
+    if kind == 'event':
+        category_id = row.category_id
+    elif kind == 'tombstone' and row.kind == Tombstone.EVENT:
+        category_id = row.category_id
+    else:
+        category_id = pk
+    return category_id is not None and str(category_id) in categories
+
+
+def message(data, event=None, id=None, retry=None):
+    lines = []
+    if retry is not None:
+        lines.append(f'retry: {retry}')
+    if event is not None:
+        lines.append(f'event: {event}')
+    if id is not None:
+        lines.append(f'id: {id}')
+    # FastJSONRenderer output is a single line.
+    lines.append('data: ' + FastJSONRenderer().render(data).decode('utf-8'))
+    return ('\n'.join(lines) + '\n\n').encode('utf-8')
+
+
+def change_key(change):
+    moment, pk, kind, _ = change
+    return kind, pk, moment
+
+
+def changes_message(changes, token):
+    data = render_changes(changes, token, False)
+    del data['has_more']
+    return message(data, event='changes', id=token)
+
+
+HEARTBEAT = b': keepalive\n\n'
+
+
+class ChangeFeed:
+    """
+    The changes feed read from a position onwards, each change once: the feed
+    itself repeats the last sync window's changes until the window passes.
+    """
+
+    def __init__(self, moment, pk):
+        self.moment, self.pk = moment, pk
+        self.seen = {}
+
+    def pages(self):
+        """(changes, token) pages of changes not read before, up to now."""
+        limit = settings.EVENTS_SYNC_MAX_LIMIT
+        while True:
+            page, token, has_more = read_changes(self.moment, self.pk, limit)
+            fresh = [change for change in page if change_key(change) not in self.seen]
+            for change in fresh:
+                self.seen[change_key(change)] = change[0]
+            self.moment, self.pk = decode_token(token)
+            if fresh:
+                yield fresh, token
+            if not has_more:
+                break
+        # Changes behind the position cannot be read again.
+        self.seen = {key: moment for key, moment in self.seen.items() if moment >= self.moment}
+
+    def read(self):
+        """``pages()`` as a list; when a query fails the position stays where it was."""
+        state = self.moment, self.pk, dict(self.seen)
+        try:
+            return list(self.pages())
+        except Exception:
+            self.moment, self.pk, self.seen = state
+            raise
+
+
+active_streams = 0
+active_streams_lock = threading.Lock()
+
+
+def count_stream(delta):
+    global active_streams
+    with active_streams_lock:
+        active_streams += delta
+
+
+def stream_limit_reached():
+    return active_streams >= setting('MAX_SUBSCRIBERS')
+
+
+class Subscription:
+    def __init__(self, categories):
+        self.categories = categories
+        self.queue = asyncio.Queue(QUEUE_SIZE)
+        self.dropped = False
+
+    def offer(self, changes, token, rendered):
+        """Queue the message for ``changes``; ``rendered`` shares it between equal filters."""
+        key = frozenset(self.categories) if self.categories is not None else None
+        if key not in rendered:
+            changes = [change for change in changes if matches(change, self.categories)]
+            rendered[key] = changes_message(changes, token) if changes else None
+        if rendered[key] is None or self.dropped:
+            return
+        try:
+            self.queue.put_nowait(rendered[key])
+        except asyncio.QueueFull:
+            self.dropped = True
+
+
+class Broadcaster:
+    """Reads the changes feed once per process and fans it out to subscribers."""
+
+    def __init__(self, loop):
+        self.loop = loop
+        self.subscribers = set()
+        self.wakeup = asyncio.Event()
+        self.task = None
+
+    def subscribe(self, categories):
+        subscription = Subscription(categories)
+        self.subscribers.add(subscription)
+        if self.task is None:
+            self.task = self.loop.create_task(self.run())
+        return subscription
+
+    def unsubscribe(self, subscription):
+        self.subscribers.discard(subscription)
+
+    def notify(self):
+        """Read the feed now; callable from any thread."""
+        try:
+            self.loop.call_soon_threadsafe(self.wakeup.set)
+        except RuntimeError:
+            # The loop has closed.
+            pass
+
+    async def run(self):
+        try:
+            feed, generations = await sync_to_async(self.start)()
+            last_read = self.loop.time()
+            while self.subscribers:
+                try:
+                    await asyncio.wait_for(self.wakeup.wait(), setting('POLL_INTERVAL'))
+                except asyncio.TimeoutError:
+                    pass
+                self.wakeup.clear()
+                current = await sync_to_async(get_generations)(NAMESPACES)
+                if current == generations and self.loop.time() - last_read < RESYNC_INTERVAL:
+                    continue
+                generations, last_read = current, self.loop.time()
+                try:
+                    pages = await sync_to_async(feed.read)()
+                except Exception:
+                    # Try again on the next poll; subscribers keep waiting.
+                    logger.exception('Reading the changes feed failed')
+                    generations = None
+                    continue
+                for changes, token in pages:
+                    rendered = {}
+                    for subscription in list(self.subscribers):
+                        subscription.offer(changes, token, rendered)
+        finally:
+            self.task = None
+
+    def start(self):
+        """The feed from the start of the sync window, and the generations it reflects."""
+        generations = get_generations(NAMESPACES)
+        return ChangeFeed(*decode_token(initial_token())), generations
+
+
+_broadcaster = None
+
+
+def get_broadcaster():
+    """This process's broadcaster, on the running event loop."""
+    global _broadcaster
+    loop = asyncio.get_running_loop()
+    if _broadcaster is None or _broadcaster.loop is not loop:
+        _broadcaster = Broadcaster(loop)
+    return _broadcaster
+
+
+@receiver(generation_bumped)
+def wake_broadcaster(sender, namespaces, **kwargs):
+    if _broadcaster is not None and _broadcaster.subscribers:
+        _broadcaster.notify()
+
+
+async def aevent_stream(token, since, categories):
+    """
+    The stream for an ASGI request: catch up from ``since`` (a position, or
+    None), then relay the broadcaster's messages.
+    """
+    count_stream(1)
+    broadcaster = get_broadcaster()
+    # Subscribe before catching up, so nothing written meanwhile is missed.
+    subscription = broadcaster.subscribe(categories)
+    deadline = time.monotonic() + setting('MAX_AGE')
+    try:
+        yield message({'next': token}, event='ready', id=token, retry=RETRY_MS)
+        if since is not None:
+            pages = ChangeFeed(*since).pages()
+            while (page := await sync_to_async(next)(pages, None)) is not None:
+                changes = [change for change in page[0] if matches(change, categories)]
+                if changes:
+                    yield await sync_to_async(changes_message)(changes, page[1])
+        while not subscription.dropped and time.monotonic() < deadline:
+            try:
+                yield await asyncio.wait_for(
+                    subscription.queue.get(),
+                    min(setting('HEARTBEAT'), max(0, deadline - time.monotonic())),
+                )
+            except asyncio.TimeoutError:
+                yield HEARTBEAT
+    finally:
+        broadcaster.unsubscribe(subscription)
+        count_stream(-1)
+
+
+def event_stream(token, since, categories):
+    """The stream for a WSGI request: polls the feed on its own."""
+    count_stream(1)
+    deadline = time.monotonic() + setting('MAX_AGE')
+    try:
+        yield message({'next': token}, event='ready', id=token, retry=RETRY_MS)
+        feed = ChangeFeed(*(since or decode_token(token)))
+        generations = None
+        last_read = last_sent = time.monotonic()
+        while time.monotonic() < deadline:
+            current = get_generations(NAMESPACES)
+            if current != generations or time.monotonic() - last_read >= RESYNC_INTERVAL:
+                generations, last_read = current, time.monotonic()
+                for changes, page_token in feed.pages():
+                    changes = [change for change in changes if matches(change, categories)]
+                    if changes:
+                        last_sent = time.monotonic()
+                        yield changes_message(changes, page_token)
+            if time.monotonic() - last_sent >= setting('HEARTBEAT'):
+                last_sent = time.monotonic()
+                yield HEARTBEAT
+            time.sleep(setting('POLL_INTERVAL'))
+    finally:
+        count_stream(-1)
+
+
+class EventStreamRenderer(BaseRenderer):
+    """Lets /events/stream/ accept ``text/event-stream``; errors go out as an ``error`` event."""
+
+    media_type = 'text/event-stream'
+    format = 'sse'
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return message(data, event='error')
@@ -0,0 +1,177 @@
+"""
+Delta sync (/events/changes/) and Last-Modified timestamps.
+
+A sync token is an opaque position in the (timestamp, id) order shared by
+event and category ``updated_at`` and tombstone ``deleted_at``; a page
+returns everything after it in that order. The final page's token stays
+``EVENTS_SYNC_WINDOW`` seconds behind the clock, so a row whose transaction
+commits late, with an ``updated_at`` a little in the past, is still picked
+up by the next call (clients may see a recent row twice; apply changes as
+upserts).
+"""
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+import binascii
+import datetime
+import math
+import uuid
+
+from django.conf import settings
+from django.db.models import Q, Subquery
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .fastlist import event_rows, event_values
+from .models import Category, Event, Tombstone
+from .serializers import CategorySerializer
+
+
+class InvalidToken(ValueError):
+    pass
+
+
+def encode_token(moment, pk=None):
+    token = f"{moment.isoformat()}|{pk or ''}"
+    return urlsafe_b64encode(token.encode('ascii')).decode('ascii')
+
+
+def decode_token(encoded):
+    try:
+        moment, pk = urlsafe_b64decode(encoded.encode('ascii')).decode('ascii').split('|')
+        moment = parse_datetime(moment)
+        pk = uuid.UUID(pk) if pk else None
+    except (binascii.Error, UnicodeError, ValueError):
+        raise InvalidToken(encoded)
+    if moment is None or timezone.is_naive(moment):
+        raise InvalidToken(encoded)
+    return moment, pk
+
+
+def after(time_field, id_field, moment, pk):
+    """
+    Rows after (moment, pk) in (time_field, id_field) order. The leading
+    ``>=`` lets the database seek the index instead of filtering all of it.
+    """
+    if pk is None:
+        return Q(**{f'{time_field}__gte': moment})
+    return Q(**{f'{time_field}__gte': moment}) & (
+        Q(**{f'{time_field}__gt': moment}) | Q(**{f'{id_field}__gt': pk})
+    )
+
+
+def sync_window():
+    return datetime.timedelta(seconds=getattr(settings, 'EVENTS_SYNC_WINDOW', 5))
+
+
+def initial_token():
+    return encode_token(timezone.now() - sync_window())
+
+
+def token_expired(moment):
+    """Whether tombstones from right after ``moment`` may already have been pruned."""
+    retention = getattr(settings, 'EVENTS_TOMBSTONE_RETENTION_DAYS', 30)
+    return moment < timezone.now() - datetime.timedelta(days=retention)
+
+
+def read_changes(moment, pk, limit):
+    """
+    Up to ``limit`` changes after (moment, pk), as (timestamp, id, kind, row)
+    in that order, with the token to continue from and whether more follow.
+    Each source is read with one keyset query over its (timestamp, id) index.
+    """
+    events = list(event_values(
+        Event.objects.filter(after('updated_at', 'id', moment, pk)).order_by('updated_at', 'id'),
+        named=True,
+    )[:limit + 1])
+    categories = list(
+        Category.objects.filter(after('updated_at', 'id', moment, pk))
+        .order_by('updated_at', 'id')[:limit + 1]
+    )
+    tombstones = list(
+        Tombstone.objects.filter(after('deleted_at', 'object_id', moment, pk))
+        .order_by('deleted_at', 'object_id')[:limit + 1]
+    )
+
+    merged = sorted(
+        [(row.updated_at, row.id, 'event', row) for row in events]
+        + [(category.updated_at, category.id, 'category', category) for category in categories]
+        + [(tombstone.deleted_at, tombstone.object_id, 'tombstone', tombstone) for tombstone in tombstones],
+        key=lambda change: change[:2],
+    )
+    has_more = len(merged) > limit
+    page = merged[:limit]
+
+    if has_more:
+        next_token = encode_token(*page[-1][:2])
+    else:
+        # Hold the final token back by the sync window, but never behind the
+        # one the client sent.
+        last = page[-1][:2] if page else (moment, pk)
+        horizon = timezone.now() - sync_window()
+        if last[0] > horizon:
+            last = max((moment, pk), (horizon, None), key=lambda position: position[0])
+        next_token = encode_token(*last)
+    return page, next_token, has_more
+
+
+def render_changes(page, next_token, has_more):
+    """A ``read_changes`` page as /events/changes/ returns it."""
+    deleted = {'events': [], 'categories': []}
+    for _, _, kind, change in page:
+        if kind == 'tombstone':
+            deleted['events' if change.kind == Tombstone.EVENT else 'categories'].append(
+                str(change.object_id)
+            )
+    return {
+        'events': list(event_rows(change for _, _, kind, change in page if kind == 'event')),
+        'categories': CategorySerializer(
+            [change for _, _, kind, change in page if kind == 'category'], many=True
+        ).data,
+        'deleted': deleted,
+        'next': next_token,
+        'has_more': has_more,
+    }
+
+
+def changes_since(moment, pk, limit):
+    """
+    Up to ``limit`` changes after (moment, pk): changed events (as the list
+    endpoint renders them) and categories, and ids of deleted ones.
+    """
+    return render_changes(*read_changes(moment, pk, limit))
+
+
+def data_last_modified():
+    """
+    When events, categories or the set of either last changed, in one query
+    (three index lookups); None for an empty database.
+    """
+    latest_category = Category.objects.order_by('-updated_at').values('updated_at')[:1]
+    latest_tombstone = Tombstone.objects.order_by('-deleted_at').values('deleted_at')[:1]
+    row = (
+        Event.objects.order_by('-updated_at')
+        .annotate(category_updated=Subquery(latest_category), deleted=Subquery(latest_tombstone))
+        .values_list('updated_at', 'category_updated', 'deleted')
+        .first()
+    )
+    if row is None:
+        # No events; the categories and tombstones still count.
+        row = (
+            Category.objects.order_by('-updated_at').values_list('updated_at', flat=True).first(),
+            Tombstone.objects.order_by('-deleted_at').values_list('deleted_at', flat=True).first(),
+        )
+    moments = [moment for moment in row if moment is not None]
+    return max(moments) if moments else None
+
+
+def http_last_modified(moment):
+    """
+    ``moment`` rounded up to the whole second an HTTP date can express, or
+    None while that second is still running: a change later in the same
+    second would carry the same Last-Modified and be missed.
+    """
+    if moment is None:
+        return None
+    seconds = math.ceil(moment.timestamp())
+    if seconds > timezone.now().timestamp():
+        return None
+    return seconds
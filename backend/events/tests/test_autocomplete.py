@@ -0,0 +1,123 @@
+import uuid
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+
+from events import autocomplete
+from events.cache import generation_key, get_cache
+from events.models import Category, Event
+
+from .utils import create_events
+
+
+def normalized(result):
+    return {kind: sorted(map(str, values)) for kind, values in result.items()}
+
+
+@override_settings(EVENTS_CACHE_TIMEOUT=0, EVENTS_IMAGE_WORKERS=0)
+class AutocompleteTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        with cls.captureOnCommitCallbacks(execute=True):
+            create_events()
+        cls.event = Event.objects.select_related('category').order_by('title').first()
+
+    def setUp(self):
+        # A fresh index per test.
+        autocomplete._autocomplete = None
+        self.addCleanup(setattr, autocomplete, '_autocomplete', None)
+
+    def build_index(self):
+        """Build the index on this thread, which sees the test's transaction."""
+        instance = autocomplete.get_autocomplete()
+        with mock.patch.object(autocomplete.connections, 'close_all'):
+            instance.build()
+        self.assertIsNotNone(instance.index)
+        return instance
+
+    def suggest(self, text, limit=autocomplete.MAX_LIMIT):
+        response = self.client.get('/api/autocomplete/', {'q': text, 'limit': limit})
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def titles(self, text):
+        return self.suggest(text)['titles']
+
+    def write(self, func):
+        with self.captureOnCommitCallbacks(execute=True):
+            return func()
+
+    def test_the_database_answers_until_the_index_is_built(self):
+        prefixes = [self.event.title[:-3], self.event.venue, self.event.category.name[:-1], 'zz-no-such-prefix']
+        with mock.patch.object(autocomplete.Autocomplete, 'start_build') as start_build:
+            from_database = [self.suggest(text) for text in prefixes]
+        start_build.assert_called()
+        self.assertIsNone(autocomplete.get_autocomplete().index)
+        self.build_index()
+        self.assertEqual([normalized(self.suggest(text)) for text in prefixes],
+                         [normalized(result) for result in from_database])
+
+    def test_matching_ignores_case_and_spacing(self):
+        self.build_index()
+        self.assertIn(self.event.title, self.titles('  ' + self.event.title.upper().replace(' ', '   ')))
+
+    def test_writes_in_this_process_show_up_in_the_next_request(self):
+        self.build_index()
+        title = self.event.title
+        self.event.title = 'Zanzibar Quarterly Meetup'
+        self.write(self.event.save)
+        self.assertEqual(self.titles('zanzibar'), ['Zanzibar Quarterly Meetup'])
+        self.assertNotIn(title, self.titles(title))
+        self.event.title = title
+        self.write(self.event.save)
+        self.assertEqual(self.titles('zanzibar'), [])
+        self.assertIn(title, self.titles(title))
+
+        category = self.write(lambda: Category.objects.create(name='Quokka Sightings'))
+        self.assertEqual(self.suggest('quok')['categories'], [{'id': str(category.pk), 'name': 'Quokka Sightings'}])
+        self.write(category.delete)
+        self.assertEqual(self.suggest('quok')['categories'], [])
+
+        created = self.write(lambda: Event.objects.create(
+            title='Ephemeral Launch Party', venue='Nowhere Hall', date=self.event.date, time=self.event.time,
+        ))
+        self.assertEqual(self.titles('ephemeral'), ['Ephemeral Launch Party'])
+        self.write(created.delete)
+        self.assertEqual(self.titles('ephemeral'), [])
+
+    @override_settings(EVENTS_AUTOCOMPLETE_REFRESH_INTERVAL=0)
+    def test_writes_of_other_workers_show_up_through_the_shared_generation(self):
+        self.build_index()
+        # Catch up with the feed once, as the first request after the build does.
+        self.titles(self.event.title)
+        # No signal in this process: only the row and the shared generation change.
+        Event.objects.filter(pk=self.event.pk).update(title='Yellowstone Elsewhere', updated_at=timezone.now())
+        get_cache().incr(generation_key('events'))
+        self.assertEqual(self.titles('yellowstone'), ['Yellowstone Elsewhere'])
+
+    def test_asgi_requests_are_served(self):
+        self.build_index()
+
+        async def get():
+            return await self.async_client.get(f'/api/autocomplete/?q={self.event.venue}')
+
+        with self.settings(ROOT_URLCONF='event_management.asgi_urls'):
+            response = async_to_sync(get)()
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(self.event.venue, response.json()['venues'])
+
+    def test_bad_limits_are_refused(self):
+        response = self.client.get('/api/autocomplete/', {'q': 'a', 'limit': 0})
+        self.assertEqual(response.status_code, 400)
+
+
+class AutocompleteIndexTests(SimpleTestCase):
+    def test_the_index_stops_at_its_maximum(self):
+        index = autocomplete.AutocompleteIndex(max_events=3)
+        index.load([(uuid.uuid4(), f'Event {n}', 'Hall') for n in range(3)], [])
+        index.put_event(uuid.uuid4(), 'One Too Many', 'Overflow Hall')
+        self.assertTrue(index.full)
+        self.assertEqual(len(index.events), 3)
+        self.assertEqual(index.titles.lookup('one too many', 5), [])
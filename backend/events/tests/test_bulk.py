@@ -0,0 +1,46 @@
+import datetime
+
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from events.models import Category, Event
+
+
+class BulkUpdateTests(APITestCase):
+    url = '/api/events/bulk/'
+
+    def setUp(self):
+        category = Category.objects.create(name='Conference')
+        self.events = [
+            Event.objects.create(title=f'Event {n}', venue='Hall', date=datetime.date(2030, 1, n + 1),
+                                 time=datetime.time(10), category=category)
+            for n in range(2)
+        ]
+
+    def test_partial_update(self):
+        response = self.client.patch(self.url, [
+            {'id': str(event.pk), 'venue': f'Room {n}'} for n, event in enumerate(self.events)
+        ], format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            sorted(Event.objects.values_list('venue', flat=True)), ['Room 0', 'Room 1']
+        )
+
+    def test_duplicate_id_is_rejected(self):
+        pk = str(self.events[0].pk)
+        response = self.client.patch(self.url, [
+            {'id': pk, 'venue': 'First'},
+            {'id': str(self.events[1].pk), 'venue': 'Other'},
+            {'id': pk, 'venue': 'Second'},
+        ], format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data[0], {})
+        self.assertEqual(response.data[1], {})
+        self.assertIn('id', response.data[2])
+        # Nothing is saved when any item is invalid.
+        self.assertEqual(set(Event.objects.values_list('venue', flat=True)), {'Hall'})
+
+    def test_missing_id_is_rejected(self):
+        response = self.client.put(self.url, [{'title': 'No id'}], format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('id', response.data[0])
@@ -0,0 +1,129 @@
+import time
+
+from asgiref.sync import async_to_sync
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from events.cache import generation_key, get_cache
+from events.categories import category_cache
+from events.models import Category
+
+from .utils import create_events
+
+
+def event_payload(category, n=0):
+    return {'title': f'Category cache check {n}', 'venue': 'Cache Hall', 'date': '2030-01-01',
+            'time': '10:00:00', 'category': category}
+
+
+@override_settings(EVENTS_CACHE_TIMEOUT=0, EVENTS_CATEGORY_CACHE_TIMEOUT=300, EVENTS_IMAGE_WORKERS=0)
+class CategoryCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        with cls.captureOnCommitCallbacks(execute=True):
+            cls.category = create_events()[0]
+
+    def setUp(self):
+        category_cache.invalidate()
+
+    def request(self, method, path, body=None):
+        """An API request whose commit callbacks, and so the generation bump, run right away."""
+        with self.captureOnCommitCallbacks(execute=True):
+            response = getattr(self.client, method)(path, body, content_type='application/json')
+        return response.status_code, response.json() if response.content else None
+
+    def category_reads(self, func):
+        """``func()``'s result and the SELECTs on the categories table it ran."""
+        with CaptureQueriesContext(connection) as queries:
+            result = func()
+        reads = [query['sql'] for query in queries.captured_queries
+                 if query['sql'].startswith('SELECT') and 'FROM "events_category"' in query['sql']]
+        return result, reads
+
+    def listed_names(self):
+        return [item['name'] for item in self.request('get', '/api/categories/?page_size=100')[1]['results']]
+
+    def test_event_writes_only_confirm_their_category_exists(self):
+        self.request('get', '/api/categories/')
+        (status, data), reads = self.category_reads(
+            lambda: self.request('post', '/api/events/', event_payload(str(self.category.pk)))
+        )
+        self.assertEqual(status, 201)
+        self.assertEqual(data['category_name'], self.category.name)
+        self.assertEqual(len(reads), 1, reads)
+        (status, data), reads = self.category_reads(lambda: self.request(
+            'post', '/api/events/bulk/', [event_payload(str(self.category.pk), n) for n in range(50)]
+        ))
+        self.assertEqual(status, 201)
+        self.assertEqual(len(reads), 1, reads)
+
+    def test_invalid_categories_get_the_same_errors_as_without_the_cache(self):
+        invalid = ['not-a-uuid', '00000000-0000-0000-0000-000000000000', 5, True, None]
+        cached = [self.request('post', '/api/events/', event_payload(value)) for value in invalid]
+        with self.settings(EVENTS_CATEGORY_CACHE_TIMEOUT=0):
+            uncached = [self.request('post', '/api/events/', event_payload(value)) for value in invalid]
+        self.assertEqual(cached, uncached)
+
+    def test_category_lists_are_served_without_queries(self):
+        self.request('get', '/api/categories/')
+        (status, data), reads = self.category_reads(lambda: self.request('get', '/api/categories/'))
+        self.assertEqual(status, 200)
+        self.assertEqual(reads, [])
+        self.assertEqual(data['results'][0]['name'], self.category.name)
+
+        async def get():
+            return await self.async_client.get('/api/categories/')
+
+        with self.settings(ROOT_URLCONF='event_management.asgi_urls'):
+            response = async_to_sync(get)()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['results'], data['results'])
+
+    def test_counts_and_search_still_query_the_database(self):
+        status, data = self.request('get', '/api/categories/?with_counts=true')
+        self.assertEqual(status, 200)
+        self.assertEqual(data['results'][0]['event_count'], 20)
+        status, data = self.request('get', f'/api/categories/?search={self.category.name}')
+        self.assertEqual([item['id'] for item in data['results']], [str(self.category.pk)])
+
+    def test_category_writes_here_are_seen_by_the_next_request(self):
+        status, created = self.request('post', '/api/categories/', {'name': 'Cache Probe'})
+        self.assertEqual(status, 201)
+        self.assertIn('Cache Probe', self.listed_names())
+        self.request('put', f"/api/categories/{created['id']}/", {'name': 'Cache Probe Renamed'})
+        status, data = self.request('post', '/api/events/', event_payload(created['id']))
+        self.assertEqual(status, 201)
+        self.assertEqual(data['category_name'], 'Cache Probe Renamed')
+        self.request('delete', f"/api/events/{data['id']}/")
+        self.request('delete', f"/api/categories/{created['id']}/")
+        status, data = self.request('post', '/api/events/', event_payload(created['id']))
+        self.assertEqual(status, 400)
+        self.assertIn('category', data)
+
+    def test_a_category_deleted_by_another_worker_is_rejected(self):
+        doomed = Category.objects.create(name='Cache Probe Doomed')
+        self.request('get', '/api/categories/')
+        # No signal and no generation bump: the snapshot still has it.
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {Category._meta.db_table} WHERE id = %s',
+                           [Category._meta.pk.get_db_prep_value(doomed.pk, connection)])
+        status, data = self.request('post', '/api/events/', event_payload(str(doomed.pk)))
+        self.assertEqual(status, 400)
+        self.assertIn('category', data)
+        self.assertNotIn('Cache Probe Doomed', self.listed_names())
+
+    def test_a_rename_by_another_worker_is_seen_through_the_shared_generation(self):
+        self.request('get', '/api/categories/')
+        Category.objects.filter(pk=self.category.pk).update(name='Renamed Elsewhere', updated_at=timezone.now())
+        get_cache().incr(generation_key('categories'))
+        self.assertIn('Renamed Elsewhere', self.listed_names())
+
+    @override_settings(EVENTS_CATEGORY_CACHE_TIMEOUT=0.05)
+    def test_unannounced_changes_are_picked_up_once_the_snapshot_expires(self):
+        self.request('get', '/api/categories/')
+        Category.objects.filter(pk=self.category.pk).update(name='Renamed Quietly', updated_at=timezone.now())
+        self.assertNotIn('Renamed Quietly', self.listed_names())
+        time.sleep(0.1)
+        self.assertIn('Renamed Quietly', self.listed_names())
@@ -0,0 +1,108 @@
+import gzip
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+import brotli
+from django.test import TestCase, override_settings
+
+from events import cache, compression
+from events.cache import get_cache
+
+from .utils import create_events
+
+
+def decompress(encoding, content):
+    if encoding == 'br':
+        return brotli.decompress(content)
+    if encoding == 'gzip':
+        return gzip.decompress(content)
+    return content
+
+
+@override_settings(EVENTS_CACHE_TIMEOUT=300, EVENTS_COMPRESSION_ENABLED=True, EVENTS_IMAGE_WORKERS=0)
+class CompressionTests(TestCase):
+    list_path = '/api/events/?page_size=100'
+
+    @classmethod
+    def setUpTestData(cls):
+        with cls.captureOnCommitCallbacks(execute=True):
+            cls.category = create_events()[0]
+
+    def setUp(self):
+        get_cache().clear()
+
+    def get(self, path, **headers):
+        return self.client.get(path, headers=headers)
+
+    def content(self, response):
+        return b''.join(response.streaming_content) if response.streaming else response.content
+
+    def test_responses_are_compressed_with_the_negotiated_encoding(self):
+        plain = self.get(self.list_path).content
+        for encoding in ('br', 'gzip'):
+            with self.subTest(encoding=encoding):
+                response = self.get(self.list_path, Accept_Encoding=encoding)
+                self.assertEqual(response['Content-Encoding'], encoding)
+                self.assertEqual(decompress(encoding, response.content), plain)
+                self.assertTrue(response['ETag'].startswith('W/"'), response['ETag'])
+                self.assertIn('accept-encoding', response['Vary'].lower())
+
+    def test_cache_hits_reuse_the_compressed_copy(self):
+        plain = self.get(self.list_path).content
+        with mock.patch.object(cache, 'compress', wraps=compression.compress) as compress:
+            self.get(self.list_path, Accept_Encoding='br')
+            response = self.get(self.list_path, Accept_Encoding='br')
+        self.assertEqual(response['X-Cache'], 'HIT')
+        self.assertEqual(compress.call_count, 1)
+        self.assertEqual(brotli.decompress(response.content), plain)
+
+    def test_weak_and_strong_etags_revalidate(self):
+        etag = self.get(self.list_path, Accept_Encoding='gzip')['ETag']
+        for tag in (etag, etag[2:]):
+            with self.subTest(tag=tag):
+                response = self.get(self.list_path, Accept_Encoding='gzip', If_None_Match=tag)
+                self.assertEqual(response.status_code, 304)
+
+    def test_small_responses_are_left_uncompressed(self):
+        response = self.get(f'/api/categories/{self.category.pk}/', Accept_Encoding='br')
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertIn('accept-encoding', response['Vary'].lower())
+
+    def test_refused_encodings_are_not_used(self):
+        response = self.get(self.list_path, Accept_Encoding='gzip;q=0, br;q=0, identity')
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+    @override_settings(STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage')
+    def test_html_pages_are_left_uncompressed(self):
+        # Admin pages carry CSRF tokens (BREACH).
+        response = self.get('/admin/login/', Accept_Encoding='gzip, br')
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+    def test_streamed_exports_are_compressed(self):
+        for output in ('ndjson', 'csv'):
+            with self.subTest(output=output):
+                plain = self.content(self.get(f'/api/events/export/?output={output}'))
+                response = self.get(f'/api/events/export/?output={output}', Accept_Encoding='gzip')
+                self.assertEqual(response['Content-Encoding'], 'gzip')
+                self.assertEqual(gzip.decompress(self.content(response)), plain)
+
+
+@override_settings(ROOT_URLCONF='event_management.asgi_urls')
+class AsyncCompressionTests(CompressionTests):
+    """The same through the ASGI handler and the async read views."""
+
+    def get(self, path, **headers):
+        async def get():
+            return await self.async_client.get(path, headers=headers)
+
+        return async_to_sync(get)()
+
+    def content(self, response):
+        if not response.streaming:
+            return response.content
+
+        async def read():
+            return b''.join([chunk async for chunk in response.streaming_content])
+
+        return async_to_sync(read)()
@@ -0,0 +1,60 @@
+import gzip
+
+from asgiref.sync import async_to_sync
+from django.test import TestCase, override_settings
+
+from events.models import Event
+
+from .utils import create_events
+
+
+@override_settings(EVENTS_CACHE_TIMEOUT=0, EVENTS_COMPRESSION_ENABLED=True, EVENTS_IMAGE_WORKERS=0)
+class UncachedETagTests(TestCase):
+    """With the response cache off, responses are rendered every time but still revalidate."""
+
+    @classmethod
+    def setUpTestData(cls):
+        with cls.captureOnCommitCallbacks(execute=True):
+            create_events()
+        cls.event = Event.objects.first()
+
+    def get(self, path, **headers):
+        return self.client.get(path, headers=headers)
+
+    def test_unchanged_responses_revalidate(self):
+        for path in ('/api/events/', f'/api/events/{self.event.pk}/', '/api/categories/?with_counts=true'):
+            with self.subTest(path=path):
+                response = self.get(path)
+                self.assertEqual(response.status_code, 200)
+                self.assertNotIn('X-Cache', response)
+                response = self.get(path, If_None_Match=response['ETag'])
+                self.assertEqual(response.status_code, 304)
+                self.assertEqual(response.content, b'')
+
+    def test_changed_responses_do_not(self):
+        path = f'/api/events/{self.event.pk}/'
+        etag = self.get(path)['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            Event.objects.filter(pk=self.event.pk).update(title='Changed')
+        response = self.get(path, If_None_Match=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_compressed_responses_revalidate_with_their_weak_etag(self):
+        response = self.get('/api/events/?page_size=100', Accept_Encoding='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertTrue(response['ETag'].startswith('W/"'), response['ETag'])
+        gzip.decompress(response.content)
+        response = self.get('/api/events/?page_size=100', Accept_Encoding='gzip', If_None_Match=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+
+@override_settings(ROOT_URLCONF='event_management.asgi_urls')
+class AsyncUncachedETagTests(UncachedETagTests):
+    """The same through the async read views."""
+
+    def get(self, path, **headers):
+        async def get():
+            return await self.async_client.get(path, headers=headers)
+
+        return async_to_sync(get)()
@@ -0,0 +1,100 @@
+from asgiref.sync import async_to_sync
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from events.models import Event
+
+from .utils import create_edge_cases, create_events
+
+
+FIELD_SETS = [
+    ('fields=title,date', ['id', 'title', 'date'], ()),
+    ('fields=id,category_name', ['id', 'category_name'], ()),
+    ('fields=category', ['id', 'category'], ()),
+    ('omit=description,thumbnails,category_name', None, ('description', 'thumbnails', 'category_name')),
+    ('fields=title,venue&omit=venue', ['id', 'title'], ('venue',)),
+]
+
+
+def trimmed(item, fields, omit):
+    return {name: value for name, value in item.items() if (fields is None or name in fields) and name not in omit}
+
+
+def selected_columns(sql):
+    """The events table columns a SELECT reads."""
+    select = sql.split(' FROM "events_event"')[0][len('SELECT '):]
+    return {column.split('.')[-1].strip('"') for column in select.split(', ') if column.startswith('"events_event"')}
+
+
+@override_settings(EVENTS_CACHE_TIMEOUT=0, EVENTS_IMAGE_WORKERS=0)
+class SparseFieldsetTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        with cls.captureOnCommitCallbacks(execute=True):
+            category = create_events()[0]
+        create_edge_cases(category)
+        cls.event_ids = [str(pk) for pk in Event.objects.order_by('title').values_list('pk', flat=True)]
+
+    def get(self, path):
+        return self.client.get(path)
+
+    def test_fields_and_omit_trim_the_full_response(self):
+        full = self.get('/api/events/?page_size=100').json()['results']
+        detail = self.get(f'/api/events/{self.event_ids[0]}/').json()
+        for fast in (True, False):
+            for query, fields, omit in FIELD_SETS:
+                with self.subTest(fast=fast, query=query), self.settings(EVENTS_FAST_LIST=fast):
+                    response = self.get(f'/api/events/?page_size=100&{query}')
+                    self.assertEqual(response.status_code, 200)
+                    self.assertEqual(response.json()['results'], [trimmed(item, fields, omit) for item in full])
+                    response = self.get(f'/api/events/{self.event_ids[0]}/?{query}')
+                    self.assertEqual(response.status_code, 200)
+                    self.assertEqual(response.json(), trimmed(detail, fields, omit))
+
+    def test_only_the_columns_behind_the_fields_are_selected(self):
+        for query, columns, joined in (
+            ('fields=title,date', {'id', 'title', 'date', 'created_at'}, False),
+            ('fields=title,category_name', {'id', 'title', 'category_id', 'created_at'}, True),
+        ):
+            for fast in (True, False):
+                with self.subTest(fast=fast, query=query), self.settings(EVENTS_FAST_LIST=fast):
+                    with CaptureQueriesContext(connection) as queries:
+                        self.assertEqual(self.get(f'/api/events/?{query}').status_code, 200)
+                    page = queries.captured_queries[-1]['sql']
+                    self.assertEqual(selected_columns(page), columns, page)
+                    self.assertEqual('events_category' in page, joined, page)
+
+    def test_unknown_fields_are_refused(self):
+        response = self.get('/api/events/?fields=title,nope')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('nope', response.json()['error'])
+
+    def test_ids_fetches_exactly_those_events_in_one_query(self):
+        wanted = self.event_ids[:30]
+        with CaptureQueriesContext(connection) as queries:
+            response = self.get('/api/events/?ids=' + ','.join(wanted))
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertCountEqual([item['id'] for item in data['results']], wanted)
+        self.assertIsNone(data['next'])
+        sql = [query['sql'] for query in queries.captured_queries]
+        self.assertEqual(len([query for query in sql if 'IN (' in query]), 1, sql)
+        self.assertFalse(any('COUNT(' in query for query in sql), sql)
+
+    def test_bad_ids_are_refused(self):
+        ids = self.event_ids + [str(Event().pk) for _ in range(101 - len(self.event_ids))]
+        for query in ('ids=' + ','.join(ids), 'ids=not-a-uuid'):
+            with self.subTest(query=query[:40]):
+                self.assertEqual(self.get(f'/api/events/?{query}').status_code, 400)
+
+
+@override_settings(ROOT_URLCONF='event_management.asgi_urls')
+class AsyncSparseFieldsetTests(SparseFieldsetTests):
+    """The same through the async read views."""
+
+    def get(self, path):
+        async def get():
+            return await self.async_client.get(path)
+
+        return async_to_sync(get)()
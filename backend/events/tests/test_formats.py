@@ -0,0 +1,129 @@
+import datetime
+import json
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+import msgpack
+
+from events.renderers import compact_columns, expand_columns
+from events.sync import encode_token
+
+from .utils import create_edge_cases, create_events
+
+
+FORMATS = {
+    'json': 'application/json',
+    'compact': 'application/vnd.events.compact+json',
+    'msgpack': 'application/msgpack',
+}
+
+ROUND_TRIP_PATHS = [
+    ('/api/events/', ''),
+    ('/api/events/', 'page_size=100'),
+    ('/api/events/', 'pagination=cursor&page_size=100'),
+    ('/api/events/', 'search=conference'),
+    ('/api/events/{event}/', ''),
+    ('/api/events/{edge_case}/', ''),
+    # The edge cases, one of them without a category.
+    ('/api/events/', 'date={today}'),
+    ('/api/events/calendar/', ''),
+    ('/api/events/changes/', 'since={since}&limit=50'),
+    ('/api/categories/', ''),
+    ('/api/categories/', 'with_counts=true'),
+    ('/api/categories/{category}/', ''),
+    ('/api/categories/stats/', ''),
+]
+
+NEW_EVENT = {
+    'title': 'Format check ☕', 'description': None, 'venue': 'Hall',
+    'date': '2030-01-01', 'time': '10:00:00',
+}
+
+
+def decode(name, content):
+    if name == 'msgpack':
+        return msgpack.unpackb(content)
+    data = json.loads(content)
+    return expand_columns(data) if name == 'compact' else data
+
+
+@override_settings(EVENTS_CACHE_TIMEOUT=0, EVENTS_IMAGE_WORKERS=0)
+class ResponseFormatTests(TestCase):
+    """Every format decodes to the JSON payload."""
+
+    @classmethod
+    def setUpTestData(cls):
+        with cls.captureOnCommitCallbacks(execute=True):
+            cls.category = create_events()[0]
+        edge_cases = create_edge_cases(cls.category)
+        cls.placeholders = {
+            'event': cls.category.events.values_list('pk', flat=True).first(),
+            'edge_case': edge_cases[1],
+            'category': cls.category.pk,
+            'since': encode_token(timezone.now() - datetime.timedelta(days=1)),
+            'today': datetime.date.today().isoformat(),
+        }
+
+    def get(self, path, query, accept):
+        return self.client.get(f'{path}?{query}', headers={'Accept': accept})
+
+    def check_round_trips(self, get):
+        for path, query in ROUND_TRIP_PATHS:
+            path, query = path.format(**self.placeholders), query.format(**self.placeholders)
+            reference = json.loads(get(path, query, FORMATS['json']).content)
+            for name in ('compact', 'msgpack'):
+                with self.subTest(path=path, query=query, format=name):
+                    response = get(path, query, FORMATS[name])
+                    self.assertEqual(response.status_code, 200)
+                    self.assertTrue(response['Content-Type'].startswith(FORMATS[name]), response['Content-Type'])
+                    self.assertEqual(decode(name, response.content), reference)
+
+    def test_round_trips(self):
+        self.check_round_trips(self.get)
+
+    def test_compact_lists_keep_absent_keys_apart_from_nulls(self):
+        rows = [
+            {'id': 1, 'category_id': 'a', 'category_name': 'Talks', 'description': None},
+            {'id': 2, 'description': None},
+            {'id': 3, 'category_id': None, 'description': 'x'},
+        ]
+        compact = compact_columns({'results': rows})
+        self.assertEqual(compact['results']['absent'], [[1, 1], [1, 2], [2, 2]])
+        self.assertEqual(expand_columns(json.loads(json.dumps(compact))), {'results': rows})
+        self.assertNotIn('absent', compact_columns(rows[:1]))
+
+    def test_msgpack_request_bodies_parse_like_json(self):
+        fields = ['title', 'description', 'venue', 'date', 'time', 'category_id', 'image_status']
+        body = dict(NEW_EVENT, category=str(self.category.pk))
+        created = []
+        for name, encode in (('json', lambda data: json.dumps(data).encode()), ('msgpack', msgpack.packb)):
+            response = self.client.post('/api/events/', encode(body), content_type=FORMATS[name],
+                                        headers={'Accept': 'application/json'})
+            self.assertEqual(response.status_code, 201, name)
+            created.append(response.json())
+            response = self.client.post('/api/events/bulk/', encode([body, body]), content_type=FORMATS[name],
+                                        headers={'Accept': 'application/json'})
+            self.assertEqual(response.status_code, 201, name)
+            created.extend(response.json())
+        self.assertEqual(len(created), 6)
+        for row in created:
+            self.assertEqual({field: row[field] for field in fields}, {field: created[0][field] for field in fields})
+
+    def test_malformed_msgpack_is_rejected(self):
+        response = self.client.post('/api/events/', b'\xc1\xc1', content_type=FORMATS['msgpack'])
+        self.assertEqual(response.status_code, 400)
+
+
+@override_settings(ROOT_URLCONF='event_management.asgi_urls')
+class AsyncResponseFormatTests(ResponseFormatTests):
+    """The same through the async read views."""
+
+    async def test_round_trips(self):
+        responses = {}
+        for path, query in ROUND_TRIP_PATHS:
+            path, query = path.format(**self.placeholders), query.format(**self.placeholders)
+            for accept in FORMATS.values():
+                responses[path, query, accept] = await self.async_client.get(
+                    f'{path}?{query}', headers={'Accept': accept}
+                )
+        self.check_round_trips(lambda *key: responses[key])
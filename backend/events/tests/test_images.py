@@ -0,0 +1,154 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import BytesIO
+import shutil
+import tempfile
+import threading
+from unittest import mock
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.test import TestCase, override_settings
+from PIL import Image, ImageDraw
+
+from events import images
+from events.models import Category, Event
+
+
+def make_image(size, image_format, mode='RGB'):
+    image = Image.new(mode, size, (40, 90, 160, 255) if mode == 'RGBA' else (40, 90, 160))
+    draw = ImageDraw.Draw(image)
+    for x in range(0, size[0], 37):
+        draw.line([(x, 0), (size[0] - x, size[1])], fill=(x % 255, 180, 90), width=3)
+    buffer = BytesIO()
+    image.save(buffer, format=image_format, quality=90)
+    return buffer.getvalue()
+
+
+class ImageServer:
+    """A stand-in image host on loopback: path -> (status, content type, body, extra headers)."""
+
+    def __init__(self):
+        self.hits = {}
+        photo = make_image((1600, 1000), 'JPEG')
+        self.routes = {
+            '/photo.jpg': (200, 'image/jpeg', photo, {}),
+            '/logo.png': (200, 'image/png', make_image((400, 400), 'PNG', 'RGBA'), {}),
+            '/page.html': (200, 'text/html', b'<html>not an image</html>', {}),
+            '/truncated.jpg': (200, 'image/jpeg', photo[:len(photo) // 3], {}),
+            '/huge.jpg': (200, 'image/jpeg', b'\xff' * 64, {'Content-Length': str(50 * 1024 * 1024)}),
+            '/redirect.jpg': (302, 'text/plain', b'', {'Location': '/missing.jpg'}),
+        }
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                server.hits[self.path] = server.hits.get(self.path, 0) + 1
+                status, content_type, body, headers = server.routes.get(
+                    self.path, (404, 'text/plain', b'not found', {})
+                )
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                for name, value in {'Content-Length': str(len(body)), **headers}.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                try:
+                    self.wfile.write(body)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.base = f'http://127.0.0.1:{self.httpd.server_address[1]}'
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+
+@override_settings(EVENTS_CACHE_TIMEOUT=0, EVENTS_IMAGE_WORKERS=0, EVENTS_IMAGE_ALLOW_PRIVATE_HOSTS=True)
+class ImagePipelineTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = ImageServer()
+        cls.addClassCleanup(cls.server.httpd.shutdown)
+        media_root = tempfile.mkdtemp(prefix='event-thumbnails-')
+        cls.addClassCleanup(shutil.rmtree, media_root)
+        cls.enterClassContext(override_settings(MEDIA_ROOT=media_root))
+
+    @classmethod
+    def setUpTestData(cls):
+        with cls.captureOnCommitCallbacks(execute=True):
+            cls.category = Category.objects.create(name='Images')
+
+    def create(self, path):
+        response = self.client.post('/api/events/', {
+            'title': path, 'venue': 'Hall', 'date': '2030-01-01', 'time': '10:00',
+            'category': str(self.category.pk), 'image': self.server.base + path,
+        }, content_type='application/json')
+        self.assertEqual(response.status_code, 201)
+        return response.json()
+
+    def test_create_queues_the_image_without_fetching_it(self):
+        pool, hits = mock.Mock(), dict(self.server.hits)
+        with self.settings(EVENTS_IMAGE_WORKERS=2), mock.patch.object(images, 'get_executor', return_value=pool):
+            with self.captureOnCommitCallbacks() as callbacks:
+                event = self.create('/photo.jpg')
+            pool.submit.assert_not_called()
+            for callback in callbacks:
+                callback()
+        self.assertEqual(event['image_status'], Event.IMAGE_PENDING)
+        pool.submit.assert_called_once_with(images.run_job, Event.objects.get(pk=event['id']).pk)
+        self.assertEqual(self.server.hits, hits)
+
+    def test_outcomes(self):
+        expected = {
+            '/photo.jpg': Event.IMAGE_READY,
+            '/logo.png': Event.IMAGE_READY,
+            '/page.html': Event.IMAGE_FAILED,
+            '/truncated.jpg': Event.IMAGE_FAILED,
+            '/huge.jpg': Event.IMAGE_FAILED,
+            '/redirect.jpg': Event.IMAGE_FAILED,
+            '/missing.jpg': Event.IMAGE_FAILED,
+        }
+        # Failures are logged as warnings.
+        with self.assertLogs('events.images', 'WARNING'):
+            for path, status in expected.items():
+                with self.subTest(path=path):
+                    event = self.create(path)
+                    self.assertEqual(images.process_event_image(event['id']), status)
+                    self.assertEqual(Event.objects.get(pk=event['id']).image_status, status)
+
+    def test_thumbnails(self):
+        event = self.create('/photo.jpg')
+        images.process_event_image(event['id'])
+        detail = self.client.get(f"/api/events/{event['id']}/").json()
+        listed = {row['id']: row for row in self.client.get('/api/events/').json()['results']}
+        self.assertEqual(listed[event['id']]['thumbnails'], detail['thumbnails'])
+        self.assertEqual(set(detail['thumbnails']), set(settings.EVENTS_THUMBNAIL_SIZES))
+        for name, width in settings.EVENTS_THUMBNAIL_SIZES.items():
+            url = detail['thumbnails'][name]
+            self.assertTrue(url.startswith(settings.MEDIA_URL), url)
+            with default_storage.open(url[len(settings.MEDIA_URL):]) as stored, Image.open(stored) as thumbnail:
+                self.assertEqual(thumbnail.width, width)
+
+    def test_a_reused_image_url_is_not_fetched_again(self):
+        images.process_event_image(self.create('/logo.png')['id'])
+        hits = self.server.hits['/logo.png']
+        event = self.create('/logo.png')
+        self.assertEqual(images.process_event_image(event['id']), Event.IMAGE_READY)
+        self.assertEqual(self.server.hits['/logo.png'], hits)
+
+    def test_changing_and_clearing_the_image(self):
+        event = self.create('/photo.jpg')
+        images.process_event_image(event['id'])
+        path = f"/api/events/{event['id']}/"
+        changed = self.client.patch(path, {'image': self.server.base + '/logo.png'},
+                                    content_type='application/json').json()
+        self.assertEqual((changed['image_status'], changed['thumbnails']), (Event.IMAGE_PENDING, None))
+        images.process_event_image(event['id'])
+        cleared = self.client.patch(path, {'image': ''}, content_type='application/json').json()
+        self.assertEqual((cleared['image_status'], cleared['thumbnails']), ('', None))
+
+    def test_loopback_urls_are_refused(self):
+        with self.settings(EVENTS_IMAGE_ALLOW_PRIVATE_HOSTS=False), self.assertRaises(images.ImageRejected):
+            images.fetch(self.server.base + '/photo.jpg')
@@ -0,0 +1,93 @@
+import datetime
+import math
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from django.utils.http import http_date
+
+from events import cache, views
+from events.cache import bump_generation, get_cache, last_written
+from events.models import Category, Event
+
+from .utils import create_events
+
+
+NAMESPACES = ('events', 'categories')
+
+
+def at(moment):
+    """Generation bumps record ``moment`` as the time of the write."""
+    return mock.patch.object(cache.timezone, 'now', return_value=moment)
+
+
+@override_settings(EVENTS_CACHE_TIMEOUT=300, EVENTS_IMAGE_WORKERS=0)
+class LastWrittenTests(TestCase):
+    def setUp(self):
+        get_cache().clear()
+
+    def bump(self, moment, *namespaces):
+        with at(moment), self.captureOnCommitCallbacks(execute=True):
+            bump_generation(*namespaces)
+
+    def test_bumps_record_when_they_wrote(self):
+        earlier = timezone.now() - datetime.timedelta(minutes=2)
+        later = earlier + datetime.timedelta(minutes=1)
+        self.bump(earlier, *NAMESPACES)
+        self.bump(later, 'categories')
+        load = mock.Mock()
+        self.assertEqual(last_written(NAMESPACES, load), later)
+        load.assert_not_called()
+
+    def test_missing_records_are_loaded_once(self):
+        moment = timezone.now() - datetime.timedelta(minutes=1)
+        load = mock.Mock(return_value=moment)
+        self.assertEqual(last_written(NAMESPACES, load), moment)
+        self.assertEqual(last_written(NAMESPACES, load), moment)
+        load.assert_called_once()
+
+    def test_records_of_earlier_generations_are_not_read(self):
+        moment = timezone.now() - datetime.timedelta(minutes=1)
+        self.bump(moment, *NAMESPACES)
+        # Another worker's bump whose record was lost.
+        get_cache().incr(cache.generation_key('events'))
+        load = mock.Mock(return_value=timezone.now())
+        self.assertEqual(last_written(NAMESPACES, load), load.return_value)
+
+
+@override_settings(EVENTS_CACHE_TIMEOUT=300, EVENTS_IMAGE_WORKERS=0)
+class ListLastModifiedTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        create_events()
+
+    def setUp(self):
+        get_cache().clear()
+
+    def write(self, moment):
+        """Create a category and an event in it, their generation bumps recording ``moment``."""
+        with at(moment), self.captureOnCommitCallbacks(execute=True):
+            Event.objects.create(title='Written', venue='Hall', date=datetime.date(2030, 1, 1),
+                                 time=datetime.time(10), category=Category.objects.create(name=f'Written {moment}'))
+
+    def test_list_misses_take_last_modified_from_the_bump(self):
+        moment = timezone.now() - datetime.timedelta(seconds=2)
+        self.write(moment)
+        with mock.patch.object(views, 'data_last_modified', wraps=views.data_last_modified) as query:
+            response = self.client.get('/api/events/')
+            self.assertEqual(response['X-Cache'], 'MISS')
+            self.assertEqual(response['Last-Modified'], http_date(math.ceil(moment.timestamp())))
+            response = self.client.get('/api/categories/?with_counts=true',
+                                       headers={'If-Modified-Since': response['Last-Modified']})
+            self.assertEqual(response.status_code, 304)
+        query.assert_not_called()
+
+        self.write(moment + datetime.timedelta(seconds=1))
+        response = self.client.get('/api/events/', headers={'If-Modified-Since': http_date(moment.timestamp())})
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(EVENTS_CACHE_TIMEOUT=0)
+    def test_without_the_cache_the_database_is_asked(self):
+        with mock.patch.object(views, 'data_last_modified', wraps=views.data_last_modified) as query:
+            self.assertEqual(self.client.get('/api/events/').status_code, 200)
+        query.assert_called_once()
@@ -0,0 +1,73 @@
+import datetime
+import io
+import time
+import uuid
+
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from events.ids import uuid7
+from events.models import Event
+
+from .utils import create_events
+
+
+class UUID7Tests(SimpleTestCase):
+    def test_ids_are_version_7_and_strictly_increasing(self):
+        before = time.time_ns() // 1_000_000
+        ids = [uuid7() for _ in range(10_000)]
+        after = time.time_ns() // 1_000_000
+        self.assertTrue(all(pk.version == 7 and pk.variant == uuid.RFC_4122 for pk in ids))
+        self.assertTrue(all(a < b for a, b in zip(ids, ids[1:])))
+        self.assertTrue(all(a.hex < b.hex for a, b in zip(ids, ids[1:])))
+        # The first 48 bits are the clock in milliseconds.
+        self.assertLessEqual(before, ids[0].int >> 80)
+        self.assertLessEqual(ids[-1].int >> 80, after + 100)
+
+
+class MigrationTests(SimpleTestCase):
+    # Outside a transaction: SQLite's schema editor refuses to start in one.
+    databases = {'default'}
+
+    def test_the_migration_runs_no_sql(self):
+        output = io.StringIO()
+        call_command('sqlmigrate', 'events', '0010', stdout=output)
+        statements = [line for line in output.getvalue().splitlines()
+                      if line.strip() and not line.startswith('--') and line not in ('BEGIN;', 'COMMIT;')]
+        self.assertEqual(statements, [])
+
+
+@override_settings(EVENTS_CACHE_TIMEOUT=0, EVENTS_IMAGE_WORKERS=0)
+class PrimaryKeyTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        category = create_events(events=30)[0]
+        # Rows from before version 7 ids.
+        Event.objects.bulk_create([
+            Event(id=uuid.uuid4(), title=f'Old event {n}', venue='Old Hall', date=datetime.date(2024, 1, 1),
+                  time=datetime.time(10), category=category)
+            for n in range(30)
+        ])
+
+    def test_events_created_through_the_api_get_version_7_ids(self):
+        response = self.client.post('/api/events/', {
+            'title': 'Time-ordered key check', 'venue': 'Key Hall', 'date': '2030-01-01', 'time': '10:00:00',
+        }, content_type='application/json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(uuid.UUID(response.json()['id']).version, 7)
+
+    def test_old_and_new_ids_are_served_alongside_each_other(self):
+        old = Event.objects.filter(venue='Old Hall').first()
+        new = Event.objects.exclude(venue='Old Hall').first()
+        for event in (old, new):
+            response = self.client.get(f'/api/events/{event.pk}/')
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.json()['id'], str(event.pk))
+
+        seen, path = [], '/api/events/?pagination=cursor&page_size=7'
+        while path is not None:
+            page = self.client.get(path).json()
+            seen += [item['id'] for item in page['results']]
+            path = page['next']
+        self.assertEqual(len(seen), len(set(seen)))
+        self.assertCountEqual(seen, [str(pk) for pk in Event.objects.values_list('pk', flat=True)])
@@ -0,0 +1,21 @@
+import datetime
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from events.models import Category, Event
+
+
+class QueryPlanTests(TestCase):
+    def test_event_list_queries_use_an_index(self):
+        category = Category.objects.create(name='Conference')
+        Event.objects.bulk_create([
+            Event(title=f'Event {n}', venue='Hall', date=datetime.date(2025, 1, 1) + datetime.timedelta(days=n),
+                  time=datetime.time(10), category=category)
+            for n in range(50)
+        ])
+        output = StringIO()
+        # Raises CommandError naming the count of full table scans.
+        call_command('check_query_plans', stdout=output)
+        self.assertIn('past', output.getvalue())
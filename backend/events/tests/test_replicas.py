@@ -0,0 +1,84 @@
+import datetime
+
+from django.db import connection
+from django.test import TestCase, override_settings
+
+from events.cache import RECENT_WRITE_KEY, get_cache
+from events.models import Category, Event
+from events.routers import read_alias
+
+
+@override_settings(EVENTS_READ_REPLICAS=['default'], EVENTS_CACHE_TIMEOUT=0)
+class ReplicaRoutingTests(TestCase):
+    """
+    Which requests read from a replica. The test database stands in for the
+    replica, so the router's choice is recorded for every query instead.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        # Run the on_commit generation bump, or the worker's category
+        # snapshot from an earlier test would not know the category.
+        with cls.captureOnCommitCallbacks(execute=True):
+            cls.category = Category.objects.create(name='Conference')
+        cls.event = Event.objects.create(title='Event', venue='Hall', date=datetime.date(2030, 1, 1),
+                                         time=datetime.time(10), category=cls.category)
+
+    def setUp(self):
+        get_cache().delete(RECENT_WRITE_KEY)
+        self.choices = []
+        connection.execute_wrappers.append(self.record)
+        self.addCleanup(connection.execute_wrappers.remove, self.record)
+
+    def record(self, execute, sql, params, many, context):
+        self.choices.append(read_alias.get() or 'primary')
+        return execute(sql, params, many, context)
+
+    def routed(self, response):
+        choices, self.choices = set(self.choices), []
+        return response.status_code, choices
+
+    def create(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/api/events/', {
+                'title': 'Replica check', 'venue': 'Hall', 'date': '2030-01-01',
+                'time': '10:00', 'category': str(self.category.pk),
+            }, content_type='application/json')
+        return response
+
+    def test_reads_use_the_replica(self):
+        self.assertEqual(self.routed(self.client.get('/api/events/')), (200, {'default'}))
+        self.assertEqual(self.routed(self.client.get(f'/api/events/{self.event.pk}/')), (200, {'default'}))
+
+    def test_writes_and_reads_after_them_use_the_primary(self):
+        response = self.create()
+        self.assertEqual(self.routed(response), (201, {'primary'}))
+        detail = f"/api/events/{response.json()['id']}/"
+        self.assertEqual(self.routed(self.client.get(detail)), (200, {'primary'}))
+        self.assertEqual(self.routed(self.client.get('/api/events/')), (200, {'primary'}))
+        # Once EVENTS_REPLICA_LAG has passed.
+        get_cache().delete(RECENT_WRITE_KEY)
+        self.assertEqual(self.routed(self.client.get(detail)), (200, {'default'}))
+
+    def test_the_choice_does_not_leak_into_the_next_request(self):
+        self.client.get('/api/events/')
+        self.assertIsNone(read_alias.get())
+
+
+@override_settings(ROOT_URLCONF='event_management.asgi_urls')
+class AsyncReplicaRoutingTests(ReplicaRoutingTests):
+    """The same through the async read views."""
+
+    async def test_async_reads_use_the_replica(self):
+        response = await self.async_client.get('/api/events/')
+        self.assertEqual(self.routed(response), (200, {'default'}))
+        response = await self.async_client.get(f'/api/events/{self.event.pk}/')
+        self.assertEqual(self.routed(response), (200, {'default'}))
+
+    async def test_async_reads_after_a_write_use_the_primary(self):
+        from asgiref.sync import sync_to_async
+
+        await sync_to_async(self.create)()
+        self.choices = []
+        response = await self.async_client.get('/api/events/')
+        self.assertEqual(self.routed(response), (200, {'primary'}))
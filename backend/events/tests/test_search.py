@@ -0,0 +1,55 @@
+from unittest import mock, skipUnless
+
+from django.db import connection
+from django.test import TestCase, override_settings
+
+from events.models import Category, Event
+from events.search import backend_for_vendor, get_search_backend
+
+from .utils import create_events
+
+
+@override_settings(EVENTS_CACHE_TIMEOUT=0, EVENTS_IMAGE_WORKERS=0)
+class SearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.category = create_events()[0]
+
+    def search(self, terms):
+        response = self.client.get('/api/events/', {'search': terms, 'page_size': 100})
+        self.assertEqual(response.status_code, 200)
+        return sorted(item['title'] for item in response.json()['results'])
+
+    def icontains(self, terms):
+        """What DRF's SearchFilter returns for ``terms``."""
+        with mock.patch('events.search.get_search_backend', return_value=None):
+            return self.search(terms)
+
+    def test_the_index_matches_word_prefixes(self):
+        self.assertIsNotNone(get_search_backend(connection))
+        self.assertEqual(len(self.search('conf')), 20)
+        self.assertEqual(self.search('WORKSHOP venue'), self.icontains('workshop'))
+
+    def test_the_index_follows_writes(self):
+        event = Event.objects.create(title='Quasar gala', venue='Hall', date='2030-01-01', time='10:00',
+                                     category=self.category)
+        self.assertEqual(self.search('quasar'), ['Quasar gala'])
+        Category.objects.filter(pk=self.category.pk).update(name='Nebula')
+        self.assertIn('Quasar gala', self.search('nebula'))
+        Event.objects.filter(pk=event.pk).update(title='Pulsar gala')
+        self.assertEqual(self.search('quasar'), [])
+        event.delete()
+        self.assertEqual(self.search('pulsar'), [])
+
+    def test_terms_the_index_cannot_serve_fall_back_to_icontains(self):
+        backend = get_search_backend(connection)
+        with mock.patch.object(type(backend), 'search', return_value=None) as search:
+            self.assertEqual(self.search('meetup'), self.icontains('meetup'))
+        search.assert_called_once()
+
+    @skipUnless(connection.vendor == 'postgresql', 'PostgreSQL stop words')
+    def test_stop_words_alone_fall_back_to_icontains(self):
+        Event.objects.create(title='The one and only', venue='Hall', date='2030-01-01', time='10:00')
+        self.assertIsNone(backend_for_vendor('postgresql').search(Event.objects.all(), ['the', 'and']))
+        self.assertEqual(self.search('the and'), self.icontains('the and'))
+        self.assertIn('The one and only', self.search('the and'))
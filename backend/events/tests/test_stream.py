@@ -0,0 +1,204 @@
+import asyncio
+import datetime
+import json
+
+from asgiref.sync import sync_to_async
+from django.test import TestCase, override_settings
+
+from events import stream
+from events.models import Event
+from events.sync import encode_token
+
+from .utils import create_events
+
+
+class StreamReader:
+    """An open /api/events/stream/ response, read in the background as it arrives."""
+
+    def __init__(self, response):
+        self.response = response
+        self.messages = []
+        self.heartbeats = 0
+        self.buffer = b''
+        self.task = asyncio.ensure_future(self.read())
+
+    async def read(self):
+        async for chunk in self.response.streaming_content:
+            self.feed(chunk)
+
+    def feed(self, chunk):
+        self.buffer += chunk
+        while b'\n\n' in self.buffer:
+            raw, self.buffer = self.buffer.split(b'\n\n', 1)
+            fields = dict(line.partition(': ')[::2] for line in raw.decode('utf-8').split('\n'))
+            if set(fields) == {''}:
+                self.heartbeats += 1
+            else:
+                fields['data'] = json.loads(fields['data'])
+                self.messages.append(fields)
+
+    async def wait_for(self, predicate, timeout=5):
+        """The first message matching ``predicate``; None when none came in time."""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while loop.time() < deadline:
+            for message in self.messages:
+                if predicate(message):
+                    return message
+            if self.task.done():
+                break
+            await asyncio.sleep(0.01)
+        return None
+
+    def changed_ids(self):
+        return {
+            row['id'] for message in self.messages if message.get('event') == 'changes'
+            for row in message['data']['events'] + message['data']['categories']
+        }
+
+
+def is_ready(message):
+    return message.get('event') == 'ready'
+
+
+def has_event(pk, **values):
+    return lambda message: message.get('event') == 'changes' and any(
+        row['id'] == pk and values.items() <= row.items() for row in message['data']['events']
+    )
+
+
+def has_deleted(pk):
+    return lambda message: message.get('event') == 'changes' and pk in message['data']['deleted']['events']
+
+
+@override_settings(
+    EVENTS_CACHE_TIMEOUT=0,
+    EVENTS_IMAGE_WORKERS=0,
+    EVENTS_STREAM_POLL_INTERVAL=0.1,
+    EVENTS_STREAM_HEARTBEAT=0.2,
+    EVENTS_STREAM_MAX_AGE=2,
+    ROOT_URLCONF='event_management.asgi_urls',
+)
+class ChangeStreamTests(TestCase):
+    """
+    Streams are opened through the async test client, whose ``sync_to_async``
+    calls (the broadcaster's feed reads among them) run on the test's thread
+    and so see the test's transaction.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        with cls.captureOnCommitCallbacks(execute=True):
+            cls.first, cls.second = (str(category.pk) for category in create_events(categories=2, events=10))
+
+    def event(self, category, **values):
+        return dict({'title': 'Streamed', 'venue': 'Hall', 'date': '2030-01-01', 'time': '10:00',
+                     'category': category}, **values)
+
+    @sync_to_async
+    def write(self, method, path, body=None):
+        """An API write whose commit callbacks, and so the generation bump, run right away."""
+        with self.captureOnCommitCallbacks(execute=True):
+            response = getattr(self.client, method)(path, body, content_type='application/json')
+        return response.json() if response.content else None
+
+    async def open(self, query='', **headers):
+        response = await self.async_client.get(f'/api/events/stream/?{query}',
+                                               headers=dict({'Accept': 'text/event-stream'}, **headers))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        return StreamReader(response)
+
+    async def end(self, *readers):
+        for reader in readers:
+            await asyncio.wait_for(reader.task, 5)
+
+    async def test_writes_reach_the_streams_of_their_categories(self):
+        unfiltered = await self.open()
+        filtered = await self.open(f'category={self.first}')
+        ready = await unfiltered.wait_for(is_ready)
+        self.assertTrue(ready['id'])
+        self.assertIsNotNone(await filtered.wait_for(is_ready))
+
+        created = await self.write('post', '/api/events/', self.event(self.first))
+        self.assertIsNotNone(await unfiltered.wait_for(has_event(created['id'])))
+        self.assertIsNotNone(await filtered.wait_for(has_event(created['id'])))
+        other = await self.write('post', '/api/events/', self.event(self.second))
+        self.assertIsNotNone(await unfiltered.wait_for(has_event(other['id'])))
+
+        await self.write('patch', f"/api/events/{created['id']}/", {'title': 'Renamed'})
+        self.assertIsNotNone(await unfiltered.wait_for(has_event(created['id'], title='Renamed')))
+        await self.write('delete', f"/api/events/{created['id']}/")
+        self.assertIsNotNone(await unfiltered.wait_for(has_deleted(created['id'])))
+        # Through the tombstone's category.
+        self.assertIsNotNone(await filtered.wait_for(has_deleted(created['id'])))
+
+        bulk = await self.write('post', '/api/events/bulk/', [self.event(self.first)] * 3)
+        ids = {row['id'] for row in bulk}
+        self.assertIsNotNone(await unfiltered.wait_for(lambda message: message.get('event') == 'changes' and ids <= {
+            row['id'] for row in message['data']['events']
+        }))
+
+        await self.end(unfiltered, filtered)
+        self.assertNotIn(other['id'], filtered.changed_ids())
+
+    async def test_writes_of_other_workers_arrive_through_the_poll(self):
+        reader = await self.open()
+        await reader.wait_for(is_ready)
+        # Without the in-process wake-up, only the shared generation shows the write.
+        stream.generation_bumped.disconnect(stream.wake_broadcaster)
+        try:
+            created = await self.write('post', '/api/events/', self.event(self.first))
+            self.assertIsNotNone(await reader.wait_for(has_event(created['id']), timeout=1))
+        finally:
+            stream.generation_bumped.connect(stream.wake_broadcaster)
+        await self.end(reader)
+
+    async def test_resumed_streams_catch_up(self):
+        reader = await self.open()
+        token = (await reader.wait_for(is_ready))['id']
+        created = await self.write('post', '/api/events/', self.event(self.first))
+        deleted = await self.write('post', '/api/events/', self.event(self.second))
+        await self.write('delete', f"/api/events/{deleted['id']}/")
+        await self.end(reader)
+
+        for query, headers in (('', {'Last-Event-ID': token}), (f'since={token}', {})):
+            with self.subTest(query=query, headers=headers):
+                resumed = await self.open(query, **headers)
+                self.assertIsNotNone(await resumed.wait_for(has_event(created['id'])))
+                self.assertIsNotNone(await resumed.wait_for(has_deleted(deleted['id'])))
+                await self.end(resumed)
+
+    async def test_streams_end_after_their_max_age_and_unsubscribe(self):
+        with override_settings(EVENTS_STREAM_MAX_AGE=0.5):
+            reader = await self.open()
+            await self.end(reader)
+        self.assertGreater(reader.heartbeats, 0)
+        broadcaster = stream.get_broadcaster()
+        self.assertEqual(broadcaster.subscribers, set())
+        self.assertEqual(stream.active_streams, 0)
+        await asyncio.sleep(0.3)
+        self.assertIsNone(broadcaster.task)
+
+    def test_bad_positions_and_filters_are_refused(self):
+        expired = encode_token(datetime.datetime(2000, 1, 1, tzinfo=datetime.timezone.utc))
+        for query, headers, expected in (
+            ('', {'Last-Event-ID': 'nonsense'}, 400),
+            (f'since={expired}', {}, 410),
+            ('category=nope', {}, 400),
+        ):
+            with self.subTest(query=query, headers=headers):
+                response = self.client.get(f'/api/events/stream/?{query}',
+                                           headers=dict({'Accept': 'text/event-stream'}, **headers))
+                self.assertEqual(response.status_code, expected)
+                self.assertTrue(response.content.startswith(b'event: error\n'), response.content)
+
+    def test_wsgi_streams_poll_for_writes(self):
+        response = self.client.get('/api/events/stream/', headers={'Accept': 'text/event-stream'})
+        chunks = iter(response.streaming_content)
+        self.assertTrue(next(chunks).startswith(b'retry: '))
+        with self.captureOnCommitCallbacks(execute=True):
+            created = Event.objects.create(title='Polled', venue='Hall', date=datetime.date(2030, 1, 1),
+                                           time=datetime.time(10))
+        self.assertIn(str(created.pk).encode(), b''.join(chunks))
+        response.close()
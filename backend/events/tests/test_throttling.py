@@ -0,0 +1,112 @@
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.core.exceptions import ImproperlyConfigured
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from events import throttling
+from events.cache import get_cache
+from events.throttling import SlidingWindowThrottle, parse_rate
+
+from .utils import create_events
+
+
+class Clock:
+    """Stand-in for time.time that only moves when told to."""
+
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@override_settings(
+    EVENTS_THROTTLE_ENABLED=True,
+    EVENTS_THROTTLE_STORE='local',
+    EVENTS_THROTTLE_RATES={'requests': '6/min', 'search': '2/min', 'write': '2/min'},
+    EVENTS_CACHE_TIMEOUT=300,
+)
+class ThrottleTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        with cls.captureOnCommitCallbacks(execute=True):
+            create_events(categories=1, events=5)
+
+    def setUp(self):
+        get_cache().clear()
+        throttling._stores.clear()
+        self.clock = Clock(1_000_040.0)  # 20 s into a minute window
+        patcher = mock.patch.object(SlidingWindowThrottle, 'timer', self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def get(self, client, path='/api/events/'):
+        return self.client.get(path, headers={'X-Forwarded-For': client})
+
+    def statuses(self, request, count):
+        return [request().status_code for _ in range(count)]
+
+    def test_a_client_over_budget_is_refused(self):
+        self.assertEqual(self.statuses(lambda: self.get('10.0.0.1'), 7), [200] * 6 + [429])
+        response = self.get('10.0.0.1')
+        self.assertEqual((response.status_code, response['Retry-After']), (429, '40'))
+        self.assertEqual(self.get('10.0.0.2').status_code, 200)
+
+    def test_cached_responses_are_limited_too(self):
+        event = self.get('10.0.0.9').json()['results'][0]['id']
+        self.assertEqual(self.statuses(lambda: self.get('10.0.0.3', f'/api/events/{event}/'), 7),
+                         [200] * 6 + [429])
+
+    def test_asgi_reads_are_limited(self):
+        self.statuses(lambda: self.get('10.0.0.1'), 6)
+
+        async def get():
+            return await self.async_client.get('/api/events/', headers={'X-Forwarded-For': '10.0.0.1'})
+
+        with self.settings(ROOT_URLCONF='event_management.asgi_urls'):
+            self.assertEqual(async_to_sync(get)().status_code, 429)
+
+    def test_searches_and_exports_have_their_own_budget(self):
+        self.assertEqual(self.statuses(lambda: self.get('10.0.0.4', '/api/events/?search=conference'), 3),
+                         [200, 200, 429])
+        self.assertEqual(self.get('10.0.0.4').status_code, 200)
+        self.assertEqual(self.get('10.0.0.4', '/api/events/export/').status_code, 429)
+
+    def test_writes_have_their_own_budget(self):
+        def write():
+            return self.client.post('/api/categories/', {'name': ''}, content_type='application/json',
+                                    headers={'X-Forwarded-For': '10.0.0.5'})
+
+        self.assertEqual(self.statuses(write, 3), [400, 400, 429])
+
+    def test_the_previous_window_fades_out(self):
+        self.statuses(lambda: self.get('10.0.0.1'), 7)
+        # Half a minute into the next window, the previous window's 6 reads
+        # weigh 3: 2 more fit under 6, the third does not.
+        self.clock.now += 70
+        self.assertEqual(self.statuses(lambda: self.get('10.0.0.1'), 4), [200, 200, 200, 429])
+        self.clock.now += 60
+        self.assertEqual(self.get('10.0.0.1').status_code, 200)
+
+    def test_limits_can_be_switched_off(self):
+        with self.settings(EVENTS_THROTTLE_ENABLED=False):
+            self.assertEqual(self.statuses(lambda: self.get('10.0.0.9'), 10), [200] * 10)
+
+
+@override_settings(EVENTS_THROTTLE_STORE='cache')
+class CacheStoreThrottleTests(ThrottleTests):
+    """The same with the counters in the shared cache."""
+
+
+class RateTests(SimpleTestCase):
+    def test_parse_rate(self):
+        self.assertEqual(parse_rate('600/min'), (600, 60))
+        for rate in ('0/min', '-1/min', '10/fortnight', 'ten/min'):
+            with self.subTest(rate=rate), self.assertRaises(ImproperlyConfigured):
+                parse_rate(rate)
+
+    def test_wait_without_a_previous_window(self):
+        throttle = SlidingWindowThrottle()
+        throttle.limit, throttle.window, throttle.elapsed, throttle.previous, throttle.current = 6, 60, 20, 0, 3
+        self.assertEqual(throttle.wait(), 40)
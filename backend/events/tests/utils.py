@@ -0,0 +1,44 @@
+"""Test data shared by the events tests."""
+import datetime
+
+from events.models import Category, Event
+
+
+def create_events(categories=3, events=60, start=datetime.date(2025, 1, 1)):
+    """``categories`` categories and ``events`` events spread over a month; returns the categories."""
+    category_objects = [Category.objects.create(name=f'Category {n}') for n in range(categories)]
+    Event.objects.bulk_create([
+        Event(
+            title=f'Event {n} {("conference", "workshop", "meetup")[n % 3]}',
+            description=f'Description for event {n}.',
+            venue=f'Venue {n % 7}',
+            date=start + datetime.timedelta(days=n % 30),
+            time=datetime.time(9 + n % 10, 0),
+            category=category_objects[n % categories],
+        )
+        for n in range(events)
+    ])
+    return category_objects
+
+
+def create_edge_cases(category):
+    """
+    Awkward rows: non-ASCII, U+2028/U+2029 and control characters, an event
+    without a category and one with thumbnails. Returns their ids.
+    """
+    today = datetime.date.today()
+    rows = [
+        dict(title='Caf\u00e9 \u2615 \u2013 \u6771\u4eac', description=None, venue='Z\u00fcrich',
+             time=datetime.time(9, 30, 15), category=category),
+        dict(title='Line separator \u2028 and \u2029', description='', venue='Tab\tand\nnewline',
+             time=datetime.time(0, 0), image='https://example.com/a.png'),
+        dict(title='Control \x01 "quoted" \\ slash /', description='\U0001f600 emoji', venue='v',
+             time=datetime.time(23, 59, 59, 123456), category=category),
+    ]
+    pks = [Event.objects.create(date=today, **row).pk for row in rows]
+    # As the image pipeline leaves it (see events.images).
+    Event.objects.filter(pk=pks[1]).update(
+        image_status=Event.IMAGE_READY,
+        thumbnails={'small': 'thumbnails/ab/abc/small-320.webp', 'large': 'thumbnails/ab/abc/large-1280.webp'},
+    )
+    return pks
@@ -0,0 +1,181 @@
+"""
+Per-client rate limits for the events and categories API.
+
+Every request counts against the client's ``requests`` budget; searches
+(``?search=``) and exports also against the stricter ``search`` budget, and
+writes against ``write``. Budgets are ``EVENTS_THROTTLE_RATES`` entries such
+as ``"600/min"``. A client is its authentication token, else its user, else
+its IP address (DRF's ``get_ident``, which honours ``NUM_PROXIES``).
+
+Limits use a sliding window counter: one counter per client, scope and fixed
+window, and a request is allowed while the current window's count plus the
+previous window's, weighted by the share of it still inside the sliding
+window, stays under the limit. That is two integers per client and scope
+whatever the rate, where DRF's SimpleRateThrottle keeps a list with a
+timestamp per request. The counters live in a pluggable store
+(``EVENTS_THROTTLE_STORE``): ``cache`` shares them between workers through
+Django's cache (Redis when REDIS_URL is set), ``local`` keeps them in this
+process; a dotted path names any class with the same two methods.
+"""
+import hashlib
+import math
+import threading
+import time
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.utils.module_loading import import_string
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.throttling import BaseThrottle
+
+from .cache import get_cache
+
+
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+def enabled():
+    return getattr(settings, 'EVENTS_THROTTLE_ENABLED', True)
+
+
+def parse_rate(rate):
+    """``"<count>/<period>"`` -> (count, seconds); the period is s/sec, min, hour or day."""
+    try:
+        count, period = rate.split('/')
+        count, seconds = int(count), PERIODS[period.strip()[0]]
+    except (ValueError, KeyError, IndexError):
+        raise ImproperlyConfigured(f'Invalid throttle rate {rate!r}; expected e.g. "600/min".')
+    if count <= 0:
+        # An empty rate lifts the limit; a zero one would refuse everything.
+        raise ImproperlyConfigured(f'Invalid throttle rate {rate!r}; the count must be positive.')
+    return count, seconds
+
+
+class LocalMemoryStore:
+    """Counters in this process's memory: for tests and single-worker setups."""
+
+    def __init__(self):
+        self.counters = {}
+        self.lock = threading.Lock()
+        self.prune_at = 1024
+
+    def get_many(self, keys):
+        now = time.monotonic()
+        with self.lock:
+            entries = {key: self.counters.get(key) for key in keys}
+        return {key: entry[0] for key, entry in entries.items() if entry and entry[1] > now}
+
+    def increment(self, key, timeout):
+        now = time.monotonic()
+        with self.lock:
+            count, expires = self.counters.get(key, (0, 0))
+            if expires <= now:
+                count, expires = 0, now + timeout
+            self.counters[key] = (count + 1, expires)
+            # Drop expired counters once the dict has doubled since the last
+            # sweep: memory follows the number of recently active clients.
+            if len(self.counters) >= self.prune_at:
+                self.counters = {k: v for k, v in self.counters.items() if v[1] > now}
+                self.prune_at = max(1024, 2 * len(self.counters))
+        return count + 1
+
+
+class CacheStore:
+    """Counters in the shared cache, so every worker sees the same counts."""
+
+    def get_many(self, keys):
+        return get_cache().get_many(keys)
+
+    def increment(self, key, timeout):
+        cache = get_cache()
+        try:
+            return cache.incr(key)
+        except ValueError:
+            # First request of the window (or the counter just expired).
+            if cache.add(key, 1, timeout):
+                return 1
+            return cache.incr(key)
+
+
+STORES = {'cache': CacheStore, 'local': LocalMemoryStore}
+
+_stores = {}
+
+
+def get_store():
+    """The configured store, one instance per process."""
+    name = getattr(settings, 'EVENTS_THROTTLE_STORE', 'cache')
+    if name not in _stores:
+        _stores[name] = (STORES.get(name) or import_string(name))()
+    return _stores[name]
+
+
+class SlidingWindowThrottle(BaseThrottle):
+    """Rate limit for ``scope``, for the requests ``applies()`` selects."""
+
+    scope = None
+    timer = time.time
+
+    def applies(self, request, view):
+        return True
+
+    def get_client(self, request):
+        if request.auth is not None:
+            token = getattr(request.auth, 'key', request.auth)
+            return 'token:' + hashlib.md5(str(token).encode('utf-8')).hexdigest()
+        if request.user is not None and request.user.is_authenticated:
+            return f'user:{request.user.pk}'
+        return f'ip:{self.get_ident(request)}'
+
+    def allow_request(self, request, view):
+        rate = getattr(settings, 'EVENTS_THROTTLE_RATES', {}).get(self.scope)
+        if not enabled() or not rate or not self.applies(request, view):
+            return True
+        self.limit, self.window = parse_rate(rate)
+        index, self.elapsed = divmod(self.timer(), self.window)
+        prefix = f'events:throttle:{self.scope}:{self.get_client(request)}:'
+        previous_key, current_key = f'{prefix}{int(index) - 1}', f'{prefix}{int(index)}'
+
+        store = get_store()
+        counts = store.get_many([previous_key, current_key])
+        self.previous = counts.get(previous_key, 0)
+        self.current = counts.get(current_key, 0)
+        if self.previous * (1 - self.elapsed / self.window) + self.current >= self.limit:
+            return False
+        # Kept for two windows: it is the previous window's count in the next.
+        store.increment(current_key, math.ceil(2 * self.window))
+        return True
+
+    def wait(self):
+        """Seconds until the weighted count drops below the limit again."""
+        window = self.window
+        if self.current < self.limit:
+            if not self.previous:
+                return window - self.elapsed
+            # The previous window's weight has to shrink enough.
+            return max(0.0, window * (1 - (self.limit - self.current) / self.previous) - self.elapsed)
+        # Wait for the next window, where this one becomes the previous.
+        return window - self.elapsed + window * max(0.0, 1 - self.limit / self.current)
+
+
+class RequestRateThrottle(SlidingWindowThrottle):
+    scope = 'requests'
+
+
+class SearchRateThrottle(SlidingWindowThrottle):
+    """Full-text searches and exports, which read far more rows than a page."""
+
+    scope = 'search'
+
+    def applies(self, request, view):
+        return bool(request.query_params.get('search')) or getattr(view, 'action', None) == 'export'
+
+
+class WriteRateThrottle(SlidingWindowThrottle):
+    scope = 'write'
+
+    def applies(self, request, view):
+        return request.method not in SAFE_METHODS
+
+
+API_THROTTLE_CLASSES = [RequestRateThrottle, SearchRateThrottle, WriteRateThrottle]
@@ -1,11 +1,19 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import EventViewSet, CategoryViewSet
+from .async_views import async_read_patterns
+from .views import AutocompleteView, EventViewSet, CategoryViewSet
 
 router = DefaultRouter()
 router.register(r'events', EventViewSet)
 router.register(r'categories', CategoryViewSet)
 
 urlpatterns = [
+    path('autocomplete/', AutocompleteView.as_view(), name='autocomplete'),
     path('', include(router.urls)),
-]
\ No newline at end of file
+]
+
+# The same routes for ASGI requests (event_management.asgi_urls), with
+# list/detail reads served by async views.
+async_urlpatterns = [
+    path('', include(async_read_patterns(router.urls))),
+]
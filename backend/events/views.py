@@ -1,16 +1,144 @@
+import calendar
+import datetime
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.handlers.asgi import ASGIRequest
+from django.db import transaction
+from django.db.models import Count
+from django.http import StreamingHttpResponse
+from django.utils import timezone
 from rest_framework import viewsets, filters, status
+from rest_framework.decorators import action
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.views import APIView
 from django_filters.rest_framework import DjangoFilterBackend
+from .async_views import AsyncReadMixin
+from .autocomplete import DEFAULT_LIMIT, MAX_LIMIT, get_autocomplete
+from .cache import CachedResponseMixin, bump_generation, last_written
+from .categories import category_cache
+from .export import EXPORT_FORMATS, aiterate, export_stream
+from .fastlist import FastListMixin
+from .filters import EventFilter
 from .models import Event, Category
-from .serializers import EventSerializer, CategorySerializer
+from .pagination import AsyncPageNumberPagination, EventPagination
+from .renderers import API_PARSER_CLASSES, API_RENDERER_CLASSES
+from .routers import ReplicaReadMixin, read_alias
+from .search import EventSearchFilter
+from .sparse import SparseFieldsMixin
+from .stream import (
+    EventStreamRenderer,
+    aevent_stream,
+    event_stream,
+    parse_categories,
+    stream_limit_reached,
+)
+from .sync import (
+    InvalidToken,
+    changes_since,
+    data_last_modified,
+    decode_token,
+    http_last_modified,
+    initial_token,
+    token_expired,
+)
+from .serializers import (
+    CategorySerializer,
+    CategoryWithCountsSerializer,
+    EventBulkDeleteSerializer,
+    EventListSerializer,
+    EventSerializer,
+)
+from .throttling import API_THROTTLE_CLASSES
+
+
+def list_last_modified(cached):
+    """
+    Last change to any list response: the latest write, or local midnight
+    once the day rolls over, since ``upcoming``/``past`` and the upcoming
+    counts depend on today's date. With the response cache on, and so
+    shared by the workers, the latest write is the one the generation bumps
+    recorded rather than a query.
+    """
+    midnight = timezone.make_aware(datetime.datetime.combine(timezone.localdate(), datetime.time()))
+    if cached:
+        latest = last_written(('events', 'categories'), data_last_modified)
+    else:
+        latest = data_last_modified()
+    return http_last_modified(max(latest, midnight) if latest else midnight)
+
 
+def object_last_modified(queryset, pk, *fields):
+    """Latest of ``fields`` on the object ``pk``, in one query; None if it does not exist."""
+    try:
+        row = queryset.filter(pk=pk).values_list(*fields).first()
+    except (TypeError, ValueError, ValidationError):
+        return None
+    moments = [moment for moment in row or () if moment is not None]
+    return http_last_modified(max(moments)) if moments else None
 
-class CategoryViewSet(viewsets.ModelViewSet):
+
+class CategoryViewSet(CachedResponseMixin, ReplicaReadMixin, AsyncReadMixin, viewsets.ModelViewSet):
+    # Event counts depend on event writes as well.
+    cache_namespaces = ('categories', 'events')
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
+    pagination_class = AsyncPageNumberPagination
+    renderer_classes = API_RENDERER_CLASSES
+    parser_classes = API_PARSER_CLASSES
+    throttle_classes = API_THROTTLE_CLASSES
     filter_backends = [filters.SearchFilter]
     search_fields = ['name']
 
+    def with_counts(self):
+        return self.request.query_params.get('with_counts', '').lower() in ('1', 'true', 'yes')
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action in ('list', 'retrieve') and self.with_counts():
+            queryset = queryset.with_event_counts()
+        return queryset
+
+    def get_serializer_class(self):
+        if self.action in ('list', 'retrieve') and self.with_counts():
+            return CategoryWithCountsSerializer
+        return super().get_serializer_class()
+
+    def use_category_cache(self):
+        """Plain lists come from the process-local category cache."""
+        return (
+            self.action == 'list'
+            and not self.with_counts()
+            and not self.request.query_params.get(api_settings.SEARCH_PARAM)
+        )
+
+    def get_list_queryset(self):
+        if self.use_category_cache():
+            return category_cache.all()
+        return super().get_list_queryset()
+
+    def list(self, request, *args, **kwargs):
+        if not self.use_category_cache():
+            return super().list(request, *args, **kwargs)
+        return self.cached_response(self.build_list, request, *args, **kwargs)
+
+    def build_list(self, request, *args, **kwargs):
+        categories = self.get_list_queryset()
+        page = self.paginate_queryset(categories)
+        if page is not None:
+            return self.get_paginated_response(self.get_serializer(page, many=True).data)
+        return Response(self.get_serializer(categories, many=True).data)
+
+    def last_modified(self):
+        if self.use_category_cache():
+            return http_last_modified(category_cache.last_modified())
+        if self.action == 'list' or (self.action == 'retrieve' and self.with_counts()):
+            return list_last_modified(bool(self.cache_timeout()))
+        if self.action == 'retrieve':
+            return object_last_modified(Category.objects, self.kwargs['pk'], 'updated_at')
+        return None
+
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
         if serializer.is_valid():
@@ -29,7 +157,9 @@ class CategoryViewSet(viewsets.ModelViewSet):
 
     def destroy(self, request, *args, **kwargs):
         instance = self.get_object()
-        # Check if category has events
+        # Check if category has events. Ask the table, not the event_count
+        # counter: imports and raw SQL bypass the signals that maintain it,
+        # and a counter drifted to 0 would let the delete cascade to events.
         if instance.events.exists():
             return Response(
                 {'error': 'Cannot delete category with existing events.'}, 
@@ -38,13 +168,58 @@ class CategoryViewSet(viewsets.ModelViewSet):
         instance.delete()
         return Response(status=status.HTTP_204_NO_CONTENT)
 
+    @action(detail=False, methods=['get'])
+    def stats(self, request, *args, **kwargs):
+        return self.cached_response(self.build_stats, request, *args, **kwargs)
+
+    def build_stats(self, request, *args, **kwargs):
+        # Totals come from the denormalized counter; upcoming counts from one
+        # grouped query over the date index.
+        upcoming = dict(
+            Event.objects.filter(category__isnull=False, date__gte=timezone.localdate())
+            .order_by()
+            .values_list('category')
+            .annotate(total=Count('pk'))
+        )
+        categories = [
+            {
+                'id': pk,
+                'name': name,
+                'event_count': event_count,
+                'upcoming_event_count': upcoming.get(pk, 0),
+            }
+            for pk, name, event_count in Category.objects.values_list('id', 'name', 'event_count')
+        ]
+        return Response({
+            'total_events': sum(category['event_count'] for category in categories),
+            'upcoming_events': sum(upcoming.values()),
+            'categories': categories,
+        })
 
-class EventViewSet(viewsets.ModelViewSet):
+
+class EventViewSet(CachedResponseMixin, ReplicaReadMixin, SparseFieldsMixin, FastListMixin,
+                   AsyncReadMixin, viewsets.ModelViewSet):
+    # Event payloads embed category_name, so category writes invalidate them too.
+    cache_namespaces = ('events', 'categories')
     queryset = Event.objects.select_related('category').all()
     serializer_class = EventSerializer
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter]
+    pagination_class = EventPagination
+    renderer_classes = API_RENDERER_CLASSES
+    parser_classes = API_PARSER_CLASSES
+    throttle_classes = API_THROTTLE_CLASSES
+    filter_backends = [DjangoFilterBackend, EventSearchFilter]
     search_fields = ['title', 'description', 'venue', 'category__name']
-    filterset_fields = ['date', 'category']
+    filterset_class = EventFilter
+
+    def last_modified(self):
+        if self.action == 'list':
+            return list_last_modified(bool(self.cache_timeout()))
+        if self.action == 'retrieve':
+            # The payload embeds category_name.
+            return object_last_modified(
+                Event.objects, self.kwargs['pk'], 'updated_at', 'category__updated_at'
+            )
+        return None
 
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
@@ -65,4 +240,213 @@ class EventViewSet(viewsets.ModelViewSet):
     def destroy(self, request, *args, **kwargs):
         instance = self.get_object()
         instance.delete()
-        return Response(status=status.HTTP_204_NO_CONTENT)
\ No newline at end of file
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+    def get_bulk_serializer(self, *args, **kwargs):
+        return self.get_serializer(
+            *args,
+            many=True,
+            allow_empty=False,
+            max_length=settings.EVENTS_BULK_MAX_ITEMS,
+            **kwargs
+        )
+
+    @action(detail=False, methods=['post'], url_path='bulk')
+    def bulk_create(self, request, *args, **kwargs):
+        serializer = self.get_bulk_serializer(data=request.data)
+        if serializer.is_valid():
+            with transaction.atomic():
+                serializer.save()
+                # bulk_create/bulk_update send no model signals.
+                bump_generation('events')
+            return Response(serializer.data, status=status.HTTP_201_CREATED)
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    @bulk_create.mapping.put
+    def bulk_update(self, request, *args, **kwargs):
+        partial = kwargs.pop('partial', False)
+        items = request.data if isinstance(request.data, list) else []
+        ids = [EventListSerializer.parse_id(item) for item in items]
+        with transaction.atomic():
+            instances = self.get_queryset().select_for_update(of=('self',)).in_bulk(
+                [pk for pk in ids if pk is not None]
+            )
+            serializer = self.get_bulk_serializer(instances, data=request.data, partial=partial)
+            if not serializer.is_valid():
+                return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+            serializer.save()
+            bump_generation('events')
+        return Response(serializer.data)
+
+    @bulk_create.mapping.patch
+    def bulk_partial_update(self, request, *args, **kwargs):
+        kwargs['partial'] = True
+        return self.bulk_update(request, *args, **kwargs)
+
+    @bulk_create.mapping.delete
+    def bulk_destroy(self, request, *args, **kwargs):
+        serializer = EventBulkDeleteSerializer(data=request.data)
+        if serializer.is_valid():
+            with transaction.atomic():
+                deleted, _ = Event.objects.filter(id__in=serializer.validated_data['ids']).delete()
+            return Response({'deleted': deleted})
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    @action(detail=False, methods=['get'])
+    def export(self, request, *args, **kwargs):
+        output = request.query_params.get('output', 'ndjson')
+        if output not in EXPORT_FORMATS:
+            return Response(
+                {'error': f"Unsupported output format. Use one of: {', '.join(EXPORT_FORMATS)}."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        # The stream is read after the request's replica choice is reset;
+        # pin it.
+        queryset = self.filter_queryset(self.get_queryset()).using(read_alias.get())
+        stream, content_type = export_stream(queryset, output)
+        if isinstance(request._request, ASGIRequest):
+            stream = aiterate(stream)
+        response = StreamingHttpResponse(stream, content_type=content_type)
+        response['Content-Disposition'] = f'attachment; filename="events.{output}"'
+        return response
+
+    @action(detail=False, methods=['get'])
+    def calendar(self, request, *args, **kwargs):
+        return self.cached_response(self.build_calendar, request, *args, **kwargs)
+
+    def build_calendar(self, request, *args, **kwargs):
+        """
+        Event counts for every day of ``?month=YYYY-MM`` (default: this month),
+        honouring the list filters, from one grouped query over the date index.
+        """
+        month = request.query_params.get('month')
+        try:
+            first = (
+                datetime.datetime.strptime(month, '%Y-%m').date() if month
+                else timezone.localdate().replace(day=1)
+            )
+        except ValueError:
+            return Response(
+                {'error': 'month must be formatted as YYYY-MM.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        days_in_month = calendar.monthrange(first.year, first.month)[1]
+        last = first.replace(day=days_in_month)
+
+        counts = dict(
+            self.filter_queryset(self.get_queryset())
+            .filter(date__gte=first, date__lte=last)
+            .order_by()
+            .values_list('date')
+            .annotate(total=Count('pk'))
+        )
+        days = [
+            {'date': day, 'count': counts.get(day, 0)}
+            for day in (first + datetime.timedelta(days=offset) for offset in range(days_in_month))
+        ]
+        return Response({
+            'month': first.strftime('%Y-%m'),
+            'total': sum(counts.values()),
+            'days': days,
+        })
+
+    @action(detail=False, methods=['get'])
+    def changes(self, request, *args, **kwargs):
+        """
+        Events and categories created, updated or deleted since ``?since=``
+        (a token from a previous call; omit it to get a starting token).
+        Follow ``next`` while ``has_more`` is true.
+        """
+        since = request.query_params.get('since')
+        if not since:
+            return Response({
+                'events': [],
+                'categories': [],
+                'deleted': {'events': [], 'categories': []},
+                'next': initial_token(),
+                'has_more': False,
+            })
+        position, error = self.sync_position(since)
+        if error is not None:
+            return error
+        moment, pk = position
+        try:
+            limit = min(int(request.query_params.get('limit', 100)), settings.EVENTS_SYNC_MAX_LIMIT)
+        except ValueError:
+            limit = 0
+        if limit < 1:
+            return Response(
+                {'error': f'limit must be between 1 and {settings.EVENTS_SYNC_MAX_LIMIT}.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return Response(changes_since(moment, pk, limit))
+
+    def sync_position(self, token):
+        """(position, None) for a valid sync token, else (None, error response)."""
+        try:
+            moment, pk = decode_token(token)
+        except InvalidToken:
+            return None, Response({'error': 'Invalid sync token.'}, status=status.HTTP_400_BAD_REQUEST)
+        if token_expired(moment):
+            return None, Response(
+                {'error': 'Sync token has expired; fetch the full list and start again.'},
+                status=status.HTTP_410_GONE
+            )
+        return (moment, pk), None
+
+    @action(detail=False, methods=['get'], renderer_classes=[EventStreamRenderer, *API_RENDERER_CLASSES])
+    def stream(self, request, *args, **kwargs):
+        """
+        Server-Sent Events: the /changes/ payload for every batch of changes
+        as they happen, resuming from ``Last-Event-ID`` or ``?since=``;
+        ``?category=`` filters them (see events.stream).
+        """
+        try:
+            categories = parse_categories(request.query_params.get('category'))
+        except ValueError:
+            return Response({'error': 'category must be a list of category ids.'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        token = request.headers.get('Last-Event-ID') or request.query_params.get('since')
+        since = None
+        if token:
+            since, error = self.sync_position(token)
+            if error is not None:
+                return error
+        else:
+            token = initial_token()
+        if stream_limit_reached():
+            return Response({'error': 'Too many open streams; try again later.'},
+                            status=status.HTTP_503_SERVICE_UNAVAILABLE,
+                            headers={'Retry-After': '30'})
+
+        if isinstance(request._request, ASGIRequest):
+            stream = aevent_stream(token, since, categories)
+        else:
+            stream = event_stream(token, since, categories)
+        response = StreamingHttpResponse(stream, content_type='text/event-stream')
+        response['Cache-Control'] = 'no-cache'
+        # Keep nginx from buffering the stream.
+        response['X-Accel-Buffering'] = 'no'
+        return response
+
+
+class AutocompleteView(APIView):
+    """
+    Category names, event titles and venues starting with ``?q=``, up to
+    ``?limit=`` of each, from the in-memory index (see events.autocomplete).
+    """
+    renderer_classes = API_RENDERER_CLASSES
+    throttle_classes = API_THROTTLE_CLASSES
+
+    def get(self, request, *args, **kwargs):
+        try:
+            limit = min(int(request.query_params.get('limit', DEFAULT_LIMIT)), MAX_LIMIT)
+        except ValueError:
+            limit = 0
+        if limit <= 0:
+            return Response({'error': f'limit must be a number from 1 to {MAX_LIMIT}.'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        text = request.query_params.get('q', '')
+        if not text.strip():
+            return Response({'categories': [], 'titles': [], 'venues': []})
+        return Response(get_autocomplete().lookup(text, limit))
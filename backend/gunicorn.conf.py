@@ -0,0 +1,41 @@
+"""
+Gunicorn configuration: ASGI under uvicorn workers.
+
+    gunicorn event_management.asgi:application -c gunicorn.conf.py
+
+Each worker is one process running one event loop. Event and category
+list/detail reads are async views and hold no thread while waiting on slow
+clients; every other request, and each step of the async views that is still
+synchronous (middleware, authentication, the queries themselves on Django
+4.2), runs in a thread from that worker's pool. Scale with processes
+(WEB_CONCURRENCY), not threads.
+
+Several workers need REDIS_URL: the response cache, the category cache,
+throttle counters and replica read-your-writes stickiness all coordinate
+through the shared cache, and a per-process one leaves each worker blind to
+the others. Without it the default is a single worker; with it, 2 x CPUs + 1.
+"""
+import multiprocessing
+import os
+
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+workers = int(os.environ.get(
+    'WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1 if os.environ.get('REDIS_URL') else 1
+))
+worker_class = 'uvicorn_worker.UvicornWorker'
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+graceful_timeout = 30
+keepalive = 5
+# Restart workers now and then so a slow leak cannot grow without bound.
+max_requests = 2000
+max_requests_jitter = 200
+accesslog = '-'
+
+
+def on_starting(server):
+    if workers > 1 and not os.environ.get('REDIS_URL'):
+        server.log.warning(
+            'Running %s workers without REDIS_URL: caches, throttling and replica '
+            'stickiness are per worker and will disagree between them', workers,
+        )
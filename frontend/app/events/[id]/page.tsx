@@ -3,7 +3,7 @@
 import { useParams, useRouter } from 'next/navigation'
 import Link from 'next/link'
 import useSWR from 'swr'
-import { eventApi } from '@/lib/api'
+import { eventApi, eventImageUrl } from '@/lib/api'
 
 export default function EventDetailPage() {
   const params = useParams()
@@ -102,7 +102,7 @@ export default function EventDetailPage() {
         {event.image && (
           <div className="relative h-64 md:h-80 bg-slate-100 overflow-hidden">
             <img
-              src={event.image}
+              src={eventImageUrl(event, 'large')}
               alt={event.title}
               className="w-full h-full object-cover"
               onError={(e) => {
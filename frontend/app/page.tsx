@@ -1,21 +1,23 @@
 'use client'
 
-import { useState } from 'react'
+import { useEffect, useState } from 'react'
 import Link from 'next/link'
 import useSWR from 'swr'
-import { eventApi, categoryApi, Event, Category, isInDemoMode } from '../lib/api'
+import { eventApi, categoryApi, Event, Category, getSuggestions, isInDemoMode, subscribeToChanges } from '../lib/api'
 import EventCard from '../components/EventCard'
 import { LoadingSkeleton } from '../components/LoadingSpinner'
 import { useToast } from '../components/Toast'
 
 export default function HomePage() {
   const [searchTerm, setSearchTerm] = useState('')
+  // The search that ran: typing only fetches suggestions
+  const [submittedSearch, setSubmittedSearch] = useState('')
   const [selectedCategory, setSelectedCategory] = useState('')
   const { showToast } = useToast()
   
   const { data: events, error, mutate, isLoading } = useSWR<Event[]>(
-    ['events', searchTerm, selectedCategory],
-    () => eventApi.getEvents(searchTerm || undefined, selectedCategory || undefined),
+    ['events', submittedSearch, selectedCategory],
+    () => eventApi.getEvents(submittedSearch || undefined, selectedCategory || undefined),
     {
       revalidateOnFocus: false,
       errorRetryCount: 3,
@@ -23,7 +25,13 @@ export default function HomePage() {
     }
   )
   
-  const { data: categories } = useSWR<Category[]>(
+  const { data: suggestions } = useSWR(
+    ['suggestions', searchTerm.trim()],
+    () => getSuggestions(searchTerm),
+    { revalidateOnFocus: false, keepPreviousData: true }
+  )
+
+  const { data: categories, mutate: mutateCategories } = useSWR<Category[]>(
     'categories', 
     categoryApi.getCategories,
     {
@@ -32,6 +40,15 @@ export default function HomePage() {
     }
   )
 
+  // Refresh when events or categories change, whoever changed them
+  useEffect(
+    () => subscribeToChanges(() => {
+      mutate()
+      mutateCategories()
+    }),
+    [mutate, mutateCategories]
+  )
+
   const handleDelete = async (id: string) => {
     try {
       await eventApi.deleteEvent(id)
@@ -45,6 +62,7 @@ export default function HomePage() {
 
   const handleSearch = (e: React.FormEvent) => {
     e.preventDefault()
+    setSubmittedSearch(searchTerm)
     mutate() // Trigger refetch with current search term
   }
 
@@ -131,6 +149,8 @@ export default function HomePage() {
             placeholder="Search events by title, venue, or description..."
             value={searchTerm}
             onChange={(e) => setSearchTerm(e.target.value)}
+            list="search-suggestions"
+            autoComplete="off"
             className="w-full pl-12 pr-32 py-4 bg-white rounded-2xl border-2 border-slate-200 focus:border-indigo-500 focus:outline-none focus:ring-4 focus:ring-indigo-100 transition-all duration-200 text-slate-900 placeholder-slate-500"
           />
           <button
@@ -139,6 +159,13 @@ export default function HomePage() {
           >
             Search
           </button>
+          <datalist id="search-suggestions">
+            {suggestions?.titles.map((title) => <option key={`title-${title}`} value={title} />)}
+            {suggestions?.venues.map((venue) => <option key={`venue-${venue}`} value={venue} />)}
+            {suggestions?.categories.map((category) => (
+              <option key={`category-${category.id}`} value={category.name} />
+            ))}
+          </datalist>
         </form>
 
         {/* Category Filter */}
@@ -179,10 +206,11 @@ export default function HomePage() {
               </div>
               
               {/* Clear Filters Button */}
-              {(searchTerm || selectedCategory) && (
+              {(searchTerm || submittedSearch || selectedCategory) && (
                 <button
                   onClick={() => {
                     setSearchTerm('')
+                    setSubmittedSearch('')
                     setSelectedCategory('')
                     mutate()
                   }}
@@ -211,15 +239,15 @@ export default function HomePage() {
               </svg>
             </div>
             <h3 className="text-2xl font-bold text-slate-900 mb-4">
-              {searchTerm || selectedCategory ? 'No events found' : 'No events yet'}
+              {submittedSearch || selectedCategory ? 'No events found' : 'No events yet'}
             </h3>
             <p className="text-slate-600 mb-8">
-              {searchTerm || selectedCategory
+              {submittedSearch || selectedCategory
                 ? 'Try adjusting your search terms or filters, or create a new event.' 
                 : 'Get started by creating your first event and bring your ideas to life.'
               }
             </p>
-            {!searchTerm && !selectedCategory && (
+            {!submittedSearch && !selectedCategory && (
               <Link
                 href="/events/create"
                 className="inline-flex items-center px-6 py-3 bg-indigo-600 text-white font-semibold rounded-xl hover:bg-indigo-700 focus:outline-none focus:ring-4 focus:ring-indigo-100 transition-all duration-200 shadow-lg hover:shadow-xl transform hover:scale-105"
@@ -238,7 +266,7 @@ export default function HomePage() {
           <div className="flex items-center justify-between mb-8">
             <div>
               <h2 className="text-2xl font-bold text-slate-900">
-                {searchTerm || selectedCategory ? 'Filtered Results' : 'Your Events'}
+                {submittedSearch || selectedCategory ? 'Filtered Results' : 'Your Events'}
               </h2>
               <p className="text-slate-600 mt-1">
                 {events.length} {events.length === 1 ? 'event' : 'events'} found
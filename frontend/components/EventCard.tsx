@@ -1,6 +1,6 @@
 'use client'
 
-import { Event } from '../lib/api'
+import { Event, eventImageUrl } from '../lib/api'
 import Link from 'next/link'
 
 interface EventCardProps {
@@ -58,8 +58,9 @@ export default function EventCard({ event, onDelete }: EventCardProps) {
       {event.image && (
         <div className="relative h-48 bg-slate-100 overflow-hidden">
           <img
-            src={event.image}
+            src={eventImageUrl(event, 'medium')}
             alt={event.title}
+            loading="lazy"
             className="w-full h-full object-cover group-hover:scale-110 transition-transform duration-300"
             onError={(e) => {
               const target = e.target as HTMLImageElement;
@@ -43,6 +43,8 @@ export interface Event {
   date: string
   time: string
   image?: string
+  image_status?: '' | 'pending' | 'ready' | 'failed'
+  thumbnails?: EventThumbnails | null
   category: string
   category_id: string
   category_name: string
@@ -50,6 +52,10 @@ export interface Event {
   updated_at: string
 }
 
+// Thumbnail URLs by size name (small 320px, medium 640px, large 1280px wide
+// by default); relative to the API host unless MEDIA_URL is absolute
+export type EventThumbnails = Record<string, string>
+
 export interface CreateEventData {
   title: string
   description?: string
@@ -436,7 +442,48 @@ export const healthCheck = async (): Promise<boolean> => {
   }
 }
 
+export interface Suggestions {
+  categories: { id: string; name: string }[]
+  titles: string[]
+  venues: string[]
+}
+
+// Category names, event titles and venues starting with `text`, for the
+// search box (/autocomplete/)
+export const getSuggestions = async (text: string): Promise<Suggestions> => {
+  const empty: Suggestions = { categories: [], titles: [], venues: [] }
+  if (isDemoMode || !text.trim()) {
+    return empty
+  }
+  try {
+    const response = await api.get('/autocomplete/', { params: { q: text } })
+    return response.data
+  } catch (error) {
+    return empty
+  }
+}
+
+// Call `onChange` whenever events or categories change on the server
+// (/events/stream/); returns a function that stops listening. EventSource
+// reconnects and resumes by itself.
+export const subscribeToChanges = (onChange: () => void): (() => void) => {
+  if (isDemoMode || typeof EventSource === 'undefined') {
+    return () => {}
+  }
+  const source = new EventSource(`${baseURL}/events/stream/`)
+  source.addEventListener('changes', onChange)
+  return () => source.close()
+}
+
 // Export demo mode status for components to use
 export const isInDemoMode = () => isDemoMode
 
+// The URL to show for an event image: the `size` thumbnail once the backend
+// has generated it, the original image until then
+export const eventImageUrl = (event: Event, size: string): string | undefined => {
+  const thumbnail = event.thumbnails?.[size]
+  if (!thumbnail) return event.image
+  return new URL(thumbnail, baseURL).toString()
+}
+
 export default api
\ No newline at end of file